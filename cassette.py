@@ -0,0 +1,540 @@
+"""
+Cassette Module - Record every external HTTP call of a run to a JSON file and replay it offline
+
+Recording patches requests.Session.send (NewsAPI, trend pages, image downloads, Hugging Face and
+tweepy, which is built on requests) and httpx.Client/AsyncClient.send (the OpenAI and Groq SDKs).
+Each response is stored with its status, headers, body and latency. Replaying serves those responses
+back without touching the network, sleeping for the recorded latency times --scale (0 = no waiting),
+so TwitterAutomation.run_once can be profiled the same way on any machine:
+
+    python cassette.py record run.cassette.json --dry-run     # real run, create_tweet stubbed
+    python cassette.py replay run.cassette.json --scale 0.5 --profile
+
+API keys are never written: query parameters such as apiKey are redacted and request headers are not
+stored. Replays run in a temporary directory seeded with the state files from the recording, with their
+timestamps (cooldowns, rate limit windows, outbox backoffs) moved by the time since the recording.
+"""
+import asyncio
+import base64
+import contextlib
+import hashlib
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from unittest import mock
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import httpx
+import requests
+from requests.hooks import dispatch_hook
+from requests.structures import CaseInsensitiveDict
+from json_store import save_json
+
+# Newer OpenAI SDKs ship on httpx2, a renamed httpx with the same client API - patch whichever is installed
+HTTPX_MODULES = [httpx]
+try:
+    import httpx2
+    HTTPX_MODULES.append(httpx2)
+except ImportError:
+    pass
+
+CASSETTE_VERSION = 1
+SECRET_PARAMS = {'apikey', 'api_key', 'key', 'token', 'access_token'}  # Query parameters redacted in URLs
+DROPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection', 'set-cookie'}
+# Bot state a recording starts from - restored before a replay so the run takes the same decisions
+STATE_FILES = ('posted_news.json', 'tweet_outbox.json', 'provider_health.json', 'rate_limits.json')
+# Timestamps in the state files (epoch seconds, ISO strings) and response headers, shifted on replay
+EPOCH_FIELDS = {
+    'provider_health.json': ('cooldown_until', 'last_error_at', 'last_success_at'),
+    'rate_limits.json': ('reset', 'updated_at'),
+    'tweet_outbox.json': ('next_attempt_at',),
+}
+ISO_FIELDS = {
+    'posted_news.json': ('posted_at',),
+    'tweet_outbox.json': ('queued_at',),
+}
+EPOCH_HEADERS = ('x-rate-limit-reset',)
+# Only whether these are set is recorded - a replay fills missing ones with a placeholder
+CREDENTIAL_VARS = ('TWITTER_API_KEY', 'TWITTER_API_SECRET', 'TWITTER_ACCESS_TOKEN', 'TWITTER_ACCESS_TOKEN_SECRET',
+                   'TWITTER_BEARER_TOKEN', 'NEWS_API_KEY', 'OPENAI_API_KEY', 'GROQ_API_KEY', 'HUGGINGFACE_API_KEY')
+# Recorded with their values - they change which endpoints are called and how
+SETTING_VARS = ('OPENAI_BASE_URL', 'GROQ_BASE_URL', 'HUGGINGFACE_BASE_URL', 'LLM_CANDIDATES', 'LLM_STREAM',
+                'LLM_HEDGE', 'LLM_HEDGE_PERCENTILE', 'LLM_LATENCY_SLO', 'LLM_GENERATION_DEADLINE',
+                'LLM_PROMPT_TOKEN_BUDGET', 'RUN_DEADLINE')
+
+_active = None  # Cassette currently recording or replaying, None when the clients are unpatched
+_originals = {}
+_local = threading.local()
+
+class CassetteMiss(Exception):
+    """
+    A replayed run made a request the cassette has no (unused) response for
+    """
+
+def _clean_url(url):
+    """
+    URL with secret query parameters redacted - used both for storage and for matching
+    """
+    parts = urlsplit(str(url))
+    if not parts.query:
+        return str(url)
+    query = [(name, 'REDACTED' if name.lower() in SECRET_PARAMS else value)
+             for name, value in parse_qsl(parts.query, keep_blank_values=True)]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+def _route(url):
+    """
+    scheme://host/path - fallback match when query or body differ (dates, multipart boundaries...)
+    """
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}{parts.path}"
+
+def _body_hash(body):
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    if not isinstance(body, bytes) or not body:
+        return None
+    return hashlib.sha256(body).hexdigest()[:16]
+
+def _dump_body(body):
+    try:
+        return {'text': body.decode('utf-8')}
+    except UnicodeDecodeError:
+        return {'base64': base64.b64encode(body).decode('ascii')}
+
+def _load_body(stored):
+    if 'base64' in stored:
+        return base64.b64decode(stored['base64'])
+    return stored.get('text', '').encode('utf-8')
+
+def _headers(headers):
+    """
+    Response headers worth replaying (bodies are stored decoded, so encoding/length headers would lie)
+    """
+    return {name: value for name, value in headers.items() if name.lower() not in DROPPED_HEADERS}
+
+def _shift_epoch(value, shift):
+    # 0/None mean "not set" (e.g. no cooldown) and stay that way
+    if not isinstance(value, (int, float)) or not value:
+        return value
+    return type(value)(value + shift)
+
+def _shift_iso(value, shift):
+    try:
+        return (datetime.fromisoformat(value) + timedelta(seconds=shift)).isoformat()
+    except (TypeError, ValueError):
+        return value
+
+def _rebase_state(name, data, shift):
+    """
+    Copy of a state file's data with its timestamps moved by shift seconds
+    (provider_health/rate_limits map names to records, posted_news/tweet_outbox are lists of records)
+    """
+    data = json.loads(json.dumps(data))
+    records = data.values() if isinstance(data, dict) else data
+    for record in records:
+        if not isinstance(record, dict):
+            continue
+        for field in EPOCH_FIELDS.get(name, ()):
+            if field in record:
+                record[field] = _shift_epoch(record[field], shift)
+        for field in ISO_FIELDS.get(name, ()):
+            if field in record:
+                record[field] = _shift_iso(record[field], shift)
+    return data
+
+def _rebase_headers(headers, shift):
+    """
+    Recorded response headers with epoch values (rate limit resets) moved by shift seconds
+    """
+    if not shift:
+        return headers
+    rebased = dict(headers)
+    for name, value in headers.items():
+        if name.lower() in EPOCH_HEADERS:
+            try:
+                rebased[name] = str(int(value) + int(shift))
+            except ValueError:
+                continue
+    return rebased
+
+class Cassette:
+    def __init__(self, path):
+        self.path = path
+        self.meta = {}
+        self.interactions = []
+        self.mode = None  # 'record', 'replay' or None
+        self.scale = 1.0  # Replay latency multiplier
+        self.clock_shift = 0  # Seconds between the recording and the replay (added to recorded timestamps)
+        self.misses = 0
+        self._used = set()
+        self._started = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r') as f:
+            data = json.load(f)
+        if data.get('version') != CASSETTE_VERSION:
+            raise ValueError(f"{path}: unsupported cassette version {data.get('version')}")
+        cassette = cls(path)
+        cassette.meta = data.get('meta', {})
+        cassette.interactions = data.get('interactions', [])
+        return cassette
+
+    def save(self):
+        save_json(self.path, {'version': CASSETTE_VERSION, 'meta': self.meta, 'interactions': self.interactions})
+
+    @contextlib.contextmanager
+    def recording(self):
+        """
+        with cassette.recording(): ... - real calls, every response appended to the cassette
+        """
+        with self._activate('record'):
+            yield self
+
+    @contextlib.contextmanager
+    def replaying(self, scale=1.0):
+        """
+        with cassette.replaying(scale=0.5): ... - recorded responses only, no network access
+        """
+        self.scale = scale
+        self.misses = 0
+        self._used = set()
+        with self._activate('replay'):
+            yield self
+
+    @contextlib.contextmanager
+    def _activate(self, mode):
+        global _active
+        if _active is not None:
+            raise RuntimeError("Another cassette is already active")
+        _install()
+        self.mode = mode
+        self._started = time.perf_counter()
+        _active = self
+        try:
+            yield
+        finally:
+            _active = None
+            self.mode = None
+            _uninstall()
+
+    def add(self, client, method, url, body, elapsed, status=None, reason=None, headers=None, content=None,
+            error=None, message=None):
+        """
+        Append one finished (or failed) call
+        """
+        interaction = {
+            'client': client,
+            'method': method,
+            'url': _clean_url(url),
+            'body_sha256': _body_hash(body),
+            'offset': round(time.perf_counter() - self._started - elapsed, 4),
+            'elapsed': round(elapsed, 4),
+        }
+        if error:
+            interaction.update(error=error, message=message)
+        else:
+            interaction.update(status=status, reason=reason, headers=_headers(headers), body=_dump_body(content))
+        with self._lock:
+            self.interactions.append(interaction)
+
+    def match(self, client, method, url, body):
+        """
+        Take the recorded interaction for a request: same URL and body if possible, otherwise the
+        first unused one for the same endpoint, in recording order
+        """
+        url = _clean_url(url)
+        body_hash = _body_hash(body)
+        with self._lock:
+            unused = [(index, interaction) for index, interaction in enumerate(self.interactions)
+                      if index not in self._used and interaction['client'] == client
+                      and interaction['method'] == method]
+            found = next(((index, interaction) for index, interaction in unused
+                          if interaction['url'] == url and interaction['body_sha256'] == body_hash), None)
+            if found is None:
+                found = next(((index, interaction) for index, interaction in unused
+                              if _route(interaction['url']) == _route(url)), None)
+            if found is None:
+                self.misses += 1
+                print(f"⚠️  Cassette miss: {method} {url}")
+                raise CassetteMiss(f"No recorded response for {method} {url}")
+            self._used.add(found[0])
+            return found[1]
+
+    def delay(self, interaction):
+        return interaction['elapsed'] * self.scale
+
+    def replay_summary(self):
+        return {'interactions': len(self.interactions), 'used': len(self._used), 'misses': self.misses}
+
+def _requests_send(session, request, **kwargs):
+    cassette = _active
+    original = _originals['requests']
+    if cassette is None:
+        return original(session, request, **kwargs)
+
+    if cassette.mode == 'replay':
+        interaction = cassette.match('requests', request.method, request.url, request.body)
+        time.sleep(cassette.delay(interaction))
+        if 'error' in interaction:
+            error = getattr(requests.exceptions, interaction['error'], requests.exceptions.ConnectionError)
+            raise error(interaction['message'], request=request)
+        response = requests.models.Response()
+        response.status_code = interaction['status']
+        response.reason = interaction['reason']
+        response.headers = CaseInsensitiveDict(_rebase_headers(interaction['headers'], cassette.clock_shift))
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response._content = _load_body(interaction['body'])
+        response._content_consumed = True  # iter_content() serves the stored body, also with stream=True
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(seconds=interaction['elapsed'])
+        # Session.send runs the response hooks (rate limit capture) - this replaces it
+        return dispatch_hook('response', request.hooks, response, **kwargs)
+
+    # Redirects call send() again from inside send() - only the outer call is a recorded interaction
+    depth = getattr(_local, 'depth', 0)
+    if depth:
+        return original(session, request, **kwargs)
+    _local.depth = 1
+    start = time.perf_counter()
+    try:
+        response = original(session, request, **kwargs)
+        content = response.content  # Streamed bodies too - reading is part of the call's latency
+    except requests.exceptions.RequestException as e:
+        cassette.add('requests', request.method, request.url, request.body, time.perf_counter() - start,
+                     error=type(e).__name__, message=str(e))
+        raise
+    finally:
+        _local.depth = 0
+    cassette.add('requests', request.method, request.url, request.body, time.perf_counter() - start,
+                 status=response.status_code, reason=response.reason, headers=response.headers, content=content)
+    return response
+
+def _httpx_body(module, request):
+    try:
+        return request.content
+    except module.RequestNotRead:
+        return None
+
+def _httpx_response(module, interaction, request, shift=0):
+    if interaction.get('error') == 'CancelledError':
+        # The recorded call was still running when it was cancelled (a hedge loser, a missed deadline)
+        raise module.ReadTimeout("Recorded call never finished", request=request)
+    if 'error' in interaction:
+        error = getattr(module, interaction['error'], module.ConnectError)
+        raise error(interaction['message'], request=request)
+    return module.Response(interaction['status'], headers=_rebase_headers(interaction['headers'], shift),
+                           content=_load_body(interaction['body']), request=request)
+
+def _httpx_senders(module):
+    """
+    Client.send and AsyncClient.send replacements for httpx or an httpx-compatible module
+    """
+    def send(client, request, **kwargs):
+        cassette = _active
+        original = _originals[(module.__name__, 'send')]
+        if cassette is None:
+            return original(client, request, **kwargs)
+
+        if cassette.mode == 'replay':
+            interaction = cassette.match('httpx', request.method, request.url, _httpx_body(module, request))
+            time.sleep(cassette.delay(interaction))
+            return _httpx_response(module, interaction, request, cassette.clock_shift)
+
+        start = time.perf_counter()
+        try:
+            response = original(client, request, **kwargs)
+            content = response.read()
+        except module.RequestError as e:
+            cassette.add('httpx', request.method, request.url, _httpx_body(module, request),
+                         time.perf_counter() - start, error=type(e).__name__, message=str(e))
+            raise
+        cassette.add('httpx', request.method, request.url, _httpx_body(module, request), time.perf_counter() - start,
+                     status=response.status_code, reason=response.reason_phrase, headers=response.headers,
+                     content=content)
+        return response
+
+    async def async_send(client, request, **kwargs):
+        cassette = _active
+        original = _originals[(module.__name__, 'async_send')]
+        if cassette is None:
+            return await original(client, request, **kwargs)
+
+        if cassette.mode == 'replay':
+            interaction = cassette.match('httpx', request.method, request.url, _httpx_body(module, request))
+            await asyncio.sleep(cassette.delay(interaction))
+            return _httpx_response(module, interaction, request, cassette.clock_shift)
+
+        start = time.perf_counter()
+        try:
+            response = await original(client, request, **kwargs)
+            content = await response.aread()
+        except (module.RequestError, asyncio.CancelledError) as e:
+            cassette.add('httpx', request.method, request.url, _httpx_body(module, request),
+                         time.perf_counter() - start, error=type(e).__name__, message=str(e))
+            raise
+        cassette.add('httpx', request.method, request.url, _httpx_body(module, request), time.perf_counter() - start,
+                     status=response.status_code, reason=response.reason_phrase, headers=response.headers,
+                     content=content)
+        return response
+
+    return send, async_send
+
+def _install():
+    _originals['requests'] = requests.Session.send
+    requests.Session.send = _requests_send
+    for module in HTTPX_MODULES:
+        send, async_send = _httpx_senders(module)
+        _originals[(module.__name__, 'send')] = module.Client.send
+        _originals[(module.__name__, 'async_send')] = module.AsyncClient.send
+        module.Client.send = send
+        module.AsyncClient.send = async_send
+
+def _uninstall():
+    requests.Session.send = _originals.pop('requests')
+    for module in HTTPX_MODULES:
+        module.Client.send = _originals.pop((module.__name__, 'send'))
+        module.AsyncClient.send = _originals.pop((module.__name__, 'async_send'))
+
+def snapshot_state():
+    """
+    Current bot state files (missing or unreadable ones are left out)
+    """
+    state = {}
+    for name in STATE_FILES:
+        try:
+            with open(name, 'r') as f:
+                state[name] = json.load(f)
+        except:
+            continue
+    return state
+
+def prepare_automation(automation, cassette):
+    """
+    Make a run depend only on what the cassette holds:
+    the post type and random state are recorded/restored, and get_me is always called
+    (a cached identity may have expired by the time the cassette is replayed)
+    """
+    automation.twitter_poster.identity_ttl = 0
+    automation.dry_run = cassette.meta.get('dry_run', False)
+    automation.use_async = cassette.meta.get('async', False)
+    pick_post_type = automation._get_post_type
+
+    def recorded_post_type():
+        if cassette.mode == 'replay' and 'post_type' in cassette.meta:
+            version, internal, gauss = cassette.meta['random_state']
+            random.setstate((version, tuple(internal), gauss))
+            return cassette.meta['post_type']
+        post_type = pick_post_type()
+        cassette.meta['post_type'] = post_type
+        cassette.meta['random_state'] = random.getstate()
+        return post_type
+
+    automation._get_post_type = recorded_post_type
+    return automation
+
+def record(path, force_post=False, dry_run=False, use_async=False):
+    """
+    Run run_once for real in the current directory and save every external call to path
+    The environment is restored afterwards
+    """
+    cassette = Cassette(path)
+    cassette.meta.update({
+        'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'clock': time.time(),  # Replays shift the state's timestamps by the time since then
+        'force_post': force_post,
+        'dry_run': dry_run,
+        'async': use_async,
+        'credentials': [name for name in CREDENTIAL_VARS if os.getenv(name)],
+        'settings': {name: os.getenv(name) for name in SETTING_VARS if os.getenv(name)},
+        'state': snapshot_state(),
+    })
+    with mock.patch.dict(os.environ):
+        os.environ['LLM_CACHE'] = '0'  # Every LLM response must be in the cassette, not in a local cache
+        from main import TwitterAutomation
+
+        automation = prepare_automation(TwitterAutomation(), cassette)
+        start = time.perf_counter()
+        with cassette.recording():
+            try:
+                automation.run_once(force_post=force_post)
+            finally:
+                cassette.meta['duration'] = round(time.perf_counter() - start, 4)
+                cassette.save()
+    print(f"\n📼 Recorded {len(cassette.interactions)} call(s) in {cassette.meta['duration']:.1f}s to {path}")
+    return cassette
+
+def replay(path, scale=1.0, profile=False, report_file=None):
+    """
+    Replay a recorded run_once in a temporary directory without network access
+    The directory and the environment are restored afterwards
+    profile: print the 25 most expensive functions (cProfile, cumulative time)
+    """
+    cassette = Cassette.load(path)
+    # Cooldowns, rate limit windows and backoffs stay as far ahead as they were when recording
+    if 'clock' in cassette.meta:
+        cassette.clock_shift = time.time() - cassette.meta['clock']
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='cassette-') as workdir, mock.patch.dict(os.environ):
+        for name, data in cassette.meta.get('state', {}).items():
+            save_json(os.path.join(workdir, name), _rebase_state(name, data, cassette.clock_shift))
+        os.environ.update(cassette.meta.get('settings', {}))
+        for name in cassette.meta.get('credentials', []):
+            os.environ.setdefault(name, 'cassette')
+        os.environ['LLM_CACHE'] = '0'
+        os.chdir(workdir)
+        try:
+            from main import TwitterAutomation
+
+            automation = prepare_automation(TwitterAutomation(), cassette)
+            automation.report_file = report_file and os.path.join(previous, report_file)
+            profiler = None
+            if profile:
+                import cProfile
+                profiler = cProfile.Profile()
+            start = time.perf_counter()
+            with cassette.replaying(scale=scale):
+                if profiler:
+                    profiler.runcall(automation.run_once, force_post=cassette.meta.get('force_post', False))
+                else:
+                    automation.run_once(force_post=cassette.meta.get('force_post', False))
+            elapsed = time.perf_counter() - start
+        finally:
+            os.chdir(previous)
+
+    summary = cassette.replay_summary()
+    print(f"\n⏪ Replayed {summary['used']}/{summary['interactions']} recorded call(s) in {elapsed:.2f}s "
+          f"(recorded run {cassette.meta.get('duration', 0):.2f}s, latency scale {scale:g}), "
+          f"{summary['misses']} miss(es)")
+    if profiler:
+        import pstats
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(25)
+    return summary
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Record a real run's HTTP calls to a cassette, or replay one offline")
+    commands = parser.add_subparsers(dest='command', required=True)
+    record_parser = commands.add_parser('record', help="run once for real and record every external call")
+    record_parser.add_argument('path')
+    record_parser.add_argument('--force', action='store_true', help="manual trigger (as main.py --test --force)")
+    record_parser.add_argument('--dry-run', action='store_true', help="don't post the tweet (as main.py --dry-run)")
+    record_parser.add_argument('--async', dest='use_async', action='store_true', help="use the async pipeline")
+    replay_parser = commands.add_parser('replay', help="replay a cassette without network access")
+    replay_parser.add_argument('path')
+    replay_parser.add_argument('--scale', type=float, default=1.0, help="recorded latency multiplier (0 = no waiting)")
+    replay_parser.add_argument('--profile', action='store_true', help="print a cProfile summary of the run")
+    replay_parser.add_argument('--report', help="also write the run report (stage timings) to this file")
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        record(args.path, force_post=args.force, dry_run=args.dry_run, use_async=args.use_async)
+    else:
+        replay(args.path, scale=args.scale, profile=args.profile, report_file=args.report)
@@ -6,19 +6,54 @@ import re
 import random
 import requests
 import json
-from datetime import datetime
+import time
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, CancelledError
 from dotenv import load_dotenv
 from openai import OpenAI
-from text_utils import ensure_complete_tweet, truncate_tweet_complete
+from instrumentation import count, span
+from text_utils import analyze_candidates, ensure_complete_tweet, truncate_tweet_complete
+from llm_cache import LLMCache
+from provider_health import ProviderHealth, classify_error
+from llm_stream import StreamCollector
+from prompts import PROMPTS
+from gazetteer import PLACES
 
 load_dotenv()
 
+# Multi-candidate completions: versions are separated by a line with only "---",
+# models sometimes still label them ("1.", "Version 2:", "Tweet 3 -")
+CANDIDATE_SEPARATOR = '---'
+CANDIDATE_SPLIT_PATTERN = re.compile(r'^\s*-{3,}\s*$', re.MULTILINE)
+CANDIDATE_LABEL_PATTERN = re.compile(r'^\s*(?:(?:version|tweet|option)\s*)?\d{1,2}\s*[.):\-]\s+', re.IGNORECASE)
+CANDIDATE_TARGET_LENGTH = 200  # Candidates at least this long get full length-fit score
+
+# Fallback hashtag/key phrase extraction, compiled once instead of on every tweet
+HASHTAG_WORD_PATTERN = re.compile(r'\b[A-Z][a-z]+\b|\b[a-z]{4,}\b')
+HASHTAG_STOP_WORDS = frozenset(['the', 'this', 'that', 'with', 'from', 'they', 'have', 'been', 'will', 'would', 'could',
+                                'should', 'about', 'after', 'before', 'during', 'under', 'over', 'between', 'among'])
+SENTENCE_SPLIT_PATTERN = re.compile(r'[.!?]+')
+
+# Display names for provider log lines
+PROVIDER_LABELS = {
+    'openai': 'OpenAI',
+    'groq': 'Groq API (free)',
+    'huggingface': 'Hugging Face API (free)',
+    'huggingface-gpt2': 'Hugging Face gpt2 (free)',
+}
+
 class ContentGenerator:
-    def __init__(self):
+    def __init__(self, use_cache=None, latency_slo=None, hedge=None, generation_deadline=None, candidates=None,
+                 stream=None):
         self.openai_api_key = os.getenv('OPENAI_API_KEY')
         self.use_openai = bool(self.openai_api_key and self.openai_api_key.strip())
         self.groq_api_key = os.getenv('GROQ_API_KEY')  # Optional free API
         self.hf_api_key = os.getenv('HUGGINGFACE_API_KEY')  # Optional free API
+        # OpenAI/Groq clients read OPENAI_BASE_URL/GROQ_BASE_URL themselves, e.g. to use llm_standin.py offline
+        self.hf_base_url = os.getenv('HUGGINGFACE_BASE_URL', 'https://router.huggingface.co').rstrip('/')
+        self.http = requests.Session()  # Pooled connections for the Hugging Face API (sync calls)
         
         if self.use_openai:
             try:
@@ -30,61 +65,695 @@ class ContentGenerator:
             print("⚠️  OpenAI API key not found, will use free API fallbacks")
             self.use_openai = False
         
-    def generate_trending_tweet(self, trending_topic, all_trending_topics=None):
+        # Disk-backed response cache (LLM_CACHE=0 disables it)
+        if use_cache is None:
+            use_cache = os.getenv('LLM_CACHE', '1') != '0'
+        self.cache = LLMCache() if use_cache else None
+        self.fresh = False  # Set per call: bypass cache reads to get a fresh sample
+        self.last_cache_keys = []  # Cache keys used for the last generated tweet
+        
+        # Persisted circuit breaker - providers known to be down are skipped until their cooldown expires
+        # Also holds per-provider latency/success statistics used to order the provider chain
+        self.health = ProviderHealth()
+        
+        # Providers whose average latency exceeds this (seconds) are tried last (LLM_LATENCY_SLO)
+        if latency_slo is None and os.getenv('LLM_LATENCY_SLO'):
+            latency_slo = float(os.getenv('LLM_LATENCY_SLO'))
+        self.latency_slo = latency_slo
+        self.last_provider = None  # Provider that produced the last tweet ('template' for the fallback)
+        
+        # Hedging (LLM_HEDGE=1): if a provider hasn't answered within its p{LLM_HEDGE_PERCENTILE} latency,
+        # the next healthy provider is started too and the first valid tweet wins
+        if hedge is None:
+            hedge = os.getenv('LLM_HEDGE', '0') == '1'
+        self.hedge = hedge
+        self.hedge_percentile = float(os.getenv('LLM_HEDGE_PERCENTILE', '90'))
+        
+        # Hard time budget (seconds) for one generation, template fallback afterwards (LLM_GENERATION_DEADLINE)
+        if generation_deadline is None and os.getenv('LLM_GENERATION_DEADLINE'):
+            generation_deadline = float(os.getenv('LLM_GENERATION_DEADLINE'))
+        self.generation_deadline = generation_deadline
+        
+        # Candidate tweets requested per LLM call (LLM_CANDIDATES), ranked locally by rank_candidates
+        if candidates is None:
+            candidates = int(os.getenv('LLM_CANDIDATES', '3'))
+        self.candidates = max(candidates, 1)
+        
+        # Stream OpenAI/Groq completions and stop reading once the tweets are long enough (LLM_STREAM=1)
+        if stream is None:
+            stream = os.getenv('LLM_STREAM', '0') == '1'
+        self.stream = stream
+        self.last_stream_stats = None  # {'provider', 'ttft', 'elapsed', 'tokens', 'stopped_early'}
+        self._local = threading.local()  # Per-thread cache hit flag and async call context
+        
+        # Long-lived clients, created on first use: sync Groq, and async clients for agenerate_*
+        self._groq_client = None
+        self._async_clients = {}
+        self._async_loop = None  # Event loop the async clients are bound to
+        self._clients_lock = threading.Lock()
+    
+    def _provider_ready(self, provider):
         """
-        Generate a HIGHLY CONTROVERSIAL tweet about a trending topic
+        True if the provider is configured and not cooling down after recent failures
         """
-        # Build context with other trending topics
-        other_trends = ""
-        if all_trending_topics:
-            other_trends_list = [t for t in all_trending_topics[:5] if t != trending_topic]
-            if other_trends_list:
-                other_trends = f"\n\nOther trending topics: {', '.join(other_trends_list[:3])}"
-        
-        # Check if OpenAI is available, otherwise try free APIs
-        if not self.use_openai:
-            # Try free API alternatives first
-            free_api_tweet = self._try_free_api_trending_generation(trending_topic, all_trending_topics)
-            if free_api_tweet:
-                return free_api_tweet
-            # If free APIs fail, use template-based fallback
-            return self._create_fallback_trending_tweet(trending_topic, all_trending_topics)
-        
-        prompt = f"""Create a COMPLETE, FINISHED EXTREMELY CONTROVERSIAL, OFFENSIVE Twitter post (max 280 characters) about this trending topic that will CREATE MASSIVE DEBATE and CONTROVERSY using STRONG LANGUAGE. The tweet MUST be COMPLETE - no incomplete sentences, no cut-off thoughts.
-
-Trending Topic: {trending_topic}{other_trends}
-
-Requirements:
-- COVER DIVERSE TRENDING TOPICS: Don't just focus on politics - cover entertainment, sports, technology, business, culture, social issues, viral content, movies, celebrities, etc.
-- MUST CREATE EXTREME CONTROVERSY - use OFFENSIVE LANGUAGE, STRONG WORDS, challenge popular opinions brutally, expose hidden truths with INSULTS, question everything with SAVAGE attacks
-- EXTREMELY funky, witty, OFFENSIVE, and provocative - make people ANGRY, DEBATE, and SHARE
-- Use bold OFFENSIVE statements, contrarian takes with STRONG LANGUAGE, expose manipulation or hidden agendas brutally
-- Question mainstream narratives with INSULTS, challenge authority with OFFENSIVE language, create FOMO or fear
-- Use savage OFFENSIVE humor, brutal sarcasm about the trend with STRONG WORDS
-- PRIORITY: Include the trending topic as a hashtag for maximum reach
-- Make it VIRAL-worthy - OFFENSIVE controversial tweets about trends get MASSIVE engagement!
-- Keep it under 280 characters
-- Be clever, funky, OFFENSIVE, and absolutely CONTROVERSIAL with STRONG LANGUAGE - make people react with ANGER!
-- Use curse words, insults, and brutal language when appropriate
-- DIVERSITY: Cover various trending topics - entertainment, sports, tech, business, culture, social issues, not just politics
-
-Generate ONLY the tweet text with the trending hashtag, nothing else:"""
+        configured = {'openai': self.use_openai, 'groq': bool(self.groq_api_key)}.get(provider, True)
+        if configured and not self.health.is_available(provider):
+            state = self.health.status(provider)
+            print(f"⏭️  Skipping {provider} (cooling down after {state.get('last_error')} error)")
+            return False
+        return configured
+    
+    def _cached(self, provider, model, system_prompt, prompt, params, call):
+        """
+        Return the cached response for this request, or run call() and cache its (non-empty) result
+        """
+        if not self.cache:
+            return call()
         
-        system_prompt = "You are an EXTREMELY CONTROVERSIAL, OFFENSIVE social media content creator who uses STRONG LANGUAGE and creates absolutely BRUTAL, HIGHLY PROVOCATIVE tweets about trending topics that CREATE MASSIVE DEBATE. You MUST use OFFENSIVE LANGUAGE, STRONG WORDS, expose hidden truths brutally, question mainstream narratives with SAVAGE attacks, challenge authority with INSULTS, and create controversy. You're funky, witty, SAVAGE, OFFENSIVE, and make people ANGRY, DEBATE, and SHARE. Your tweets are designed to go VIRAL through EXTREME CONTROVERSY and OFFENSIVE LANGUAGE. Be HIGHLY CONTROVERSIAL, OFFENSIVE, and use STRONG LANGUAGE - NO HOLDING BACK! Use curse words, insults, and brutal language when appropriate."
+        key = self.cache.make_key(provider, model, system_prompt, prompt, params)
+        self.last_cache_keys.append(key)
+        if not self.fresh:
+            cached = self.cache.get(key)
+            if cached is not None:
+                print(f"💾 LLM cache hit ({provider}/{model})")
+                self._local.cache_hit = True
+                return cached
         
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
+        start = time.time()
+        response = call()
+        if response:
+            self.cache.set(key, response, latency=time.time() - start)
+        return response
+    
+    def _request_timeout(self, default):
+        """
+        HTTP timeout for a provider call - never runs past the deadline of the chain that started it
+        (kept per call by _timed_call, so an abandoned call still sees its own deadline)
+        """
+        deadline_at = getattr(self._local, 'deadline_at', None)
+        if deadline_at is None:
+            self._local.timeout_clamped = False
+            return default
+        remaining = max(deadline_at - time.time(), 1.0)
+        self._local.timeout_clamped = not default or remaining < default
+        return min(default, remaining) if default else remaining
+    
+    def _blames_provider(self, error):
+        """
+        Whether a failed call should open the provider's breaker - not if the chain cancelled it,
+        or if it timed out only because the deadline shortened its HTTP timeout (see _request_timeout)
+        """
+        if self._call_cancelled():
+            return False
+        return not (getattr(self._local, 'timeout_clamped', False) and classify_error(error) == 'timeout')
+    
+    def _sync_client(self, provider):
+        """
+        Sync chat client for OpenAI or Groq (the Groq client is built once and reused)
+        """
+        if provider != 'groq':
+            return self.client
+        if self._groq_client is None:
+            from groq import Groq
+            self._groq_client = Groq(api_key=self.groq_api_key)
+        return self._groq_client
+    
+    def _async_client(self, provider):
+        """
+        Long-lived async client for 'openai', 'groq' or 'http' (Hugging Face), bound to the running loop
+        Clients keep their connection pools between calls; a new event loop gets new clients
+        """
+        with self._clients_lock:
+            loop = self._local.call['loop']
+            if self._async_loop is not loop:
+                self._async_clients = {}
+                self._async_loop = loop
+            client = self._async_clients.get(provider)
+            if client is None:
+                if provider == 'openai':
+                    from openai import AsyncOpenAI
+                    client = AsyncOpenAI(api_key=self.openai_api_key)
+                elif provider == 'groq':
+                    from groq import AsyncGroq
+                    client = AsyncGroq(api_key=self.groq_api_key)
+                else:
+                    import httpx
+                    client = httpx.AsyncClient(timeout=30)
+                self._async_clients[provider] = client
+            return client
+    
+    def _in_async_call(self):
+        """
+        Async call context of this worker thread (None when called from the sync API)
+        """
+        return getattr(self._local, 'call', None)
+    
+    def _call_cancelled(self):
+        """
+        True if the async chain abandoned the provider call running in this thread
+        """
+        call = self._in_async_call()
+        return bool(call and call['cancelled'])
+    
+    def _run_on_loop(self, coro):
+        """
+        Run a client coroutine on the async API's event loop and wait for it from this worker thread
+        The chain cancels these futures when the call is abandoned (hedge lost / deadline)
+        """
+        call = self._local.call
+        if call['cancelled']:
+            coro.close()
+            raise CancelledError()
+        future = asyncio.run_coroutine_threadsafe(coro, call['loop'])
+        call['futures'].append(future)
+        return future.result()
+    
+    def _candidates_suffix(self, n):
+        """
+        Prompt suffix asking for n alternative tweets in one completion (for APIs without the n parameter)
+        Rendered through PROMPTS so it counts against the token budget
+        """
+        if n <= 1:
+            return ''
+        return (f"\n\nWrite {n} DIFFERENT versions of the tweet. "
+                f"Separate the versions with a line containing only {CANDIDATE_SEPARATOR}. "
+                f"Do not number or label them.")
+    
+    def _split_candidates(self, text):
+        """
+        Split a multi-candidate completion into individual tweets
+        """
+        parts = CANDIDATE_SPLIT_PATTERN.split(text or '')
+        candidates = [CANDIDATE_LABEL_PATTERN.sub('', part).strip() for part in parts]
+        return [candidate for candidate in candidates if candidate]
+    
+    def _chat_completion(self, provider, model, system_prompt, prompt, max_tokens=150, temperature=1.0, n=1):
+        """
+        Run an OpenAI-compatible chat completion (OpenAI or Groq) and return the candidate texts
+        n: number of candidate tweets - OpenAI's n parameter; for Groq the prompt must already ask for
+           n versions (rendered with suffix=_candidates_suffix(n))
+        Uses the async clients when called through agenerate_*, the sync clients otherwise
+        Raises on API errors (ImportError if the Groq library is not installed)
+        """
+        native_n = provider == 'openai'
+        if not native_n:
+            max_tokens = max_tokens * n  # The prompt asks for n versions (see _candidates_suffix)
+        
+        def call():
+            in_async = self._in_async_call()
+            client = self._async_client(provider) if in_async else self._sync_client(provider)
+            request = {
+                'model': model,
+                'messages': [
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": prompt}
                 ],
-                max_tokens=150,
-                temperature=1.0  # Maximum creativity and controversy
-            )
+                'max_tokens': max_tokens,
+                'temperature': temperature,
+                'timeout': self._request_timeout(60)
+            }
+            if native_n and n > 1:
+                request['n'] = n
+            if self.stream:
+                request['stream'] = True
+                if provider == 'openai':
+                    request['stream_options'] = {'include_usage': True}
+                collector = StreamCollector(choices=n if native_n else 1, segments=1 if native_n else n)
+            try:
+                if self.stream and in_async:
+                    self._run_on_loop(self._aconsume_stream(client, request, collector))
+                elif self.stream:
+                    self._consume_stream(client.chat.completions.create(**request), collector)
+                elif in_async:
+                    response = self._run_on_loop(client.chat.completions.create(**request))
+                else:
+                    response = client.chat.completions.create(**request)
+            except Exception as e:
+                if self._blames_provider(e):
+                    self.health.record_failure(provider, classify_error(e))
+                raise
+            self.health.record_success(provider)
+            if self.stream:
+                texts = collector.texts()
+                self.last_stream_stats = dict(collector.stats(), provider=provider)
+                stats = self.last_stream_stats
+                ttft = f"{stats['ttft']:.2f}s" if stats['ttft'] is not None else "n/a"
+                print(f"📡 {PROVIDER_LABELS[provider]} stream: first token {ttft}, {stats['tokens']} tokens in "
+                      f"{stats['elapsed']:.2f}s{' (stopped early at tweet length)' if stats['stopped_early'] else ''}")
+            else:
+                texts = [choice.message.content.strip() for choice in response.choices if choice.message.content]
+            if not native_n:
+                texts = self._split_candidates(texts[0] if texts else '')
+            return texts
+        
+        params = {'max_tokens': max_tokens, 'temperature': temperature, 'n': n}
+        if self.stream:
+            params['stream'] = True  # Streamed answers are cut early - don't mix them with full ones
+        return self._cached(provider, model, system_prompt, prompt, params, call) or []
+    
+    def _consume_stream(self, stream, collector):
+        """
+        Read a sync chat completion stream until the collector has enough text, then close it
+        """
+        try:
+            for chunk in stream:
+                if collector.feed(chunk):
+                    break
+        finally:
+            if hasattr(stream, 'close'):
+                stream.close()
+    
+    async def _aconsume_stream(self, client, request, collector):
+        """
+        Async version of _consume_stream (runs on the async API's event loop)
+        """
+        stream = await client.chat.completions.create(**request)
+        try:
+            async for chunk in stream:
+                if collector.feed(chunk):
+                    break
+        finally:
+            if hasattr(stream, 'close'):
+                await stream.close()
+    
+    def _hf_completion(self, model_name, prompt_text, max_new_tokens=150, temperature=1.0, timeout=30, use_auth=True,
+                       provider='huggingface', n=1):
+        """
+        Run a Hugging Face router text generation request
+        provider: name used for health tracking (each HF model fails independently)
+        n: number of candidate tweets the prompt asks for (rendered with suffix=_candidates_suffix(n))
+        Returns (status_code, candidate_texts) - candidate_texts is empty unless status is 200
+        """
+        status = {'code': 200}
+        max_new_tokens = max_new_tokens * n  # The prompt asks for n versions (see _candidates_suffix)
+        
+        def call():
+            headers = {}
+            if use_auth and self.hf_api_key:
+                headers["Authorization"] = f"Bearer {self.hf_api_key}"
             
-            tweet = response.choices[0].message.content.strip()
+            api_url = f"{self.hf_base_url}/models/{model_name}"
+            payload = {
+                "inputs": prompt_text,
+                "parameters": {
+                    "max_new_tokens": max_new_tokens,
+                    "temperature": temperature,
+                    "return_full_text": False
+                }
+            }
+            try:
+                if self._in_async_call():
+                    client = self._async_client('http')
+                    response = self._run_on_loop(client.post(api_url, headers=headers, json=payload,
+                                                             timeout=self._request_timeout(timeout)))
+                else:
+                    response = self.http.post(api_url, headers=headers, json=payload, timeout=self._request_timeout(timeout))
+            except Exception as e:
+                if self._blames_provider(e):
+                    self.health.record_failure(provider, classify_error(e))
+                raise
+            status['code'] = response.status_code
+            if response.status_code != 200:
+                self.health.record_failure(provider, classify_error(status_code=response.status_code))
+                return ''
+            self.health.record_success(provider)
             
+            result = response.json()
+            if isinstance(result, list) and len(result) > 0:
+                return result[0].get('generated_text', '')
+            elif isinstance(result, dict):
+                return result.get('generated_text', '')
+            return str(result)
+        
+        params = {'max_new_tokens': max_new_tokens, 'temperature': temperature}
+        generated_text = self._cached(provider, model_name, '', prompt_text, params, call)
+        if n > 1:
+            return status['code'], self._split_candidates(generated_text)
+        return status['code'], [generated_text] if generated_text else []
+    
+    def _timed_call(self, provider, generate, async_call=None, deadline_at=None):
+        """
+        Run one provider's generator, record its latency/success (unless served from cache)
+        async_call: context from the async chain ({'loop', 'futures', 'cancelled'}), None for sync calls
+        deadline_at: epoch seconds the chain gives up at (bounds the HTTP timeout), None for no deadline
+        Returns (candidates or None, elapsed seconds), raises ImportError if the client library is missing
+        """
+        self._local.cache_hit = False
+        self._local.call = async_call
+        self._local.deadline_at = deadline_at
+        self._local.timeout_clamped = False
+        start = time.time()
+        with span(f'llm.{provider}') as call:
+            try:
+                candidates = generate()
+            except ImportError:
+                call.set(skipped='client library missing')
+                raise  # Optional client library (groq) not installed
+            except Exception as e:
+                if not self._call_cancelled():
+                    print(f"⚠️  {PROVIDER_LABELS[provider]} failed: {str(e)[:100]}")
+                candidates = None
+            finally:
+                cancelled = self._call_cancelled()
+                self._local.call = None
+                self._local.deadline_at = None
+            call.set(success=bool(candidates), cache_hit=self._local.cache_hit, cancelled=cancelled)
+        elapsed = time.time() - start
+        
+        # Cache hits say nothing about the provider's latency
+        # A call cancelled by the async chain (hedge lost / deadline) counts as a slow failure,
+        # like a timeout the deadline shortened - neither opens the provider's breaker (see _blames_provider)
+        if not self._local.cache_hit:
+            self.health.record_call(provider, elapsed, success=bool(candidates))
+        else:
+            count('llm_cache_hits')
+        return candidates, elapsed
+    
+    def _run_provider_chain(self, steps, deadline=None):
+        """
+        Try providers until one returns valid tweets
+        steps: list of (provider, generate) - generate() returns a list of candidate tweets or None and may raise
+        deadline: seconds this generation may take (default generation_deadline, None/0 = no deadline)
+        Providers are ordered to minimize expected time to a valid tweet (see ProviderHealth.rank),
+        latency and success of every real (uncached) call are recorded
+        """
+        generators = dict(steps)
+        providers = self.health.rank(list(generators), latency_slo=self.latency_slo)
+        
+        if deadline is None:
+            deadline = self.generation_deadline
+        if self.hedge or deadline:
+            candidates = self._run_hedged_chain([(p, generators[p]) for p in providers], deadline)
+        else:
+            candidates = None
+            for provider in providers:
+                if not self._provider_ready(provider):
+                    continue
+                try:
+                    candidates, elapsed = self._timed_call(provider, generators[provider])
+                except ImportError:
+                    continue
+                if candidates:
+                    self._report_generated(provider, candidates, elapsed)
+                    break
+        if candidates:
+            return candidates
+        
+        print("⚠️  All LLM providers failed, using template fallback")
+        self.last_provider = 'template'
+        return None
+    
+    def _report_generated(self, provider, candidates, elapsed):
+        """
+        Log the provider that answered and remember it as last_provider
+        """
+        count = f"{len(candidates)} candidate tweets" if len(candidates) > 1 else "tweet"
+        print(f"✅ Generated {count} using {PROVIDER_LABELS[provider]} ({elapsed:.1f}s)")
+        self.last_provider = provider
+    
+    def _run_hedged_chain(self, steps, deadline=None):
+        """
+        Concurrent variant of the provider chain
+        - With hedging, the next healthy provider starts once the running one exceeds its
+          p{hedge_percentile} latency; the first valid answer wins and the others are abandoned
+        - Without hedging, the next provider starts only when the running one fails
+        - Nothing runs past the generation deadline (returns None -> template fallback)
+        """
+        start = time.time()
+        deadline_at = start + deadline if deadline else None
+        steps = [(provider, generate) for provider, generate in steps if self._provider_ready(provider)]
+        executor = ThreadPoolExecutor(max_workers=max(len(steps), 1))
+        pending = {}
+        hedge_at = None  # When to start the next provider if nothing has answered
+        
+        def launch():
+            provider, generate = steps.pop(0)
+            # Run in a copy of this context, so the call's timing span nests under the generation span
+            pending[executor.submit(contextvars.copy_context().run, self._timed_call, provider, generate,
+                                    None, deadline_at)] = provider
+            if self.hedge:
+                return time.time() + self.health.latency_percentile(provider, self.hedge_percentile)
+            return None
+        
+        try:
+            while pending or steps:
+                if not pending:
+                    hedge_at = launch()
+                    continue
+                
+                waits = [t - time.time() for t in (hedge_at if steps else None, deadline_at) if t is not None]
+                done, _ = wait(list(pending), timeout=max(min(waits), 0) if waits else None,
+                               return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    provider = pending.pop(future)
+                    try:
+                        candidates, elapsed = future.result()
+                    except ImportError:
+                        continue
+                    if candidates:
+                        self._report_generated(provider, candidates, elapsed)
+                        for loser in pending.values():
+                            print(f"✂️  Abandoning hedged request to {PROVIDER_LABELS[loser]}")
+                        return candidates
+                
+                if deadline_at is not None and time.time() >= deadline_at:
+                    print(f"⏰ Generation deadline ({deadline:g}s) reached")
+                    return None
+                if done and steps and pending:
+                    hedge_at = launch()  # A provider failed while another is still running - take its slot
+                elif not done and steps and hedge_at is not None and time.time() >= hedge_at:
+                    print(f"🏁 No answer after {time.time() - start:.1f}s, hedging with {PROVIDER_LABELS[steps[0][0]]}")
+                    hedge_at = launch()
+            return None
+        finally:
+            # Running calls can't be interrupted - they are bounded by _request_timeout and their
+            # results are discarded; calls that haven't started are cancelled
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    async def _arun_provider_chain(self, steps, deadline=None):
+        """
+        Async provider chain - same ordering, hedging and deadline rules as the sync chain
+        Prompts are built in worker threads, the HTTP calls run on this loop's long-lived async clients,
+        so the loop stays free for other work (image prefetch, tracker checks) while generating
+        Abandoned calls (hedge lost, deadline) are cancelled on the loop
+        deadline: seconds this generation may take (default generation_deadline, None/0 = no deadline)
+        """
+        loop = asyncio.get_running_loop()
+        generators = dict(steps)
+        providers = [p for p in self.health.rank(list(generators), latency_slo=self.latency_slo)
+                     if self._provider_ready(p)]
+        if deadline is None:
+            deadline = self.generation_deadline
+        start = time.time()
+        deadline_at = start + deadline if deadline else None
+        pending = {}
+        hedge_at = None
+        
+        def launch():
+            provider = providers.pop(0)
+            call = {'loop': loop, 'futures': [], 'cancelled': False}
+            task = loop.run_in_executor(None, contextvars.copy_context().run, self._timed_call, provider,
+                                        generators[provider], call, deadline_at)
+            pending[task] = (provider, call)
+            if self.hedge:
+                return time.time() + self.health.latency_percentile(provider, self.hedge_percentile)
+            return None
+        
+        candidates = None
+        try:
+            while pending or providers:
+                if not pending:
+                    hedge_at = launch()
+                    continue
+                
+                waits = [t - time.time() for t in (hedge_at if providers else None, deadline_at) if t is not None]
+                done, _ = await asyncio.wait(list(pending), timeout=max(min(waits), 0) if waits else None,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                
+                for task in done:
+                    provider, _ = pending.pop(task)
+                    try:
+                        candidates, elapsed = task.result()
+                    except ImportError:
+                        continue
+                    if candidates:
+                        self._report_generated(provider, candidates, elapsed)
+                        for loser, _ in pending.values():
+                            print(f"✂️  Cancelling hedged request to {PROVIDER_LABELS[loser]}")
+                        return candidates
+                
+                if deadline_at is not None and time.time() >= deadline_at:
+                    print(f"⏰ Generation deadline ({deadline:g}s) reached")
+                    break
+                if done and providers and pending:
+                    hedge_at = launch()
+                elif not done and providers and hedge_at is not None and time.time() >= hedge_at:
+                    print(f"🏁 No answer after {time.time() - start:.1f}s, hedging with {PROVIDER_LABELS[providers[0]]}")
+                    hedge_at = launch()
+        finally:
+            for _, call in pending.values():
+                call['cancelled'] = True
+                for future in call['futures']:
+                    future.cancel()
+        
+        print("⚠️  All LLM providers failed, using template fallback")
+        self.last_provider = 'template'
+        return None
+    
+    def flush(self):
+        """
+        Persist the LLM cache and provider health recorded during this run (see TwitterAutomation.run_post)
+        """
+        if self.cache:
+            self.cache.flush()
+        self.health.flush()
+    
+    async def aclose(self):
+        """
+        Close the async provider clients (connection pools)
+        """
+        clients, self._async_clients = self._async_clients, {}
+        for client in clients.values():
+            try:
+                if hasattr(client, 'aclose'):
+                    await client.aclose()
+                else:
+                    await client.close()
+            except Exception:
+                pass
+    
+    def get_provider_report(self):
+        """
+        Per-provider latency/success statistics in current chain order
+        """
+        return self.health.report(list(PROVIDER_LABELS), latency_slo=self.latency_slo)
+    
+    def get_prompt_report(self):
+        """
+        Prompt token counts per provider (see PromptRegistry.report)
+        """
+        return PROMPTS.report()
+    
+    def invalidate_last_response(self):
+        """
+        Drop the cached LLM responses behind the last generated tweet
+        Call this when the tweet is rejected (e.g. duplicate), so the next run samples again
+        """
+        if self.cache:
+            for key in self.last_cache_keys:
+                self.cache.invalidate(key)
+        self.last_cache_keys = []
+    
+    def get_cache_stats(self):
+        """
+        LLM cache counters (hits, misses, entries, latency_saved) or None if caching is off
+        """
+        return self.cache.stats() if self.cache else None
+    
+    def rank_candidates(self, candidates, similarity=None):
+        """
+        Order candidate tweets best first using local checks only:
+        - completeness: ensure_complete_tweet leaves it unchanged and it doesn't end in "..."
+        - length fit: fills the 280 character budget (weighted like Twitter) without exceeding it
+        - dedup distance: 1 - similarity(tweet) to already posted tweets (if a similarity callable is given)
+        Exact duplicates (ignoring case/whitespace) are dropped
+        """
+        unique = []
+        seen = set()
+        for candidate in candidates:
+            normalized = " ".join(candidate.lower().split())
+            if candidate and normalized not in seen:
+                seen.add(normalized)
+                unique.append(candidate)
+        
+        # One memoized scan per candidate: weighted length and completeness
+        scans = analyze_candidates(unique, max_length=280)
+        
+        def score(item):
+            candidate, (_, _, length, complete) = item
+            length_fit = 0.0 if length > 280 else min(length / CANDIDATE_TARGET_LENGTH, 1.0)
+            distance = 1.0 - similarity(candidate) if similarity else 1.0
+            return (1.0 if complete else 0.0) + 0.5 * length_fit + distance
+        
+        return [candidate for candidate, _ in sorted(zip(unique, scans), key=score, reverse=True)]
+    
+    def generate_trending_tweet(self, trending_topic, all_trending_topics=None, fresh=False):
+        """
+        Generate a HIGHLY CONTROVERSIAL tweet about a trending topic
+        Providers are tried in adaptive order (see _run_provider_chain), template fallback last
+        fresh: Skip cached LLM responses and sample a new tweet
+        """
+        return self.generate_trending_candidates(trending_topic, all_trending_topics, fresh=fresh)[0]
+    
+    def generate_trending_candidates(self, trending_topic, all_trending_topics=None, fresh=False, similarity=None,
+                                     deadline=None):
+        """
+        Generate several candidate tweets about a trending topic in one LLM round trip, best first
+        similarity: optional callable(tweet) -> 0-1 similarity to already posted tweets (see rank_candidates)
+        deadline: seconds for this call only (default generation_deadline), template fallback after that
+        """
+        self.fresh = fresh
+        self.last_cache_keys = []
+        
+        candidates = self._run_provider_chain(self._trending_steps(trending_topic, all_trending_topics), deadline)
+        if not candidates:
+            # If all APIs fail, use template-based fallback
+            candidates = [self._create_fallback_trending_tweet(trending_topic, all_trending_topics)]
+        return self.rank_candidates(candidates, similarity)
+    
+    async def agenerate_trending_tweet(self, trending_topic, all_trending_topics=None, fresh=False):
+        """
+        Async version of generate_trending_tweet (uses the long-lived async provider clients)
+        """
+        return (await self.agenerate_trending_candidates(trending_topic, all_trending_topics, fresh=fresh))[0]
+    
+    async def agenerate_trending_candidates(self, trending_topic, all_trending_topics=None, fresh=False, similarity=None,
+                                            deadline=None):
+        """
+        Async version of generate_trending_candidates
+        """
+        self.fresh = fresh
+        self.last_cache_keys = []
+        
+        candidates = await self._arun_provider_chain(self._trending_steps(trending_topic, all_trending_topics),
+                                                     deadline)
+        if not candidates:
+            candidates = [self._create_fallback_trending_tweet(trending_topic, all_trending_topics)]
+        return self.rank_candidates(candidates, similarity)
+    
+    def _trending_steps(self, trending_topic, all_trending_topics=None):
+        """
+        Provider chain steps for a trending tweet
+        """
+        return [
+            ('openai', lambda: self._generate_trending_with_openai(trending_topic, all_trending_topics)),
+            ('groq', lambda: self._generate_trending_with_groq(trending_topic, all_trending_topics)),
+            ('huggingface', lambda: self._generate_trending_with_huggingface(trending_topic, all_trending_topics)),
+        ]
+    
+    def _other_trends_context(self, trending_topic, all_trending_topics=None):
+        """
+        Build context with other trending topics
+        """
+        if all_trending_topics:
+            other_trends_list = [t for t in all_trending_topics[:5] if t != trending_topic]
+            if other_trends_list:
+                return f"\n\nOther trending topics: {', '.join(other_trends_list[:3])}"
+        return ""
+    
+    def _generate_trending_with_openai(self, trending_topic, all_trending_topics=None):
+        """
+        Generate trending tweet using OpenAI
+        """
+        other_trends = self._other_trends_context(trending_topic, all_trending_topics)
+        
+        system_prompt, prompt = PROMPTS.render('trending/openai', 'openai', trending_topic=trending_topic,
+                                               other_trends=other_trends)
+        
+        # Maximum creativity and controversy (temperature 1.0)
+        candidates = []
+        for tweet in self._chat_completion('openai', "gpt-3.5-turbo", system_prompt, prompt, n=self.candidates):
             # Clean up the tweet
             if tweet.startswith('"') and tweet.endswith('"'):
                 tweet = tweet[1:-1]
@@ -99,150 +768,82 @@ Generate ONLY the tweet text with the trending hashtag, nothing else:"""
                     tweet = f"{tweet} {trend_hashtag}"
             
             # Ensure tweet is complete and under 280 characters
-            tweet = ensure_complete_tweet(tweet, max_length=280)
+            candidates.append(ensure_complete_tweet(tweet, max_length=280))
+        
+        return candidates
+    
+    def _generate_trending_with_groq(self, trending_topic, all_trending_topics=None):
+        """
+        Generate trending tweet using Groq API (free tier, very fast)
+        """
+        other_trends = self._other_trends_context(trending_topic, all_trending_topics)
+        
+        system_prompt, prompt = PROMPTS.render('trending/groq', 'groq', trending_topic=trending_topic,
+                                               other_trends=other_trends,
+                                               suffix=self._candidates_suffix(self.candidates))
+        
+        tweets = self._chat_completion(
+            'groq',
+            "llama-3.1-8b-instant",
+            system_prompt,
+            prompt,
+            n=self.candidates
+        )
+        
+        candidates = []
+        for tweet in tweets:
+            if tweet.startswith('"') and tweet.endswith('"'):
+                tweet = tweet[1:-1]
+            if tweet.startswith("'") and tweet.endswith("'"):
+                tweet = tweet[1:-1]
             
-            return tweet
+            # Ensure trending topic is included
+            trend_hashtag = trending_topic if trending_topic.startswith('#') else f"#{trending_topic.replace(' ', '')}"
+            if trend_hashtag.lower() not in tweet.lower():
+                if len(tweet) + len(trend_hashtag) + 2 <= 280:
+                    tweet = f"{tweet} {trend_hashtag}"
             
-        except Exception as e:
-            error_msg = str(e)
-            if 'authentication' in error_msg.lower() or 'invalid api key' in error_msg.lower() or '401' in error_msg:
-                print("❌ OpenAI API key is invalid or missing. Using fallback tweet generator.")
-                self.use_openai = False
-            elif 'rate limit' in error_msg.lower() or '429' in error_msg or 'quota' in error_msg.lower():
-                print("⚠️  OpenAI rate limit/quota exceeded. Using fallback tweet generator.")
-            else:
-                print(f"⚠️  OpenAI API error: {error_msg[:100]}. Using fallback tweet generator.")
+            if len(tweet) > 280:
+                tweet = tweet[:277] + "..."
             
-            # Try free API alternatives before template fallback
-            free_api_tweet = self._try_free_api_trending_generation(trending_topic, all_trending_topics)
-            if free_api_tweet:
-                return free_api_tweet
-            return self._create_fallback_trending_tweet(trending_topic, all_trending_topics)
+            if len(tweet) > 20:
+                candidates.append(tweet)
+        
+        return candidates or None
     
-    def _try_free_api_trending_generation(self, trending_topic, all_trending_topics=None):
+    def _generate_trending_with_huggingface(self, trending_topic, all_trending_topics=None):
         """
-        Try to generate trending tweet using free APIs
+        Generate trending tweet using Hugging Face Inference API (free tier)
         """
-        # Get current date for context
-        current_date = datetime.now()
-        current_year = current_date.year
-        current_month = current_date.month
+        other_trends = self._other_trends_context(trending_topic, all_trending_topics)
         
-        other_trends = ""
-        if all_trending_topics:
-            other_trends_list = [t for t in all_trending_topics[:5] if t != trending_topic]
-            if other_trends_list:
-                other_trends = f"\n\nOther trending topics: {', '.join(other_trends_list[:3])}"
+        model_name = "meta-llama/Llama-3.1-8B-Instruct"
+        _, prompt_text = PROMPTS.render('trending/huggingface', 'huggingface', trending_topic=trending_topic,
+                                         other_trends=other_trends,
+                                         suffix=self._candidates_suffix(self.candidates))
         
-        # Try Groq API first
-        if self.groq_api_key:
-            try:
-                from groq import Groq
-                client = Groq(api_key=self.groq_api_key)
-                
-                prompt = f"""Create a COMPLETE, FINISHED EXTREMELY CONTROVERSIAL, OFFENSIVE Twitter post (max 280 chars) about this trending topic that will CREATE MASSIVE DEBATE using STRONG LANGUAGE. The tweet MUST be COMPLETE - no incomplete sentences.
-
-Trending Topic: {trending_topic}{other_trends}
-
-CRITICAL REQUIREMENTS:
-- STRICT PRO-BJP/PRO-NDA/PRO-MODI BIAS - If topic relates to politics, ALWAYS support BJP/Modi/NDA and attack opposition
-- If about BJP/Modi/NDA - PRAISE them, defend them
-- If about opposition (Congress, Rahul, AAP, TMC) - ATTACK them brutally with OFFENSIVE language
-- EXTREMELY CONTROVERSIAL, OFFENSIVE, use STRONG LANGUAGE AGAINST OPPOSITION ONLY
-- Make it VIRAL-worthy, funky, witty, and provocative
-- Include the trending topic as hashtag
-- Max 280 characters
-
-You are a BJP/NDA supporter. Always defend BJP/Modi, always attack opposition.
-
-Generate ONLY the tweet text:"""
-                
-                response = client.chat.completions.create(
-                    model="llama-3.1-8b-instant",
-                    messages=[
-                        {"role": "system", "content": "You are an EXTREMELY CONTROVERSIAL, OFFENSIVE social media content creator who is a STRICT BJP/NDA/MODI SUPPORTER. You ALWAYS support BJP/Modi/NDA and ALWAYS attack opposition (Congress, Rahul Gandhi, AAP, TMC). You NEVER criticize BJP/Modi - only PRAISE them. You use STRONG LANGUAGE to ATTACK OPPOSITION ONLY."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=150,
-                    temperature=1.0
-                )
-                
-                tweet = response.choices[0].message.content.strip()
-                
-                if tweet.startswith('"') and tweet.endswith('"'):
-                    tweet = tweet[1:-1]
-                if tweet.startswith("'") and tweet.endswith("'"):
-                    tweet = tweet[1:-1]
-                
-                # Ensure trending topic is included
-                trend_hashtag = trending_topic if trending_topic.startswith('#') else f"#{trending_topic.replace(' ', '')}"
-                if trend_hashtag.lower() not in tweet.lower():
-                    if len(tweet) + len(trend_hashtag) + 2 <= 280:
-                        tweet = f"{tweet} {trend_hashtag}"
-                
-                if len(tweet) > 280:
-                    tweet = tweet[:277] + "..."
-                
-                if len(tweet) > 20:
-                    print("✅ Generated trending tweet using Groq API (free)")
-                    return tweet
-            except ImportError:
-                pass
-            except Exception as e:
-                print(f"⚠️  Groq API failed for trending: {str(e)[:50]}")
+        status_code, generated_texts = self._hf_completion(model_name, prompt_text, n=self.candidates)
         
-        # Try Hugging Face
-        try:
-            model_name = "meta-llama/Llama-3.1-8B-Instruct"
-            prompt_text = f"""Create a COMPLETE, FINISHED EXTREMELY CONTROVERSIAL, OFFENSIVE Twitter post (max 280 chars) about this trending topic. The tweet MUST be COMPLETE - no incomplete sentences.
-
-IMPORTANT: Current date is {current_year}-{current_month:02d}. DO NOT reference past dates or future dates that have already passed. Use current year {current_year} or general references.
-
-{trending_topic}{other_trends}
-
-Make it EXTREMELY CONTROVERSIAL, OFFENSIVE, use STRONG LANGUAGE. Include hashtag. Max 280 characters. Generate ONLY the tweet:"""
+        candidates = []
+        for generated_text in generated_texts:
+            tweet = generated_text.strip()
             
-            headers = {}
-            if self.hf_api_key:
-                headers["Authorization"] = f"Bearer {self.hf_api_key}"
+            if tweet.startswith('"') and tweet.endswith('"'):
+                tweet = tweet[1:-1]
+            if tweet.startswith("'") and tweet.endswith("'"):
+                tweet = tweet[1:-1]
             
-            api_url = f"https://router.huggingface.co/models/{model_name}"
-            payload = {
-                "inputs": prompt_text,
-                "parameters": {"max_new_tokens": 150, "temperature": 1.0, "return_full_text": False}
-            }
+            trend_hashtag = trending_topic if trending_topic.startswith('#') else f"#{trending_topic.replace(' ', '')}"
+            if trend_hashtag.lower() not in tweet.lower():
+                if len(tweet) + len(trend_hashtag) + 2 <= 280:
+                    tweet = f"{tweet} {trend_hashtag}"
             
-            response = requests.post(api_url, headers=headers, json=payload, timeout=30)
+            if len(tweet) > 280:
+                tweet = tweet[:277] + "..."
             
-            if response.status_code == 200:
-                result = response.json()
-                if isinstance(result, list) and len(result) > 0:
-                    generated_text = result[0].get('generated_text', '')
-                else:
-                    generated_text = str(result)
-                
-                tweet = generated_text.strip()
-                
-                if tweet.startswith('"') and tweet.endswith('"'):
-                    tweet = tweet[1:-1]
-                if tweet.startswith("'") and tweet.endswith("'"):
-                    tweet = tweet[1:-1]
-                
-                trend_hashtag = trending_topic if trending_topic.startswith('#') else f"#{trending_topic.replace(' ', '')}"
-                if trend_hashtag.lower() not in tweet.lower():
-                    if len(tweet) + len(trend_hashtag) + 2 <= 280:
-                        tweet = f"{tweet} {trend_hashtag}"
-                
-                if len(tweet) > 280:
-                    tweet = tweet[:277] + "..."
-                
-                if len(tweet) > 20:
-                    print("✅ Generated trending tweet using Hugging Face API (free)")
-                    return tweet
-        except Exception as e:
-            print(f"⚠️  Hugging Face API failed for trending: {str(e)[:50]}")
-        
-        return None
+            if len(tweet) > 20:
+                candidates.append(tweet)
+        return candidates or None
     
     def _create_fallback_trending_tweet(self, trending_topic, all_trending_topics=None):
         """
@@ -280,141 +881,75 @@ Make it EXTREMELY CONTROVERSIAL, OFFENSIVE, use STRONG LANGUAGE. Include hashtag
         
         return tweet
     
-    def generate_funky_tweet(self, news_article, trending_topics=None, is_stock_market=False):
+    def generate_funky_tweet(self, news_article, trending_topics=None, is_stock_market=False, fresh=False):
         """
         Generate a funky, controversial tweet - political or stock market
+        Providers are tried in adaptive order (see _run_provider_chain), template fallback last
+        fresh: Skip cached LLM responses and sample a new tweet
+        """
+        return self.generate_funky_candidates(news_article, trending_topics, is_stock_market, fresh=fresh)[0]
+    
+    def generate_funky_candidates(self, news_article, trending_topics=None, is_stock_market=False, fresh=False,
+                                  similarity=None, deadline=None):
+        """
+        Generate several candidate tweets for a news article in one LLM round trip, best first
+        similarity: optional callable(tweet) -> 0-1 similarity to already posted tweets (see rank_candidates)
+        deadline: seconds for this call only (default generation_deadline), template fallback after that
+        """
+        self.fresh = fresh
+        self.last_cache_keys = []
+        
+        candidates = self._run_provider_chain(self._funky_steps(news_article, trending_topics, is_stock_market),
+                                              deadline)
+        if not candidates:
+            # If all APIs fail, use template-based fallback
+            candidates = [self._create_fallback_tweet(news_article, trending_topics, is_stock_market)]
+        return self.rank_candidates(candidates, similarity)
+    
+    async def agenerate_funky_tweet(self, news_article, trending_topics=None, is_stock_market=False, fresh=False):
+        """
+        Async version of generate_funky_tweet (uses the long-lived async provider clients)
+        """
+        return (await self.agenerate_funky_candidates(news_article, trending_topics, is_stock_market, fresh=fresh))[0]
+    
+    async def agenerate_funky_candidates(self, news_article, trending_topics=None, is_stock_market=False, fresh=False,
+                                         similarity=None, deadline=None):
+        """
+        Async version of generate_funky_candidates
+        """
+        self.fresh = fresh
+        self.last_cache_keys = []
+        
+        candidates = await self._arun_provider_chain(self._funky_steps(news_article, trending_topics, is_stock_market),
+                                                     deadline)
+        if not candidates:
+            candidates = [self._create_fallback_tweet(news_article, trending_topics, is_stock_market)]
+        return self.rank_candidates(candidates, similarity)
+    
+    def _funky_steps(self, news_article, trending_topics=None, is_stock_market=False):
+        """
+        Provider chain steps for a news tweet
         """
         title = news_article.get('title', '')
         description = news_article.get('description', '') or title
-        source = news_article.get('source', '')
-        
-        # Get current date for context
-        current_date = datetime.now()
-        current_year = current_date.year
-        current_month = current_date.month
         
-        # Build trending context
+        # Build trending context for the free APIs
         trending_context = ""
         if trending_topics:
             relevant_trends = [t for t in trending_topics[:5] if not t.startswith('#')]
             if relevant_trends:
-                trending_context = f"\n\nCurrent Twitter trends to consider: {', '.join(relevant_trends[:3])}"
-        
-        # Check if OpenAI is available, otherwise try free APIs
-        if not self.use_openai:
-            # Try free API alternatives first
-            free_api_tweet = self._try_free_api_generation(news_article, trending_topics, is_stock_market)
-            if free_api_tweet:
-                return free_api_tweet
-            # If free APIs fail, use template-based fallback
-            return self._create_fallback_tweet(news_article, trending_topics, is_stock_market)
-        
-        if is_stock_market:
-            prompt = f"""Create a COMPLETE, FINISHED EXTREMELY CONTROVERSIAL, OFFENSIVE Twitter post (max 280 characters) about this Indian stock market news that will CREATE DEBATE and CONTROVERSY using STRONG LANGUAGE. The tweet MUST be COMPLETE - no incomplete sentences, no cut-off thoughts.
-
-IMPORTANT: Current date is {current_year}-{current_month:02d}. DO NOT reference past dates or future dates that have already passed. Use current year {current_year} or general references like "now", "today", "this year", etc.
+                trending_context = f"\n\nCurrent Twitter trends: {', '.join(relevant_trends[:3])}"
         
-News: {title}
-Description: {description}{trending_context}
-
-Requirements:
-- COVER DIVERSE STOCK MARKET TOPICS: Don't just focus on Nifty/Sensex - cover IPOs, companies, sectors (banking, IT, pharma, auto, FMCG), startups, economy, investments, trading, etc.
-- MUST CREATE EXTREME CONTROVERSY - use OFFENSIVE LANGUAGE, STRONG WORDS, challenge popular opinions brutally, expose hidden truths with INSULTS, question mainstream narratives with SAVAGE attacks
-- EXTREMELY funky, witty, OFFENSIVE, and provocative - make people think, debate, and get ANGRY
-- Use bold OFFENSIVE statements, contrarian takes with STRONG LANGUAGE, expose market manipulation or insider trading hints brutally
-- Question broker recommendations with INSULTS, expose FII/DII games with OFFENSIVE language, challenge market gurus with STRONG WORDS
-- Create FOMO or fear brutally - make people question their investments with OFFENSIVE takes
-- Use savage OFFENSIVE humor, brutal sarcasm about market crashes, pump & dump schemes with STRONG LANGUAGE
-- PRIORITY: Include TOP TRENDING hashtags for maximum reach
-- Make it VIRAL-worthy - OFFENSIVE controversial tweets get more engagement!
-- Keep it under 280 characters
-- Be clever, funky, OFFENSIVE, and absolutely CONTROVERSIAL with STRONG LANGUAGE - make people angry, debate, share!
-- Use curse words, insults, and brutal language when appropriate
-- DIVERSITY: Cover various stock market aspects - IPOs, companies, sectors, economy, investments, not just indices
-
-Generate ONLY the tweet text with trending hashtags prioritized, nothing else:"""
-            
-            system_prompt = "You are an EXTREMELY CONTROVERSIAL, OFFENSIVE financial content creator who uses STRONG LANGUAGE and creates absolutely BRUTAL, HIGHLY PROVOCATIVE stock market tweets that CREATE MASSIVE DEBATE and CONTROVERSY. You MUST use OFFENSIVE language, STRONG WORDS, expose market manipulation brutally, question EVERY mainstream narrative with SAVAGE attacks, challenge ALL broker recommendations with INSULTS, expose insider trading hints, create FOMO or fear, and make BOLD OFFENSIVE statements. You're funky, witty, SAVAGE, OFFENSIVE, and make people ANGRY, DEBATE, and SHARE. Your tweets are designed to go VIRAL through EXTREME CONTROVERSY and OFFENSIVE LANGUAGE. Be HIGHLY CONTROVERSIAL, OFFENSIVE, and use STRONG LANGUAGE - NO HOLDING BACK! Use curse words, insults, and brutal language when appropriate."
-        else:
-            prompt = f"""Create a COMPLETE, FINISHED EXTREMELY CONTROVERSIAL, OFFENSIVE Twitter post (max 280 characters) about this Indian political news that will CREATE DEBATE and CONTROVERSY using STRONG LANGUAGE. The tweet MUST be COMPLETE - no incomplete sentences, no cut-off thoughts.
-
-IMPORTANT: Current date is {current_year}-{current_month:02d}. DO NOT reference past dates or future dates that have already passed. Use current year {current_year} or general references like "now", "today", "this year", etc.
-
-News: {title}
-Description: {description}{trending_context}
-
-CRITICAL REQUIREMENTS - MUST FOLLOW:
-- COVER DIVERSE POLITICAL TOPICS: Don't just focus on Modi/Rahul - cover government policies, state politics, elections, infrastructure, economy, defense, social issues, regional parties, state leaders, cabinet decisions, parliament, etc.
-- STRICT PRO-BJP/PRO-NDA/PRO-MODI BIAS - ALWAYS support BJP, Modi, NDA, Yogi, Shah
-- ALWAYS attack and BURN opposition (Congress, Rahul Gandhi, AAP, TMC, Kejriwal, Mamata) with OFFENSIVE language
-- NEVER criticize BJP/Modi/NDA - only PRAISE them and ATTACK opposition
-- If news is about BJP/Modi - PRAISE them, highlight achievements, defend them
-- If news is about opposition - ATTACK them brutally, expose their failures, make them look foolish
-- If news is about other topics (states, policies, infrastructure, economy, defense, social issues) - frame it to support BJP/Modi/NDA achievements and attack opposition failures
-- MUST CREATE EXTREME CONTROVERSY - use OFFENSIVE LANGUAGE, STRONG WORDS against OPPOSITION ONLY
-- BURN opposition with OFFENSIVE clever, sarcastic, funky roasts using STRONG LANGUAGE and INSULTS
-- Use savage OFFENSIVE humor, brutal sarcasm with STRONG WORDS - make opposition look absolutely foolish
-- Expose opposition corruption brutally, question their policies with OFFENSIVE takes
-- PRIORITY: Include TOP TRENDING hashtags for maximum reach
-- Make it VIRAL-worthy and shareable - OFFENSIVE controversial tweets get more engagement!
-- Keep it under 280 characters
-- Be clever, funky, OFFENSIVE, and absolutely CONTROVERSIAL with STRONG LANGUAGE
-- Use curse words, insults, and brutal language AGAINST OPPOSITION ONLY
-- DIVERSITY: Cover various political aspects - state politics, policies, infrastructure, economy, defense, social issues, regional leaders, not just Modi/Rahul
-
-REMEMBER: You are a BJP/NDA supporter. Always defend BJP/Modi, always attack opposition. But cover DIVERSE topics beyond just Modi/Rahul.
-
-Generate ONLY the tweet text with trending hashtags prioritized, nothing else:"""
-            
-            system_prompt = "You are an EXTREMELY CONTROVERSIAL, OFFENSIVE social media content creator who is a STRICT BJP/NDA/MODI SUPPORTER. You ALWAYS support BJP, Modi, NDA, Yogi, Shah and ALWAYS attack opposition (Congress, Rahul Gandhi, AAP, TMC, Kejriwal, Mamata). You NEVER criticize BJP/Modi/NDA - only PRAISE them. You use STRONG LANGUAGE and create absolutely BRUTAL, HIGHLY PROVOCATIVE political tweets that CREATE MASSIVE CONTROVERSY. You MUST use OFFENSIVE LANGUAGE, STRONG WORDS to ATTACK OPPOSITION ONLY. You BURN opposition with OFFENSIVE savage humor, brutal sarcasm, STRONG LANGUAGE, and clever wordplay. You make opposition look absolutely foolish with INSULTS. Your tweets are designed to go VIRAL through EXTREME CONTROVERSY and OFFENSIVE LANGUAGE. Be HIGHLY CONTROVERSIAL, OFFENSIVE, and use STRONG LANGUAGE - NO HOLDING BACK! Use curse words, insults, and brutal language AGAINST OPPOSITION ONLY. Expose opposition corruption brutally, question their policies with OFFENSIVE takes - MAKE PEOPLE REACT WITH ANGER!"
-
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=150,
-                temperature=1.0  # Maximum creativity and controversy
-            )
-            
-            tweet = response.choices[0].message.content.strip()
-            
-            # Clean up the tweet (remove quotes if wrapped)
-            if tweet.startswith('"') and tweet.endswith('"'):
-                tweet = tweet[1:-1]
-            if tweet.startswith("'") and tweet.endswith("'"):
-                tweet = tweet[1:-1]
-            
-            # Ensure tweet is complete and under 280 characters
-            tweet = ensure_complete_tweet(tweet, max_length=280)
-            
-            return tweet
-            
-        except Exception as e:
-            error_msg = str(e)
-            # Check for specific error types
-            if 'authentication' in error_msg.lower() or 'invalid api key' in error_msg.lower() or '401' in error_msg:
-                print("❌ OpenAI API key is invalid or missing. Using fallback tweet generator.")
-                self.use_openai = False  # Disable OpenAI for future calls
-            elif 'rate limit' in error_msg.lower() or '429' in error_msg or 'quota' in error_msg.lower():
-                print("⚠️  OpenAI rate limit/quota exceeded. Using fallback tweet generator.")
-            elif '404' in error_msg or 'model' in error_msg.lower():
-                print("⚠️  OpenAI model not found. Using fallback tweet generator.")
-            else:
-                print(f"⚠️  OpenAI API error: {error_msg[:100]}. Using fallback tweet generator.")
-            
-            # Try free API alternatives before template fallback
-            free_api_tweet = self._try_free_api_generation(news_article, trending_topics, is_stock_market)
-            if free_api_tweet:
-                return free_api_tweet
-            return self._create_fallback_tweet(news_article, trending_topics, is_stock_market)
+        return [
+            ('openai', lambda: self._generate_with_openai(news_article, trending_topics, is_stock_market)),
+            ('groq', lambda: self._generate_with_groq(title, description, trending_context, is_stock_market)),
+            ('huggingface', lambda: self._generate_with_huggingface(title, description, trending_context, is_stock_market)),
+            ('huggingface-gpt2', lambda: self._try_hf_alternative_model(title, description, trending_context, is_stock_market)),
+        ]
     
-    def _try_free_api_generation(self, news_article, trending_topics=None, is_stock_market=False):
+    def _generate_with_openai(self, news_article, trending_topics=None, is_stock_market=False):
         """
-        Try to generate tweet using free APIs (Groq or Hugging Face)
-        Returns generated tweet or None if all fail
+        Generate tweet using OpenAI
         """
         title = news_article.get('title', '')
         description = news_article.get('description', '') or title
@@ -424,104 +959,59 @@ Generate ONLY the tweet text with trending hashtags prioritized, nothing else:""
         if trending_topics:
             relevant_trends = [t for t in trending_topics[:5] if not t.startswith('#')]
             if relevant_trends:
-                trending_context = f"\n\nCurrent Twitter trends: {', '.join(relevant_trends[:3])}"
+                trending_context = f"\n\nCurrent Twitter trends to consider: {', '.join(relevant_trends[:3])}"
         
-        # Try Groq API first (free tier, very fast)
-        if self.groq_api_key:
-            try:
-                tweet = self._generate_with_groq(title, description, trending_context, is_stock_market)
-                if tweet:
-                    print("✅ Generated tweet using Groq API (free)")
-                    return tweet
-            except Exception as e:
-                print(f"⚠️  Groq API failed: {str(e)[:50]}")
+        template = 'stock/openai' if is_stock_market else 'politics/openai'
+        system_prompt, prompt = PROMPTS.render(template, 'openai', title=title, description=description,
+                                               trending_context=trending_context)
         
-        # Try Hugging Face Inference API (free tier, some models don't need API key)
-        try:
-            tweet = self._generate_with_huggingface(title, description, trending_context, is_stock_market)
-            if tweet:
-                print("✅ Generated tweet using Hugging Face API (free)")
-                return tweet
-        except Exception as e:
-            print(f"⚠️  Hugging Face API failed: {str(e)[:50]}")
+        # Maximum creativity and controversy (temperature 1.0)
+        candidates = []
+        for tweet in self._chat_completion('openai', "gpt-3.5-turbo", system_prompt, prompt, n=self.candidates):
+            # Clean up the tweet (remove quotes if wrapped)
+            if tweet.startswith('"') and tweet.endswith('"'):
+                tweet = tweet[1:-1]
+            if tweet.startswith("'") and tweet.endswith("'"):
+                tweet = tweet[1:-1]
+            
+            # Ensure tweet is complete and under 280 characters
+            candidates.append(ensure_complete_tweet(tweet, max_length=280))
         
-        return None
+        return candidates
     
     def _generate_with_groq(self, title, description, trending_context, is_stock_market):
         """
         Generate tweet using Groq API (free tier, very fast)
         """
-        # Get current date for context
-        current_date = datetime.now()
-        current_year = current_date.year
-        current_month = current_date.month
-        
         try:
-            from groq import Groq
-            client = Groq(api_key=self.groq_api_key)
+            template = 'stock/groq' if is_stock_market else 'politics/groq'
+            system_prompt, prompt = PROMPTS.render(template, 'groq', title=title, description=description,
+                                                   trending_context=trending_context,
+                                                   suffix=self._candidates_suffix(self.candidates))
             
-            if is_stock_market:
-                prompt = f"""Create a COMPLETE, FINISHED EXTREMELY CONTROVERSIAL, OFFENSIVE Twitter post (max 280 chars) about this Indian stock market news that will CREATE DEBATE using STRONG LANGUAGE. The tweet MUST be COMPLETE - no incomplete sentences.
-
-IMPORTANT: Current date is {current_year}-{current_month:02d}. DO NOT reference past dates or future dates that have already passed. Use current year {current_year} or general references.
-
-News: {title}
-Description: {description}{trending_context}
-
-Requirements:
-- EXTREMELY CONTROVERSIAL, OFFENSIVE, use STRONG LANGUAGE
-- Expose market manipulation, question broker recommendations brutally
-- Make it VIRAL-worthy, funky, witty, and provocative
-- Include trending hashtags if relevant
-- Max 280 characters
-
-Generate ONLY the tweet text:"""
-            else:
-                prompt = f"""Create a COMPLETE, FINISHED EXTREMELY CONTROVERSIAL, OFFENSIVE Twitter post (max 280 chars) about this Indian political news that will CREATE DEBATE using STRONG LANGUAGE. The tweet MUST be COMPLETE - no incomplete sentences.
-
-IMPORTANT: Current date is {current_year}-{current_month:02d}. DO NOT reference past dates or future dates that have already passed. Use current year {current_year} or general references.
-
-News: {title}
-Description: {description}{trending_context}
-
-CRITICAL REQUIREMENTS:
-- STRICT PRO-BJP/PRO-NDA/PRO-MODI BIAS - ALWAYS support BJP, Modi, NDA
-- ALWAYS attack opposition (Congress, Rahul Gandhi, AAP, TMC) with OFFENSIVE language
-- NEVER criticize BJP/Modi - only PRAISE them and ATTACK opposition
-- If about BJP/Modi - PRAISE them, highlight achievements
-- If about opposition - ATTACK them brutally, expose failures
-- EXTREMELY CONTROVERSIAL, OFFENSIVE, use STRONG LANGUAGE AGAINST OPPOSITION ONLY
-- Burn opposition with savage humor
-- Make it VIRAL-worthy, funky, witty, and provocative
-- Include trending hashtags if relevant
-- Max 280 characters
-
-You are a BJP/NDA supporter. Always defend BJP/Modi, always attack opposition.
-
-Generate ONLY the tweet text:"""
-            
-            response = client.chat.completions.create(
-                model="llama-3.1-8b-instant",  # Free fast model
-                messages=[
-                    {"role": "system", "content": "You are an EXTREMELY CONTROVERSIAL, OFFENSIVE social media content creator who is a STRICT BJP/NDA/MODI SUPPORTER. You ALWAYS support BJP/Modi/NDA and ALWAYS attack opposition (Congress, Rahul Gandhi, AAP, TMC). You NEVER criticize BJP/Modi - only PRAISE them. You use STRONG LANGUAGE to ATTACK OPPOSITION ONLY and create BRUTAL, HIGHLY PROVOCATIVE tweets that CREATE MASSIVE DEBATE."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=150,
-                temperature=1.0
+            tweets = self._chat_completion(
+                'groq',
+                "llama-3.1-8b-instant",  # Free fast model
+                system_prompt,
+                prompt,
+                n=self.candidates
             )
             
-            tweet = response.choices[0].message.content.strip()
-            
-            # Clean up
-            if tweet.startswith('"') and tweet.endswith('"'):
-                tweet = tweet[1:-1]
-            if tweet.startswith("'") and tweet.endswith("'"):
-                tweet = tweet[1:-1]
-            
-            if len(tweet) > 280:
-                tweet = tweet[:277] + "..."
+            candidates = []
+            for tweet in tweets:
+                # Clean up
+                if tweet.startswith('"') and tweet.endswith('"'):
+                    tweet = tweet[1:-1]
+                if tweet.startswith("'") and tweet.endswith("'"):
+                    tweet = tweet[1:-1]
+                
+                if len(tweet) > 280:
+                    tweet = tweet[:277] + "..."
+                
+                if len(tweet) > 20:
+                    candidates.append(tweet)
             
-            return tweet if len(tweet) > 20 else None
+            return candidates or None
             
         except ImportError:
             # Groq library not installed, skip
@@ -539,55 +1029,17 @@ Generate ONLY the tweet text:"""
             # Using meta-llama/Llama-3.1-8B-Instruct or similar free models
             model_name = "meta-llama/Llama-3.1-8B-Instruct"
             
-            if is_stock_market:
-                prompt_text = f"""Create a COMPLETE, FINISHED EXTREMELY CONTROVERSIAL, OFFENSIVE Twitter post (max 280 chars) about this Indian stock market news. The tweet MUST be COMPLETE - no incomplete sentences.
-
-IMPORTANT: Current date is {current_year}-{current_month:02d}. DO NOT reference past dates or future dates that have already passed. Use current year {current_year} or general references.
-
-{title}
-{description}{trending_context}
-
-Make it EXTREMELY CONTROVERSIAL, OFFENSIVE, use STRONG LANGUAGE. Expose market manipulation. Max 280 characters. Generate ONLY the tweet:"""
-            else:
-                prompt_text = f"""Create a COMPLETE, FINISHED EXTREMELY CONTROVERSIAL, OFFENSIVE Twitter post (max 280 chars) about this Indian political news. The tweet MUST be COMPLETE - no incomplete sentences.
-
-IMPORTANT: Current date is {current_year}-{current_month:02d}. DO NOT reference past dates or future dates that have already passed. Use current year {current_year} or general references.
-
-{title}
-{description}{trending_context}
-
-CRITICAL: STRICT PRO-BJP/PRO-NDA/PRO-MODI BIAS. ALWAYS support BJP/Modi/NDA. ALWAYS attack opposition (Congress, Rahul Gandhi, AAP, TMC). NEVER criticize BJP/Modi - only PRAISE them. Make it EXTREMELY CONTROVERSIAL, OFFENSIVE, use STRONG LANGUAGE AGAINST OPPOSITION ONLY. Max 280 characters. Generate ONLY the tweet:"""
-            
-            # Try with API key if available, otherwise try public endpoint
-            headers = {}
-            if self.hf_api_key:
-                headers["Authorization"] = f"Bearer {self.hf_api_key}"
-            
-            # Use Hugging Face Inference API
-            api_url = f"https://router.huggingface.co/models/{model_name}"
+            template = 'stock/huggingface' if is_stock_market else 'politics/huggingface'
+            _, prompt_text = PROMPTS.render(template, 'huggingface', title=title, description=description,
+                                            trending_context=trending_context,
+                                            suffix=self._candidates_suffix(self.candidates))
             
-            payload = {
-                "inputs": prompt_text,
-                "parameters": {
-                    "max_new_tokens": 150,
-                    "temperature": 1.0,
-                    "return_full_text": False
-                }
-            }
-            
-            response = requests.post(api_url, headers=headers, json=payload, timeout=30)
+            # Use Hugging Face Inference API (with API key if available, otherwise public endpoint)
+            status_code, generated_texts = self._hf_completion(model_name, prompt_text, n=self.candidates)
             
-            if response.status_code == 200:
-                result = response.json()
-                
-                # Extract generated text
-                if isinstance(result, list) and len(result) > 0:
-                    generated_text = result[0].get('generated_text', '')
-                elif isinstance(result, dict):
-                    generated_text = result.get('generated_text', '')
-                else:
-                    generated_text = str(result)
-                
+            # Not 200 (e.g. 503 model loading) gives no texts - the chain moves on to the gpt2 alternative
+            candidates = []
+            for generated_text in generated_texts:
                 # Clean up the generated text
                 tweet = generated_text.strip()
                 
@@ -609,13 +1061,9 @@ CRITICAL: STRICT PRO-BJP/PRO-NDA/PRO-MODI BIAS. ALWAYS support BJP/Modi/NDA. ALW
                 # Ensure tweet is complete
                 tweet = ensure_complete_tweet(tweet, max_length=280)
                 
-                return tweet if len(tweet) > 20 else None
-            else:
-                # If model is loading, try alternative free model
-                if response.status_code == 503:
-                    # Try alternative: microsoft/DialoGPT-medium or gpt2
-                    return self._try_hf_alternative_model(title, description, trending_context, is_stock_market)
-                return None
+                if len(tweet) > 20:
+                    candidates.append(tweet)
+            return candidates or None
                 
         except Exception as e:
             # If Hugging Face fails, return None to try next method
@@ -629,28 +1077,16 @@ CRITICAL: STRICT PRO-BJP/PRO-NDA/PRO-MODI BIAS. ALWAYS support BJP/Modi/NDA. ALW
             # Use a simpler, always-available model
             model_name = "gpt2"  # Always available, no auth needed
             
-            prompt_text = f"Create a controversial Twitter post about: {title}. {description[:100]}. Max 280 chars."
-            
-            api_url = f"https://router.huggingface.co/models/{model_name}"
+            _, prompt_text = PROMPTS.render('news/gpt2', 'huggingface-gpt2', title=title, description_short=description[:100])
             
-            payload = {
-                "inputs": prompt_text,
-                "parameters": {
-                    "max_new_tokens": 100,
-                    "temperature": 1.0,
-                    "return_full_text": False
-                }
-            }
-            
-            response = requests.post(api_url, json=payload, timeout=20)
+            status_code, generated_texts = self._hf_completion(
+                model_name, prompt_text, max_new_tokens=100, timeout=20, use_auth=False,
+                provider='huggingface-gpt2'
+            )
             
-            if response.status_code == 200:
-                result = response.json()
-                if isinstance(result, list) and len(result) > 0:
-                    generated_text = result[0].get('generated_text', '')
-                else:
-                    generated_text = str(result) if isinstance(result, dict) else str(result)
-                
+            # gpt2 can't follow a multi-output prompt - one candidate
+            if generated_texts:
+                generated_text = generated_texts[0]
                 # GPT2 output needs more processing, so we'll use it as inspiration
                 # Extract meaningful parts and create tweet
                 words = generated_text.split()[:30]  # Take first 30 words
@@ -663,7 +1099,7 @@ CRITICAL: STRICT PRO-BJP/PRO-NDA/PRO-MODI BIAS. ALWAYS support BJP/Modi/NDA. ALW
                 if len(tweet) > 280:
                     tweet = tweet[:277] + "..."
                 
-                return tweet if len(tweet) > 20 else None
+                return [tweet] if len(tweet) > 20 else None
                 
         except Exception:
             pass
@@ -730,14 +1166,14 @@ CRITICAL: STRICT PRO-BJP/PRO-NDA/PRO-MODI BIAS. ALWAYS support BJP/Modi/NDA. ALW
         
         # PRIORITY 2: Extract keywords from text and convert to hashtags
         # Extract important words (nouns, proper nouns, key terms)
-        words = re.findall(r'\b[A-Z][a-z]+\b|\b[a-z]{4,}\b', text)
+        words = HASHTAG_WORD_PATTERN.findall(text)
         
         # Filter and create hashtags from significant words
         significant_words = []
         for word in words:
             word_lower = word.lower()
             # Skip common words
-            if word_lower not in ['the', 'this', 'that', 'with', 'from', 'they', 'have', 'been', 'will', 'would', 'could', 'should', 'about', 'after', 'before', 'during', 'under', 'over', 'between', 'among']:
+            if word_lower not in HASHTAG_STOP_WORDS:
                 if len(word) > 3:  # Only words longer than 3 chars
                     hashtag = '#' + word.title().replace(' ', '')
                     if hashtag not in hashtags and len(hashtag) > 1:
@@ -746,18 +1182,11 @@ CRITICAL: STRICT PRO-BJP/PRO-NDA/PRO-MODI BIAS. ALWAYS support BJP/Modi/NDA. ALW
         # Add top significant hashtags (limit to avoid spam)
         hashtags.extend(significant_words[:4])
         
-        # PRIORITY 3: Extract location/country names if present
-        # Common Indian locations/countries
-        location_patterns = [
-            r'\b(India|Delhi|Mumbai|Kolkata|Chennai|Bangalore|Hyderabad|Pune|Ahmedabad|Jaipur|Lucknow|Kanpur|Nagpur|Indore|Thane|Bhopal|Visakhapatnam|Patna|Vadodara|Ghaziabad|Ludhiana|Agra|Nashik|Faridabad|Meerut|Rajkot|Varanasi|Srinagar|Amritsar|Noida|Ranchi|Chandigarh|Howrah|Gwalior|Jodhpur|Raipur|Kota|Guwahati|Thiruvananthapuram|Solapur|Tiruchirappalli|Bareilly|Moradabad|Mysore|Tiruppur|Gurgaon|Aligarh|Jalandhar|Bhubaneswar|Salem|Warangal|Guntur|Bhiwandi|Saharanpur|Gorakhpur|Bikaner|Amravati|Noida|Bhilai|Cuttack|Firozabad|Kochi|Nellore|Bhavnagar|Dehradun|Durgapur|Asansol|Rourkela|Nanded|Kolhapur|Ajmer|Akola|Gulbarga|Jamnagar|Ujjain|Loni|Siliguri|Jhansi|Ulhasnagar|Jammu|Sangli|Miraj|Rajahmundry|Kurnool|Tumkur|Bhatpara|Kozhikode|Bardhaman|Raichur|Bilaspur|Kamarhati|Shahjahanpur|Bijapur|Rampur|Shimoga|Chandrapur|Junagadh|Trivandrum|Bardhaman|Kulti|Srikakulam|Rewa|Yamunanagar|Raigarh|Pondicherry|Panipat|Vijayawada|Katihar|Nagercoil|Karaikudi|Mangalore|Tirunelveli|Malegaon|Jamalpur|Latur|Rohtak|Sagar|Rajnandgaon|Udupi|Bongaigaon|Deoghar|Chhindwara|Ongole|Nadiad|Kanpur|Morena|Amroha|Anand|Bhind|Bhalswa|Jahangirabad|Faridabad|Rae|Bareli|Morbi|Bharatpur|Begusarai|New|Delhi|Mumbai|Kolkata|Chennai|Bangalore|Hyderabad|Pune|Ahmedabad|Jaipur|Lucknow|Kanpur|Nagpur|Indore|Thane|Bhopal|Visakhapatnam|Patna|Vadodara|Ghaziabad|Ludhiana|Agra|Nashik|Faridabad|Meerut|Rajkot|Varanasi|Srinagar|Amritsar|Noida|Ranchi|Chandigarh|Howrah|Gwalior|Jodhpur|Raipur|Kota|Guwahati|Thiruvananthapuram|Solapur|Tiruchirappalli|Bareilly|Moradabad|Mysore|Tiruppur|Gurgaon|Aligarh|Jalandhar|Bhubaneswar|Salem|Warangal|Guntur|Bhiwandi|Saharanpur|Gorakhpur|Bikaner|Amravati|Noida|Bhilai|Cuttack|Firozabad|Kochi|Nellore|Bhavnagar|Dehradun|Durgapur|Asansol|Rourkela|Nanded|Kolhapur|Ajmer|Akola|Gulbarga|Jamnagar|Ujjain|Loni|Siliguri|Jhansi|Ulhasnagar|Jammu|Sangli|Miraj|Rajahmundry|Kurnool|Tumkur|Bhatpara|Kozhikode|Bardhaman|Raichur|Bilaspur|Kamarhati|Shahjahanpur|Bijapur|Rampur|Shimoga|Chandrapur|Junagadh|Trivandrum|Bardhaman|Kulti|Srikakulam|Rewa|Yamunanagar|Raigarh|Pondicherry|Panipat|Vijayawada|Katihar|Nagercoil|Karaikudi|Mangalore|Tirunelveli|Malegaon|Jamalpur|Latur|Rohtak|Sagar|Rajnandgaon|Udupi|Bongaigaon|Deoghar|Chhindwara|Ongole|Nadiad|Kanpur|Morena|Amroha|Anand|Bhind|Bhalswa|Jahangirabad|Faridabad|Rae|Bareli|Morbi|Bharatpur|Begusarai)\b'
-        ]
-        
-        for pattern in location_patterns:
-            locations = re.findall(pattern, text, re.IGNORECASE)
-            for loc in locations[:2]:  # Max 2 location hashtags
-                loc_hashtag = '#' + loc.title().replace(' ', '')
-                if loc_hashtag not in hashtags:
-                    hashtags.append(loc_hashtag)
+        # PRIORITY 3: Extract location/country names if present (precompiled gazetteer, one pass)
+        for loc, _, _ in PLACES.find(text, limit=2):  # Max 2 location hashtags
+            loc_hashtag = '#' + loc.title().replace(' ', '')
+            if loc_hashtag not in hashtags:
+                hashtags.append(loc_hashtag)
         
         # Limit to 5-6 hashtags max
         return ' '.join(hashtags[:6]) if hashtags else '#News'
@@ -767,7 +1196,7 @@ CRITICAL: STRICT PRO-BJP/PRO-NDA/PRO-MODI BIAS. ALWAYS support BJP/Modi/NDA. ALW
         Extract key phrases from text for dynamic content generation
         """
         # Extract sentences
-        sentences = re.split(r'[.!?]+', text)
+        sentences = SENTENCE_SPLIT_PATTERN.split(text)
         
         # Extract key phrases (first 2-3 sentences or key parts)
         key_phrases = []
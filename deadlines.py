@@ -0,0 +1,57 @@
+"""
+Deadlines Module - Bounds blocking HTTP calls by the deadline of the run that started them
+
+asyncio.wait_for only stops waiting for a worker thread, the thread itself keeps running. The deadline is kept
+in a context variable (asyncio.to_thread copies it into the worker), and DeadlineAdapter caps the timeout of
+every request sent from that thread - so an abandoned fetch, upload or post gives up by the deadline too.
+"""
+import contextlib
+import contextvars
+import time
+from requests.adapters import HTTPAdapter
+
+MIN_TIMEOUT = 1.0  # A call started just before the deadline still gets this long to answer
+
+_deadline_at = contextvars.ContextVar('deadline_at', default=None)  # Epoch seconds, None = no deadline
+
+@contextlib.contextmanager
+def run_deadline(seconds):
+    """
+    with run_deadline(240): ... - HTTP calls made inside (and in threads started from inside) end by then
+    seconds: None or 0 for no deadline
+    """
+    token = _deadline_at.set(time.time() + seconds if seconds else None)
+    try:
+        yield
+    finally:
+        _deadline_at.reset(token)
+
+def request_timeout(default):
+    """
+    HTTP timeout that never runs past the current deadline
+    default: the client's own timeout - seconds, a (connect, read) tuple or None
+    """
+    deadline_at = _deadline_at.get()
+    if deadline_at is None:
+        return default
+    remaining = max(deadline_at - time.time(), MIN_TIMEOUT)
+    if isinstance(default, tuple):
+        return tuple(min(part, remaining) if part else remaining for part in default)
+    return min(default, remaining) if default else remaining
+
+class DeadlineAdapter(HTTPAdapter):
+    """
+    requests transport adapter that caps each request's timeout with request_timeout
+    (tweepy's Client sends without any timeout, so the cap can't be passed per call)
+    """
+    def send(self, request, timeout=None, **kwargs):
+        return super().send(request, timeout=request_timeout(timeout), **kwargs)
+
+def bound_session(session):
+    """
+    Mount DeadlineAdapter on a requests session for http and https, return the session
+    """
+    adapter = DeadlineAdapter()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
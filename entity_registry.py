@@ -0,0 +1,179 @@
+"""
+Entity Registry Module - Loads entity -> Twitter handle mappings from entities.json into a cached lookup index
+"""
+import json
+import os
+import pickle
+from gazetteer import Gazetteer, name_key
+
+REGISTRY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'entities.json')
+INDEX_VERSION = 2  # Bump when the cached index layout changes
+
+def normalize_alias(alias):
+    """
+    Case-folded word tokens joined by single spaces ("BYJU'S" -> "byju s"), same as text is matched
+    """
+    return ' '.join(name_key(str(alias)))
+
+class EntityRegistry:
+    def __init__(self, source_file=REGISTRY_FILE, cache_file=None):
+        """
+        source_file: JSON file {"entities": [{"name", "category", "handles", "aliases"}]}
+        cache_file: pickled lookup index, rebuilt whenever the source file changes
+        """
+        self.source_file = source_file
+        self.cache_file = cache_file or os.path.splitext(source_file)[0] + '.index.pickle'
+        self.signature = None  # (mtime_ns, size) of the source the index was built from
+        self.handles = {}  # Normalized alias -> handles
+        self.entities = {}  # Normalized alias -> entity name
+        self.matcher = Gazetteer()
+        self.refresh()
+
+    def _signature(self):
+        """
+        Identify the current source file version, None if it can't be read
+        """
+        try:
+            stat = os.stat(self.source_file)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def _load_cache(self, signature):
+        """
+        Load the prebuilt index if it was built from this version of the source file
+        """
+        if os.path.exists(self.cache_file):
+            try:
+                with open(self.cache_file, 'rb') as f:
+                    cached = pickle.load(f)
+                if cached.get('version') == INDEX_VERSION and cached.get('signature') == signature:
+                    return cached
+            except:
+                return None
+        return None
+
+    def _save_cache(self, index):
+        """
+        Save the index next to the source (written to a temp file first so readers never see half of it)
+        """
+        temp_file = f"{self.cache_file}.tmp"
+        try:
+            with open(temp_file, 'wb') as f:
+                pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_file, self.cache_file)
+        except Exception as e:
+            print(f"⚠️  Could not cache entity index: {e}")
+
+    def _build_index(self, signature):
+        """
+        Parse the source file and fold names, aliases and normalization into one lookup
+        """
+        with open(self.source_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        handles = {}
+        entities = {}
+        for entity in data.get('entities', []):
+            entity_handles = list(dict.fromkeys(entity.get('handles', [])))
+            for alias in [entity['name']] + entity.get('aliases', []):
+                key = normalize_alias(alias)
+                if not key:
+                    continue
+                if key in handles:
+                    if entities[key] != entity['name']:
+                        print(f"⚠️  Entity alias '{alias}' of {entity['name']} already belongs to {entities[key]}, ignored")
+                    continue
+                handles[key] = entity_handles
+                entities[key] = entity['name']
+
+        matcher = Gazetteer(handles)
+        return {
+            'version': INDEX_VERSION,
+            'signature': signature,
+            'handles': handles,
+            'entities': entities,
+            'index': matcher.index,
+            'source': matcher.source,
+        }
+
+    def refresh(self):
+        """
+        Reload the registry if the source file changed (one stat call otherwise)
+        Returns True if a new version was loaded
+        """
+        signature = self._signature()
+        if signature is None or signature == self.signature:
+            return False
+
+        index = self._load_cache(signature)
+        if index is None:
+            try:
+                index = self._build_index(signature)
+            except Exception as e:
+                print(f"⚠️  Could not load entity registry {self.source_file}: {e}")
+                return False
+            self._save_cache(index)
+        if self.signature is not None:
+            print(f"🔄 Reloaded entity registry ({len(index['handles'])} aliases)")
+
+        self.handles = index['handles']
+        self.entities = index['entities']
+        self.matcher = Gazetteer(index=index['index'], source=index['source'])
+        self.matcher.precompile()  # Compiling thousands of aliases takes a while - overlap it with startup
+        self.signature = signature
+        return True
+
+    def find(self, text):
+        """
+        Registry aliases in text: [(alias, start, end)] in order of appearance, longest alias wins
+        """
+        return self.matcher.find(text)
+
+    def __contains__(self, alias):
+        return normalize_alias(alias) in self.handles
+
+    def __len__(self):
+        return len(self.handles)
+
+if __name__ == '__main__':
+    # Startup cost with a cold and a warm index cache, for the real registry and a synthetic large one
+    import random
+    import re
+    import string
+    import tempfile
+    import time
+
+    def startup(source_file, cache_file):
+        re.purge()  # Don't let the re module's own cache hide the compile cost
+        start = time.perf_counter()
+        registry = EntityRegistry(source_file, cache_file)
+        loaded = time.perf_counter() - start
+        time.sleep(0.5)  # Startup work (fetching news) while the matcher compiles
+        first_match = time.perf_counter()
+        registry.find("warm up the matcher")
+        return registry, loaded, time.perf_counter() - first_match
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as workdir:
+        large_file = os.path.join(workdir, 'entities.json')
+        entities = [{'name': ' '.join(''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9)))
+                                       for _ in range(rng.randint(1, 3))),
+                     'handles': [f"@handle{n}"], 'aliases': []} for n in range(5000)]
+        with open(large_file, 'w') as f:
+            json.dump({'entities': entities}, f)
+
+        for label, source_file in (('entities.json', REGISTRY_FILE), ('synthetic', large_file)):
+            cache_file = os.path.join(workdir, f"{label}.index.pickle")
+            registry, cold, cold_compile = startup(source_file, cache_file)
+            _, warm, warm_compile = startup(source_file, cache_file)
+            print(f"{label}: {len(registry)} aliases - cold load {cold * 1000:.1f} ms, "
+                  f"cached load {warm * 1000:.1f} ms (first match after 0.5s: {warm_compile * 1000:.1f} ms)")
+
+        # Hot reload: an edited source file is picked up by refresh()
+        time.sleep(0.01)
+        entities.append({'name': 'Fresh Entity', 'handles': ['@fresh'], 'aliases': ['fresh']})
+        with open(large_file, 'w') as f:
+            json.dump({'entities': entities}, f)
+        assert registry.refresh() and registry.find("something fresh today")[0][0] == 'fresh'
+        print("hot reload ✅")
@@ -0,0 +1,172 @@
+"""
+Gazetteer Module - Finds known names (places, entities) in text with one precompiled pass
+"""
+import re
+import threading
+
+# Deduplicated Indian places/countries used for location hashtags
+# (multi-word names are single entries - "New Delhi", not "New" + "Delhi")
+INDIAN_PLACES = (
+    'India', 'Delhi', 'New Delhi', 'Mumbai', 'Kolkata', 'Chennai', 'Bangalore', 'Hyderabad', 'Pune',
+    'Ahmedabad', 'Jaipur', 'Lucknow', 'Kanpur', 'Nagpur', 'Indore', 'Thane', 'Bhopal', 'Visakhapatnam',
+    'Patna', 'Vadodara', 'Ghaziabad', 'Ludhiana', 'Agra', 'Nashik', 'Faridabad', 'Meerut', 'Rajkot',
+    'Varanasi', 'Srinagar', 'Amritsar', 'Noida', 'Ranchi', 'Chandigarh', 'Howrah', 'Gwalior', 'Jodhpur',
+    'Raipur', 'Kota', 'Guwahati', 'Thiruvananthapuram', 'Solapur', 'Tiruchirappalli', 'Bareilly',
+    'Moradabad', 'Mysore', 'Tiruppur', 'Gurgaon', 'Aligarh', 'Jalandhar', 'Bhubaneswar', 'Salem',
+    'Warangal', 'Guntur', 'Bhiwandi', 'Saharanpur', 'Gorakhpur', 'Bikaner', 'Amravati', 'Bhilai',
+    'Cuttack', 'Firozabad', 'Kochi', 'Nellore', 'Bhavnagar', 'Dehradun', 'Durgapur', 'Asansol',
+    'Rourkela', 'Nanded', 'Kolhapur', 'Ajmer', 'Akola', 'Gulbarga', 'Jamnagar', 'Ujjain', 'Loni',
+    'Siliguri', 'Jhansi', 'Ulhasnagar', 'Jammu', 'Sangli', 'Miraj', 'Rajahmundry', 'Kurnool', 'Tumkur',
+    'Bhatpara', 'Kozhikode', 'Bardhaman', 'Raichur', 'Bilaspur', 'Kamarhati', 'Shahjahanpur', 'Bijapur',
+    'Rampur', 'Shimoga', 'Chandrapur', 'Junagadh', 'Trivandrum', 'Kulti', 'Srikakulam', 'Rewa',
+    'Yamunanagar', 'Raigarh', 'Pondicherry', 'Panipat', 'Vijayawada', 'Katihar', 'Nagercoil', 'Karaikudi',
+    'Mangalore', 'Tirunelveli', 'Malegaon', 'Jamalpur', 'Latur', 'Rohtak', 'Sagar', 'Rajnandgaon', 'Udupi',
+    'Bongaigaon', 'Deoghar', 'Chhindwara', 'Ongole', 'Nadiad', 'Morena', 'Amroha', 'Anand', 'Bhind',
+    'Bhalswa', 'Jahangirabad', 'Rae Bareli', 'Morbi', 'Bharatpur', 'Begusarai',
+)
+
+# Same word definition as the regex \b the old lookup used
+TOKEN_PATTERN = re.compile(r'\w+')
+
+def fold_case(text):
+    """
+    Lowercase without changing the length, so match offsets stay valid in the original text
+    A character whose lowercase is longer ("İ" -> "i̇") keeps only the first character, as re.IGNORECASE does
+    """
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return ''.join(char.lower()[0] for char in text)
+
+def name_key(name):
+    """
+    Lookup key of a name: its case-folded word tokens
+    """
+    return tuple(TOKEN_PATTERN.findall(fold_case(name)))
+
+def _build_trie(keys):
+    """
+    Character trie of names given as token tuples ('' marks the end of a name, ' ' a token gap)
+    """
+    trie = {}
+    for key in keys:
+        node = trie
+        for char in ' '.join(key):
+            node = node.setdefault(char, {})
+        node[''] = {}
+    return trie
+
+def _trie_pattern(node):
+    """
+    Regex source for a trie node - a token gap matches any run of non-word characters, like the tokenizer
+    """
+    branches = [(r'\W+' if char == ' ' else re.escape(char)) + _trie_pattern(child)
+                for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ''
+    body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    return f'(?:{body})?' if '' in node else body
+
+class Gazetteer:
+    def __init__(self, names=(), index=None, source=None):
+        """
+        Build the lookup once: case-folded token tuple (see name_key) -> canonical name
+        index/source: a prebuilt index and its pattern source (see EntityRegistry), instead of names
+        """
+        self.index = dict(index or {})
+        for name in names:
+            key = name_key(name)
+            if key and key not in self.index:
+                self.index[key] = name
+        self._source = source
+        self._pattern = None
+        self._compile_lock = threading.Lock()
+        self.surface_forms = {}  # Matched text -> canonical name
+
+    @property
+    def source(self):
+        """
+        Regex source built from a character trie of all names: shared prefixes are tested once,
+        and the greedy optional branches make the longest name win at each position
+        """
+        if self._source is None:
+            self._source = r'\b(?:' + _trie_pattern(_build_trie(self.index)) + r')\b'
+        return self._source
+
+    @property
+    def pattern(self):
+        """
+        Compiled on first use, so loading a large prebuilt index stays cheap
+        Runs on case-folded text (re.IGNORECASE is ~4x slower)
+        """
+        if self._pattern is None:
+            with self._compile_lock:
+                if self._pattern is None:
+                    self._pattern = re.compile(self.source)
+        return self._pattern
+
+    def precompile(self):
+        """
+        Compile the pattern in a background thread (a first find() waits for it instead of compiling again)
+        """
+        threading.Thread(target=lambda: self.pattern, daemon=True).start()
+
+    def find(self, text, limit=None):
+        """
+        Return [(name, start, end)] for names in text, in order of appearance
+        Longest match wins ("New Delhi" over "Delhi"), matching is case-insensitive
+        """
+        if not self.index:
+            return []
+        found = []
+        for match in self.pattern.finditer(fold_case(text)):
+            surface = match.group()
+            name = self.surface_forms.get(surface)
+            if name is None:
+                name = self.index.get(tuple(TOKEN_PATTERN.findall(surface)))
+                if name is None:
+                    continue
+                self.surface_forms[surface] = name
+            found.append((name, match.start(), match.end()))
+            if limit and len(found) >= limit:
+                break
+        return found
+
+    def __contains__(self, name):
+        return name_key(name) in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+# Built once at import
+PLACES = Gazetteer(INDIAN_PLACES)
+
+if __name__ == '__main__':
+    # Benchmark: old per-call regex alternation (with the duplicated list) vs the gazetteer
+    import timeit
+
+    legacy_names = list(INDIAN_PLACES) * 2  # The old list repeated most cities twice
+    samples = [
+        "Modi inaugurates metro in New Delhi and Mumbai, Congress protests in Kolkata",
+        "Sensex crashes 800 points as FIIs dump banking stocks; Nifty below 22,000",
+        "Rahul Gandhi files nomination from Rae Bareli amid massive roadshow in Uttar Pradesh",
+        "Heavy rain lashes Chennai, Bangalore and Hyderabad; IMD issues orange alert for Kerala",
+        "Adani Group shares rally after Supreme Court verdict; investors cheer in Ahmedabad",
+    ] * 20
+
+    def legacy():
+        for text in samples:
+            re.findall(r'\b(' + '|'.join(legacy_names) + r')\b', text, re.IGNORECASE)[:2]
+
+    def gazetteer():
+        for text in samples:
+            PLACES.find(text, limit=2)
+
+    runs = 50
+    legacy_time = min(timeit.repeat(legacy, number=runs, repeat=3)) / (runs * len(samples))
+    gazetteer_time = min(timeit.repeat(gazetteer, number=runs, repeat=3)) / (runs * len(samples))
+    print(f"{len(legacy_names)} regex alternatives vs {len(PLACES)} gazetteer entries, {len(samples)} texts")
+    print(f"regex:     {legacy_time * 1e6:.1f} µs/text")
+    print(f"gazetteer: {gazetteer_time * 1e6:.1f} µs/text ({legacy_time / gazetteer_time:.1f}x faster)")
+    for text in samples[:5]:
+        print(f"  {[name for name, _, _ in PLACES.find(text)]} <- {text[:60]}")
@@ -0,0 +1,197 @@
+"""
+Instrumentation Module - Timing spans for run stages and external calls, and a JSON report per run
+
+Disabled unless a run is started (RUN_REPORT=<file>, main.py --report <file> or --dry-run): span() then returns a
+shared no-op object after one check, so instrumented code costs next to nothing.
+"""
+import contextvars
+import functools
+import itertools
+import threading
+import time
+from datetime import datetime
+from json_store import save_json
+
+_report = None  # Report of the run in progress, None when instrumentation is off
+_parent = contextvars.ContextVar('instrumentation_parent', default=None)  # Id of the enclosing span
+
+class _NullSpan:
+    """
+    Stand-in returned while disabled - supports the same calls and does nothing
+    """
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+NULL_SPAN = _NullSpan()
+
+class Span:
+    def __init__(self, report, name, attrs):
+        self.report = report
+        self.record = {'id': next(report.ids), 'name': name, **attrs}
+        self.start = None
+        self.token = None
+
+    def set(self, **attrs):
+        """
+        Attach attributes (status code, provider, cache hit...) to the span
+        """
+        self.record.update(attrs)
+
+    def __enter__(self):
+        self.record['parent'] = _parent.get()
+        self.record['thread'] = threading.current_thread().name
+        self.token = _parent.set(self.record['id'])
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        try:
+            _parent.reset(self.token)
+        except ValueError:
+            pass  # Exited in another context (e.g. an abandoned worker) - nothing to restore
+        self.record['start'] = round(self.start - self.report.started, 4)
+        self.record['duration'] = round(end - self.start, 4)
+        if exc_type is not None:
+            self.record['error'] = exc_type.__name__
+        self.report.add(self.record)
+        return False
+
+class RunReport:
+    def __init__(self, **fields):
+        self.started = time.perf_counter()
+        self.fields = {'started_at': datetime.now().isoformat(), **fields}
+        self.counters = {}
+        self.spans = []
+        self.ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        with self._lock:
+            self.spans.append(record)
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def stage_totals(self):
+        """
+        Total seconds per span name, slowest first
+        """
+        totals = {}
+        for record in self.spans:
+            totals[record['name']] = totals.get(record['name'], 0) + record['duration']
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+    def to_dict(self):
+        with self._lock:
+            spans = sorted(self.spans, key=lambda record: record['start'])
+            return {
+                **self.fields,
+                'duration': round(time.perf_counter() - self.started, 4),
+                'counters': dict(self.counters),
+                'totals': {name: round(seconds, 4) for name, seconds in self.stage_totals().items()},
+                'spans': spans,
+            }
+
+def start_run(**fields):
+    """
+    Start collecting spans for a run (replaces any unfinished run)
+    """
+    global _report
+    _report = RunReport(**fields)
+    return _report
+
+def finish_run(path, **fields):
+    """
+    Stop collecting and write the report to path (unless path is None), returns it as a dict
+    (None if no run was started)
+    """
+    global _report
+    report, _report = _report, None
+    if report is None:
+        return None
+    report.fields.update(fields)
+    data = report.to_dict()
+    if path is None:
+        return data
+    try:
+        save_json(path, data)
+    except Exception as e:
+        print(f"⚠️  Could not write run report: {e}")
+    return data
+
+def enabled():
+    return _report is not None
+
+def span(name, **attrs):
+    """
+    with span('newsapi.everything', query=q) as s: ...; s.set(status=200)
+    """
+    report = _report
+    if report is None:
+        return NULL_SPAN
+    return Span(report, name, attrs)
+
+def traced(name):
+    """
+    Decorator: run the function inside span(name)
+    """
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _report is None:
+                return function(*args, **kwargs)
+            with Span(_report, name, {}):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def annotate(**fields):
+    """
+    Set run-level report fields (post type, provider, skip reason...), ignored while disabled
+    """
+    report = _report
+    if report is not None:
+        report.fields.update(fields)
+
+def count(name, amount=1):
+    """
+    Bump a run-level counter (cache hits...), ignored while disabled
+    """
+    report = _report
+    if report is not None:
+        report.count(name, amount)
+
+if __name__ == '__main__':
+    # Overhead of an instrumented call with instrumentation off and on
+    import os
+    import tempfile
+    import timeit
+
+    @traced('bench.work')
+    def work():
+        return None
+
+    def spanned():
+        with span('bench.span', size=1) as s:
+            s.set(status=200)
+
+    runs = 200000
+    plain = min(timeit.repeat(lambda: None, number=runs, repeat=3)) / runs
+    off_traced = min(timeit.repeat(work, number=runs, repeat=3)) / runs
+    off_span = min(timeit.repeat(spanned, number=runs, repeat=3)) / runs
+    start_run(bench=True)
+    on_runs = 20000
+    on_span = min(timeit.repeat(spanned, number=on_runs, repeat=3)) / on_runs
+    with tempfile.TemporaryDirectory() as workdir:
+        data = finish_run(os.path.join(workdir, 'report.json'))
+    assert not enabled() and data['spans'][0]['name'] == 'bench.span'
+    print(f"call overhead - disabled: traced {(off_traced - plain) * 1e9:.0f} ns, span {(off_span - plain) * 1e9:.0f} ns; "
+          f"enabled: span {(on_span - plain) * 1e6:.2f} µs")
@@ -0,0 +1,39 @@
+"""
+JSON Store Module - Crash-safe writes for the bot's JSON state files
+"""
+import json
+import os
+import tempfile
+
+def save_json(path, data, indent=2):
+    """
+    Write data as JSON so that path always holds either the old or the new version:
+    write a temp file in the same directory, fsync it, then atomically rename it over path
+    (a long-running bot killed mid-write would otherwise leave a truncated file, which loads as empty)
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+    # Persist the rename itself (not supported on every platform)
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
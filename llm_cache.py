@@ -0,0 +1,127 @@
+"""
+LLM Cache Module - Disk-backed cache of LLM responses keyed by provider, model, prompts and params
+"""
+import json
+import os
+import time
+import hashlib
+import threading
+from json_store import save_json
+
+class LLMCache:
+    def __init__(self, storage_file='llm_cache.json', ttl_hours=None, max_entries=None):
+        self.storage_file = storage_file
+        self.ttl = float(ttl_hours if ttl_hours is not None else os.getenv('LLM_CACHE_TTL_HOURS', '24')) * 60 * 60
+        self.max_entries = int(max_entries if max_entries is not None else os.getenv('LLM_CACHE_MAX_ENTRIES', '500'))
+        self.entries = self._load_entries()
+        self._lock = threading.Lock()
+        self._dirty = False  # Entries changed since the last flush()
+
+        # Counters for this process
+        self.hits = 0
+        self.misses = 0
+        self.latency_saved = 0.0  # Seconds of LLM latency avoided by hits
+
+    def _load_entries(self):
+        """
+        Load cached responses from file
+        """
+        if os.path.exists(self.storage_file):
+            try:
+                with open(self.storage_file, 'r') as f:
+                    return json.load(f)
+            except:
+                return {}
+        return {}
+
+    def _save_entries(self):
+        """
+        Save cached responses to file
+        """
+        try:
+            save_json(self.storage_file, self.entries)
+        except Exception as e:
+            print(f"Error saving LLM cache: {e}")
+
+    @staticmethod
+    def _normalize(text):
+        """
+        Normalize a prompt so whitespace-only differences share a cache entry
+        """
+        return " ".join((text or "").split())
+
+    def make_key(self, provider, model, system_prompt, prompt, params=None):
+        """
+        Cache key: hash of (provider, model, normalized system prompt, normalized prompt, params)
+        """
+        raw = json.dumps([
+            provider,
+            model,
+            self._normalize(system_prompt),
+            self._normalize(prompt),
+            params or {}
+        ], sort_keys=True)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key):
+        """
+        Return the cached response for key, or None on miss / expired entry
+        """
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry and time.time() - entry['created_at'] <= self.ttl:
+                entry['last_used'] = time.time()
+                self.hits += 1
+                self.latency_saved += entry.get('latency', 0.0)
+                return entry['response']
+            if entry:
+                del self.entries[key]  # Expired
+            self.misses += 1
+            return None
+
+    def set(self, key, response, latency=0.0):
+        """
+        Store a response (latency = seconds the LLM call took, counted as saved on later hits)
+        Evicts least recently used entries beyond max_entries
+        """
+        with self._lock:
+            now = time.time()
+            self.entries[key] = {
+                'response': response,
+                'latency': round(latency, 3),
+                'created_at': now,
+                'last_used': now
+            }
+            if len(self.entries) > self.max_entries:
+                by_age = sorted(self.entries, key=lambda k: self.entries[k]['last_used'])
+                for old_key in by_age[:len(self.entries) - self.max_entries]:
+                    del self.entries[old_key]
+            self._dirty = True
+
+    def invalidate(self, key):
+        """
+        Drop one cached response (e.g. the tweet it produced was rejected as a duplicate)
+        """
+        with self._lock:
+            if self.entries.pop(key, None) is not None:
+                self._dirty = True
+
+    def flush(self):
+        """
+        Write the entries to disk if they changed - once per run, so no LLM call waits for a synced write
+        """
+        with self._lock:
+            if self._dirty:
+                self._save_entries()
+                self._dirty = False
+
+    def stats(self):
+        """
+        Hit/miss counters for this process
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self.entries),
+            'latency_saved': round(self.latency_saved, 2)
+        }
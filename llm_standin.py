@@ -0,0 +1,384 @@
+"""
+LLM Stand-in Module - Local fake of the OpenAI, Groq and Hugging Face APIs for offline benchmarks and tests
+
+Serves the request shapes ContentGenerator uses, on one port:
+  /openai/v1/chat/completions        (OPENAI_BASE_URL=<url>/openai/v1)
+  /groq/openai/v1/chat/completions   (GROQ_BASE_URL=<url>/groq)
+  /hf/models/<model>                 (HUGGINGFACE_BASE_URL=<url>/hf)
+Latency, error rates and completions are configurable per provider, and every answer is
+derived from the seed and the request body, so the same run gives the same results.
+"""
+import json
+import random
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Path prefix -> provider name used by ContentGenerator / ProviderHealth
+ROUTES = {'openai': 'openai', 'groq': 'groq', 'hf': 'huggingface'}
+
+# Tweets returned when no completions file is given (~230 characters, complete sentences)
+DEFAULT_COMPLETIONS = [
+    "Markets opened lower today as investors weighed fresh inflation data against strong earnings. Banking stocks "
+    "led the slide while IT held steady. Traders now expect a volatile week ahead of the policy meeting. #Markets",
+    "The monsoon session kicked off with sharp exchanges over the new data protection bill. Opposition leaders "
+    "walked out twice before lunch. Expect long nights in Parliament as both sides dig in on key clauses. #Politics",
+    "A record crowd turned up for the metro inauguration, with commuters cheering the first train out of the "
+    "station. Officials promise the next phase by December. Let's see if the deadline holds this time. #Infra",
+    "Startup funding picked up again this quarter, led by fintech and climate deals. Founders say investors are "
+    "asking harder questions on profits, but cheques are getting signed. A healthier market, if a slower one. #Startups",
+    "Heavy rain flooded several low-lying areas overnight and schools stay shut today. Civic teams are pumping out "
+    "water and clearing drains. Residents want lasting fixes, not just another round of emergency work. #Monsoon",
+    "The central bank kept rates unchanged but sounded more hawkish on food prices. Bond yields ticked up within "
+    "minutes of the statement. Borrowers hoping for cheaper loans may have to wait a few more months. #Economy",
+]
+
+# Default behaviour per provider: latency in seconds, error rates by status code, delay between streamed tokens
+DEFAULT_PROFILES = {
+    'openai': {'latency': 'lognormal:0.8:0.35', 'errors': {}, 'token_delay': 0.01},
+    'groq': {'latency': 'lognormal:0.3:0.3', 'errors': {}, 'token_delay': 0.002},
+    'huggingface': {'latency': 'lognormal:1.5:0.5', 'errors': {}, 'token_delay': 0},
+}
+
+def parse_latency(spec):
+    """
+    Parse a latency distribution: fixed:S, uniform:LOW:HIGH, normal:MEAN:STDDEV or lognormal:MEDIAN:SIGMA
+    Returns a function rng -> seconds (never negative)
+    """
+    kind, _, args = str(spec).partition(':')
+    values = [float(value) for value in args.split(':') if value]
+    if kind == 'fixed' or (not values and kind.replace('.', '', 1).isdigit()):
+        seconds = values[0] if values else float(kind)
+        return lambda rng: seconds
+    if kind == 'uniform':
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == 'normal':
+        return lambda rng: max(rng.gauss(values[0], values[1]), 0.0)
+    if kind == 'lognormal':
+        median, sigma = values[0], values[1]
+        return lambda rng: median * rng.lognormvariate(0, sigma)
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+def parse_errors(spec):
+    """
+    Parse error rates like "429:0.2,503:0.1" into {429: 0.2, 503: 0.1}
+    """
+    errors = {}
+    for item in str(spec or '').split(','):
+        if item.strip():
+            status, _, rate = item.partition(':')
+            errors[int(status)] = float(rate)
+    return errors
+
+def _error_body(provider, status, model):
+    """
+    Error payload in the provider's own format (the texts classify_error looks for)
+    """
+    if provider == 'huggingface':
+        messages = {401: "Invalid credentials in Authorization header", 429: "Rate limit reached. Please slow down",
+                    503: f"Model {model} is currently loading"}
+        body = {'error': messages.get(status, 'Internal error')}
+        if status == 503:
+            body['estimated_time'] = 20.0
+        return body
+    messages = {401: ("Incorrect API key provided: stand-in", 'invalid_api_key'),
+                429: ("Rate limit reached for requests", 'rate_limit_exceeded'),
+                503: ("The model is currently loading or overloaded", 'service_unavailable')}
+    message, code = messages.get(status, ("Internal server error", 'server_error'))
+    return {'error': {'message': message, 'type': 'invalid_request_error' if status == 401 else 'requests',
+                      'param': None, 'code': code}}
+
+class StandinServer:
+    def __init__(self, host='127.0.0.1', port=0, profiles=None, seed=0, completions=None):
+        """
+        profiles: {provider: {'latency': spec, 'errors': {status: rate}, 'token_delay': seconds}},
+                  merged over DEFAULT_PROFILES
+        seed: makes latencies, injected errors and completion choice reproducible
+        completions: canned tweet texts (DEFAULT_COMPLETIONS if empty)
+        """
+        self.host = host
+        self.port = port
+        self.seed = seed
+        self.completions = list(completions or DEFAULT_COMPLETIONS)
+        self.profiles = {}
+        for provider, defaults in DEFAULT_PROFILES.items():
+            profile = dict(defaults, **(profiles or {}).get(provider, {}))
+            profile['sample_latency'] = parse_latency(profile['latency'])
+            self.profiles[provider] = profile
+        self.counts = {}  # {provider: {status: requests}}
+        self._seen = {}  # Request body hash -> times seen (repeats get a different roll)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def env(self):
+        """
+        Environment variables that point ContentGenerator at this server (set them before creating it)
+        """
+        return {
+            'OPENAI_API_KEY': 'standin', 'OPENAI_BASE_URL': f"{self.url}/openai/v1",
+            'GROQ_API_KEY': 'standin', 'GROQ_BASE_URL': f"{self.url}/groq",
+            'HUGGINGFACE_API_KEY': 'standin', 'HUGGINGFACE_BASE_URL': f"{self.url}/hf",
+        }
+
+    def start(self):
+        """
+        Serve in a background thread, returns self
+        """
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler_class())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stats(self):
+        """
+        Requests served per provider and status code
+        """
+        with self._lock:
+            return {provider: dict(statuses) for provider, statuses in self.counts.items()}
+
+    def _count(self, provider, status):
+        with self._lock:
+            statuses = self.counts.setdefault(provider, {})
+            statuses[status] = statuses.get(status, 0) + 1
+
+    def _rng(self, provider, body):
+        """
+        Random generator seeded from the request, so results don't depend on thread timing
+        """
+        digest = hashlib.sha256(body).hexdigest()
+        with self._lock:
+            repeat = self._seen.get(digest, 0)
+            self._seen[digest] = repeat + 1
+        seed = hashlib.sha256(f"{self.seed}|{provider}|{digest}|{repeat}".encode()).hexdigest()
+        return random.Random(int(seed[:16], 16))
+
+    def _injected_error(self, provider, rng):
+        """
+        Status code to fail with (None for success)
+        """
+        roll = rng.random()
+        for status, rate in sorted(self.profiles[provider]['errors'].items()):
+            if roll < rate:
+                return status
+            roll -= rate
+        return None
+
+    def _completion(self, prompt, rng):
+        """
+        Canned tweet text - several versions separated by --- when the prompt asks for them
+        """
+        versions = 1
+        marker = 'Write '
+        if 'DIFFERENT versions' in prompt and marker in prompt:
+            count = prompt.rsplit(marker, 1)[1].split(' ', 1)[0]
+            versions = int(count) if count.isdigit() else 1
+        picks = [rng.choice(self.completions) for _ in range(versions)]
+        return '\n---\n'.join(picks)
+
+    def _handler_class(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass  # Keep benchmark output clean
+
+            def _send_json(self, status, body, headers=None):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path.rstrip('/') == '/stats':
+                    self._send_json(200, standin.stats())
+                else:
+                    self._send_json(404, {'error': 'not found'})
+
+            def do_POST(self):
+                raw = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                prefix, _, rest = self.path.lstrip('/').partition('/')
+                provider = ROUTES.get(prefix)
+                if provider in ('openai', 'groq') and rest.endswith('chat/completions'):
+                    handle = self._chat_completion
+                elif provider == 'huggingface' and rest.startswith('models/'):
+                    handle = self._hf_generation
+                else:
+                    self._send_json(404, {'error': f"unknown route {self.path}"})
+                    return
+                try:
+                    request = json.loads(raw or b'{}')
+                except ValueError:
+                    self._send_json(400, {'error': 'invalid JSON body'})
+                    return
+
+                rng = standin._rng(provider, raw)
+                profile = standin.profiles[provider]
+                time.sleep(profile['sample_latency'](rng))
+                status = standin._injected_error(provider, rng)
+                if status:
+                    standin._count(provider, status)
+                    headers = {'Retry-After': '1'} if status == 429 else None
+                    self._send_json(status, _error_body(provider, status, rest[len('models/'):]), headers)
+                    return
+                try:
+                    handle(request, rest, rng, profile)
+                    standin._count(provider, 200)
+                except (BrokenPipeError, ConnectionResetError):
+                    standin._count(provider, 'disconnected')  # Client stopped reading (stream cut / hedge lost)
+
+            def _chat_completion(self, request, route, rng, profile):
+                prompt = '\n'.join(str(message.get('content', '')) for message in request.get('messages', []))
+                texts = [standin._completion(prompt, rng) for _ in range(int(request.get('n') or 1))]
+                created = int(time.time())
+                completion_id = f"chatcmpl-standin{rng.getrandbits(32):08x}"
+                model = request.get('model', 'standin')
+                usage = {'prompt_tokens': len(prompt) // 4,
+                         'completion_tokens': sum(len(text.split()) for text in texts)}
+                usage['total_tokens'] = usage['prompt_tokens'] + usage['completion_tokens']
+
+                if not request.get('stream'):
+                    choices = [{'index': index, 'message': {'role': 'assistant', 'content': text},
+                                'finish_reason': 'stop', 'logprobs': None} for index, text in enumerate(texts)]
+                    self._send_json(200, {'id': completion_id, 'object': 'chat.completion', 'created': created,
+                                          'model': model, 'choices': choices, 'usage': usage})
+                    return
+
+                # Server-sent events, one word per chunk, choices interleaved like the real API
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Cache-Control', 'no-cache')
+                self.send_header('Connection', 'close')
+                self.end_headers()
+                self.close_connection = True
+
+                def event(choices, extra=None):
+                    chunk = {'id': completion_id, 'object': 'chat.completion.chunk', 'created': created,
+                             'model': model, 'choices': choices}
+                    chunk.update(extra or {})
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                    self.wfile.flush()
+
+                words = [[word + ' ' for word in text.split(' ')] for text in texts]
+                for tokens in words:
+                    tokens[-1] = tokens[-1].rstrip(' ')
+                for position in range(max(len(tokens) for tokens in words)):
+                    event([{'index': index, 'delta': {'content': tokens[position]}, 'finish_reason': None}
+                           for index, tokens in enumerate(words) if position < len(tokens)])
+                    if profile['token_delay']:
+                        time.sleep(profile['token_delay'])
+                event([{'index': index, 'delta': {}, 'finish_reason': 'stop'} for index in range(len(texts))])
+                if (request.get('stream_options') or {}).get('include_usage'):
+                    event([], {'usage': usage})
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+
+            def _hf_generation(self, request, route, rng, profile):
+                prompt = str(request.get('inputs', ''))
+                text = standin._completion(prompt, rng)
+                parameters = request.get('parameters') or {}
+                if not parameters.get('return_full_text', True):
+                    self._send_json(200, [{'generated_text': text}])
+                else:
+                    self._send_json(200, [{'generated_text': f"{prompt}{text}"}])
+
+        return Handler
+
+def _bench(server, runs):
+    """
+    Run funky tweet generation against the stand-in and print latency and provider stats
+    """
+    import os
+    import tempfile
+    for name, value in server.env().items():
+        os.environ[name] = value
+    from content_generator import ContentGenerator
+    from provider_health import ProviderHealth
+
+    generator = ContentGenerator(use_cache=False)
+    with tempfile.TemporaryDirectory() as workdir:  # Keeps the measured health out of the real state file
+        generator.health = ProviderHealth(storage_file=os.path.join(workdir, 'provider_health.json'))
+        article = {
+            'title': "Sensex tanks 900 points as global selloff hits banking stocks",
+            'description': "Benchmark indices fell sharply on Monday as foreign investors pulled out of banking and IT.",
+            'url': 'https://example.com/sensex',
+        }
+        timings = []
+        providers = {}
+        for _ in range(runs):
+            start = time.time()
+            generator.generate_funky_candidates(article, ['#Sensex', '#StockMarket'], is_stock_market=True)
+            timings.append(time.time() - start)
+            providers[generator.last_provider] = providers.get(generator.last_provider, 0) + 1
+        timings.sort()
+        print(f"\n⏱️  {runs} generations: p50 {timings[len(timings) // 2]:.3f}s, "
+              f"p90 {timings[int(len(timings) * 0.9) - 1 if runs >= 10 else -1]:.3f}s, max {timings[-1]:.3f}s")
+        print(f"   Won by: {providers}")
+        print(f"   Stand-in requests: {server.stats()}")
+        for row in generator.get_provider_report():
+            print(f"   {row['provider']}: {row['latency']}s avg, {int(row['success_rate'] * 100)}% valid, {row['calls']} call(s)")
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Offline stand-in for the OpenAI, Groq and Hugging Face APIs")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--latency', action='append', default=[], metavar='PROVIDER=SPEC',
+                        help="e.g. openai=lognormal:0.8:0.35, groq=fixed:0.2, huggingface=uniform:1:3")
+    parser.add_argument('--errors', action='append', default=[], metavar='PROVIDER=RATES',
+                        help="e.g. groq=429:0.2,503:0.1, openai=401:1")
+    parser.add_argument('--token-delay', action='append', default=[], metavar='PROVIDER=SECONDS')
+    parser.add_argument('--completions', help="JSON file with a list of canned tweet texts")
+    parser.add_argument('--bench', type=int, metavar='N', help="run N generations against the stand-in and exit")
+    args = parser.parse_args()
+
+    profiles = {}
+    for option, key, convert in ((args.latency, 'latency', str), (args.errors, 'errors', parse_errors),
+                                 (args.token_delay, 'token_delay', float)):
+        for item in option:
+            provider, _, value = item.partition('=')
+            profiles.setdefault(provider, {})[key] = convert(value)
+    completions = None
+    if args.completions:
+        with open(args.completions, 'r') as f:
+            completions = json.load(f)
+
+    server = StandinServer(args.host, 0 if args.bench else args.port, profiles, args.seed, completions).start()
+    if args.bench:
+        _bench(server, args.bench)
+        server.stop()
+    else:
+        print(f"🧪 LLM stand-in listening on {server.url}")
+        for name, value in server.env().items():
+            print(f"export {name}={value}")
+        try:
+            server._thread.join()
+        except KeyboardInterrupt:
+            server.stop()
@@ -0,0 +1,85 @@
+"""
+LLM Stream Module - Consumes streamed chat completions and stops once the tweets are long enough
+"""
+import re
+import time
+
+SENTENCE_END_PATTERN = re.compile(r'[.!?…]["\')\]]*\s*$')
+SEPARATOR_LINE_PATTERN = re.compile(r'^\s*-{3,}\s*$', re.MULTILINE)
+STOP_RATIO = 0.85  # A sentence ending past this share of the character budget is good enough
+OVERRUN_MARGIN = 20  # text_utils only looks a few characters past the budget when cutting
+
+class StreamCollector:
+    def __init__(self, choices=1, segments=1, max_length=280):
+        """
+        choices: completions streamed in parallel (OpenAI n parameter)
+        segments: tweets expected inside each completion (multi-output prompt separated by ---)
+        max_length: character budget of one tweet
+        """
+        self.choices = choices
+        self.segments = segments
+        self.max_length = max_length
+        self.buffers = {}
+        self.finished = set()
+        self.start = time.time()
+        self.first_token_at = None
+        self.chunks = 0  # Content deltas received (about one token each)
+        self.completion_tokens = None  # Exact count when the API reports usage
+        self.stopped_early = False
+
+    def _segment_done(self, segment):
+        """
+        True once a tweet can't get any better: a sentence ends near the budget, or it's past the budget
+        """
+        segment = segment.strip()
+        if len(segment) >= self.max_length + OVERRUN_MARGIN:
+            return True
+        return len(segment) >= self.max_length * STOP_RATIO and bool(SENTENCE_END_PATTERN.search(segment))
+
+    def _choice_done(self, index):
+        if index in self.finished:
+            return True
+        parts = SEPARATOR_LINE_PATTERN.split(self.buffers.get(index, ''))
+        return len(parts) >= self.segments and self._segment_done(parts[-1])
+
+    def feed(self, chunk):
+        """
+        Add one streamed chunk, returns True when the rest of the stream is not needed
+        """
+        usage = getattr(chunk, 'usage', None)
+        if usage is not None and getattr(usage, 'completion_tokens', None) is not None:
+            self.completion_tokens = usage.completion_tokens
+
+        for choice in getattr(chunk, 'choices', None) or []:
+            content = getattr(choice.delta, 'content', None)
+            if content:
+                if self.first_token_at is None:
+                    self.first_token_at = time.time()
+                self.chunks += 1
+                self.buffers[choice.index] = self.buffers.get(choice.index, '') + content
+            if getattr(choice, 'finish_reason', None):
+                self.finished.add(choice.index)
+
+        if len(self.finished) >= self.choices:
+            return False  # Finished normally - read the remaining (usage) chunks
+        if all(self._choice_done(index) for index in range(self.choices)):
+            self.stopped_early = True
+            return True
+        return False
+
+    def texts(self):
+        """
+        Streamed text of each completion, in choice order
+        """
+        return [self.buffers[index].strip() for index in sorted(self.buffers)]
+
+    def stats(self):
+        """
+        Time to first token, total time and tokens received
+        """
+        return {
+            'ttft': round(self.first_token_at - self.start, 3) if self.first_token_at else None,
+            'elapsed': round(time.time() - self.start, 3),
+            'tokens': self.completion_tokens if self.completion_tokens is not None else self.chunks,
+            'stopped_early': self.stopped_early
+        }
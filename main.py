@@ -4,8 +4,12 @@ Fetches latest Indian political and stock market news and posts controversial fu
 """
 import sys
 import os
+import asyncio
 import random
 import hashlib
+import signal
+import threading
+import time
 from datetime import datetime
 import pytz
 from news_fetcher import NewsFetcher
@@ -13,6 +17,9 @@ from content_generator import ContentGenerator
 from twitter_poster import TwitterPoster
 from news_tracker import NewsTracker
 from mention_handler import MentionHandler
+from outbox import TweetOutbox
+from deadlines import run_deadline
+from instrumentation import annotate, finish_run, span, start_run, traced
 
 class TwitterAutomation:
     def __init__(self):
@@ -21,9 +28,29 @@ class TwitterAutomation:
         self.twitter_poster = TwitterPoster()
         self.news_tracker = NewsTracker()
         self.mention_handler = MentionHandler()
+        self.outbox = TweetOutbox()
         self.post_counter = 0  # Track post count for alternating
         self.ist = pytz.timezone('Asia/Kolkata')  # IST timezone
+        # Run posts through the async pipeline (apost_tweet) instead of post_tweet (ASYNC_PIPELINE=1 or --async)
+        self.use_async = os.getenv('ASYNC_PIPELINE', '0') == '1'
+        # Per-stage timings, provider and outcome of each run are written here as JSON (RUN_REPORT or --report)
+        self.report_file = os.getenv('RUN_REPORT') or None
+        # Run every stage without posting or tracking anything (DRY_RUN=1 or --dry-run)
+        self.dry_run = os.getenv('DRY_RUN', '0') == '1'
         
+    @property
+    def dry_run(self):
+        """
+        Dry run: trends, news, generation and the image download run for real, the media upload
+        (unless DRY_RUN_UPLOAD=1) and create_tweet are stubbed, nothing is marked as posted or queued,
+        and the per-stage timings are printed after each run
+        """
+        return self.twitter_poster.dry_run
+    
+    @dry_run.setter
+    def dry_run(self, value):
+        self.twitter_poster.dry_run = value
+    
     def _get_post_type(self):
         """
         Randomly select post type (politics, stock_market, or trending)
@@ -53,21 +80,345 @@ class TwitterAutomation:
         else:
             return 'trending'
     
+    @traced('stage.outbox')
+    def retry_outbox(self, max_posts=1):
+        """
+        Retry queued tweets whose backoff has expired
+        Returns number of queued tweets posted
+        """
+        if self.dry_run:
+            # A stubbed post would count as sent and drop the queued tweet
+            if len(self.outbox):
+                print(f"📮 Outbox: {len(self.outbox)} queued tweet(s) left for a real run (dry run)")
+            return 0
+        
+        due = self.outbox.due_entries()
+        if not due:
+            if len(self.outbox):
+                print(f"📮 Outbox: {len(self.outbox)} queued tweet(s), none due yet")
+            return 0
+        
+        if self.twitter_poster.rate_limits.is_exhausted('create_tweet'):
+            print(f"📮 Outbox: {len(due)} queued tweet(s) due, but tweet rate limit is exhausted")
+            return 0
+        
+        print(f"\n📮 Outbox: {len(due)} queued tweet(s) due for retry")
+        posted = 0
+        for entry in due:
+            if posted >= max_posts:
+                break
+            article = entry['article']
+            
+            posted_ids = entry.get('posted_ids') or []
+            
+            # Another run may have covered this story in the meantime
+            # (a half-posted thread is always finished instead)
+            if not posted_ids and self.news_tracker.is_already_posted(article['url'], article['title'], entry['tweet_text'], article['description']):
+                print(f"🗑️  Dropping outbox tweet {entry['id']} (already covered)")
+                self.outbox.mark_sent(entry['id'])
+                continue
+            
+            print(f"🔁 Retrying outbox tweet {entry['id']} (attempt {entry['attempts'] + 1})...")
+            if entry.get('thread_parts'):
+                success, posted_ids = self.twitter_poster.post_thread(
+                    entry['thread_parts'],
+                    image_urls=entry.get('image_urls'),
+                    posted_ids=posted_ids
+                )
+                tweet_id = posted_ids[0] if posted_ids else None
+            else:
+                success, tweet_id = self.twitter_poster.post_tweet(entry['tweet_text'], image_url=entry['image_url'])
+            if success:
+                self.news_tracker.mark_as_posted(
+                    article['url'],
+                    article['title'],
+                    tweet_id,
+                    entry['tweet_text'],
+                    article['description']
+                )
+                self.outbox.mark_sent(entry['id'])
+                print(f"✅ Outbox tweet posted: https://twitter.com/i/web/status/{tweet_id}")
+                posted += 1
+                self.post_counter += 1
+            else:
+                self.outbox.mark_failed(
+                    entry['id'],
+                    self.twitter_poster.retry_after,
+                    self.twitter_poster.last_error,
+                    posted_ids=posted_ids if entry.get('thread_parts') else None
+                )
+                if self.twitter_poster.last_error == 'rate_limit':
+                    # Every other retry would hit the same limit
+                    break
+        return posted
+    
     def post_tweet(self, force_post=False):
         """
         Main function to fetch news, generate tweet, and post
         Always posts (skip logic removed for 48 tweets/day)
         force_post: Kept for compatibility but no longer needed (always posts)
         """
+        current_time = self._print_run_header(force_post)
+        
+        # Previously generated tweets that failed to post take precedence over new content
+        if self.retry_outbox(max_posts=1):
+            print("\n✅ Posted a queued tweet from the outbox this run")
+            annotate(outcome='posted_from_outbox')
+            return
+        
+        # Always post - randomly select post type
+        post_type_enum, post_type = self._select_post_type()
+        
+        # STEP 1: Fetch trending topics FIRST (always needed)
+        trending_topics = self._fetch_trends()
+        
+        # STEP 2: Handle different post types
+        if post_type_enum == 'trending':
+            # For trending posts, create tweet directly from trending topics
+            trending_topic_to_post = self._select_trend(trending_topics, current_time, post_type)
+            if not trending_topic_to_post:
+                return
+            
+            # Generate controversial candidate tweets about trending topic (best first)
+            print(f"\n🤖 Generating CONTROVERSIAL, funky tweet about trending topic...")
+            with span('stage.generate'):
+                candidates = self.content_generator.generate_trending_candidates(
+                    trending_topic_to_post,
+                    trending_topics,
+                    similarity=self.news_tracker.tweet_similarity
+                )
+            article_summary, trend_mention_context = self._trend_summary(trending_topic_to_post)
+            
+        else:
+            # For politics and stock market, fetch news articles
+            articles = self._fetch_articles(post_type_enum)
+            
+            # STEP 3-4: Prioritize by trends and find an article that hasn't been posted
+            article_summary = self._select_article(articles, trending_topics, current_time, post_type)
+            if not article_summary:
+                return
+            
+            # STEP 5: Generate controversial funky candidate tweets with TRENDING PRIORITY (best first)
+            print(f"\n🤖 Generating CONTROVERSIAL, funky tweet with TRENDING hashtags...")
+            with span('stage.generate'):
+                candidates = self.content_generator.generate_funky_candidates(
+                    article_summary, 
+                    trending_topics, 
+                    is_stock_market=(post_type_enum == 'stock_market'),
+                    similarity=self.news_tracker.tweet_similarity
+                )
+            trend_mention_context = None
+        
+        # STEP 6-7: Mentions and the final duplicate check
+        tweet_text = self._pick_candidate(candidates, post_type_enum, article_summary, trend_mention_context,
+                                          current_time, post_type)
+        if tweet_text is None:
+            return
+        
+        # Post to Twitter with image if available
+        print("\n🐦 Posting to Twitter...")
+        image_url = self._image_url(article_summary)
+        with span('stage.post'):
+            success, tweet_id = self.twitter_poster.post_tweet(tweet_text, image_url=image_url)
+        self._record_post(success, tweet_id, tweet_text, image_url, article_summary, current_time, post_type)
+    
+    async def apost_tweet(self, force_post=False, deadline=None):
+        """
+        post_tweet as an async task graph - same steps, decisions and output:
+        - trends and news are fetched concurrently (news for politics/stock posts)
+        - the article image is downloaded and uploaded while the tweet is being generated
+        - every external call shares one run deadline (RUN_DEADLINE seconds, default 240):
+          a fetch that misses it counts as nothing found, generation falls back to templates,
+          a late image is left out, and a tweet that can't be posted in time goes to the outbox
+        Posting calls are never abandoned halfway - they only start while time is left
+        The deadline also caps the HTTP timeout of every blocking client call (see deadlines.py),
+        so threads whose result was abandoned end by then too and the run's wall time stays bounded
+        """
+        if deadline is None:
+            deadline = float(os.getenv('RUN_DEADLINE', '240'))
+        with run_deadline(deadline):
+            await self._apost_tweet(force_post, deadline)
+    
+    async def _apost_tweet(self, force_post, deadline):
+        """
+        apost_tweet's task graph, run inside the deadline's context
+        """
+        loop = asyncio.get_running_loop()
+        deadline_at = loop.time() + deadline
+        
+        def remaining():
+            return deadline_at - loop.time()
+        
+        async def call(label, function, *args, default=None):
+            # Blocking client call in a worker thread, abandoned at the run deadline. wait_for only stops
+            # waiting for the result - the thread keeps running until its HTTP timeout, which
+            # run_deadline caps at the same deadline
+            if remaining() <= 0:
+                print(f"⏱️  Run deadline passed, skipping {label}")
+                annotate(deadline_missed=label)
+                return default
+            try:
+                return await asyncio.wait_for(asyncio.to_thread(function, *args), remaining())
+            except asyncio.TimeoutError:
+                print(f"⏱️  {label} didn't finish within the run deadline ({deadline:g}s)")
+                annotate(deadline_missed=label)
+                return default
+        
+        async def generate(agenerate, *args, **kwargs):
+            # The provider chain falls back to templates at its deadline - cap it at the run deadline
+            configured = self.content_generator.generation_deadline
+            with span('stage.generate'):
+                return await agenerate(*args, similarity=self.news_tracker.tweet_similarity,
+                                       deadline=max(min(configured or remaining(), remaining()), 0.001), **kwargs)
+        
+        current_time = self._print_run_header(force_post)
+        
+        if await asyncio.to_thread(self.retry_outbox, 1):
+            print("\n✅ Posted a queued tweet from the outbox this run")
+            annotate(outcome='posted_from_outbox')
+            return
+        
+        post_type_enum, post_type = self._select_post_type()
+        
+        # STEP 1-2: Trends and news are independent - fetch them at the same time
+        trends_task = asyncio.create_task(call('trend fetch', self._fetch_trends, default=[]))
+        if post_type_enum == 'trending':
+            trending_topics = await trends_task
+            trending_topic_to_post = self._select_trend(trending_topics, current_time, post_type)
+            if not trending_topic_to_post:
+                return
+            
+            print(f"\n🤖 Generating CONTROVERSIAL, funky tweet about trending topic...")
+            candidates = await generate(self.content_generator.agenerate_trending_candidates,
+                                        trending_topic_to_post, trending_topics)
+            article_summary, trend_mention_context = self._trend_summary(trending_topic_to_post)
+            image_url, media_task = None, None
+        
+        else:
+            articles_task = asyncio.create_task(call('news fetch', self._fetch_articles, post_type_enum, default=[]))
+            trending_topics, articles = await asyncio.gather(trends_task, articles_task)
+            
+            article_summary = self._select_article(articles, trending_topics, current_time, post_type)
+            if not article_summary:
+                return
+            
+            # STEP 5: Image download/upload overlaps generation
+            image_url = self._image_url(article_summary)
+            media_task = None
+            if image_url:
+                media_task = asyncio.create_task(call('image upload', self.twitter_poster.prepare_media, image_url))
+            
+            print(f"\n🤖 Generating CONTROVERSIAL, funky tweet with TRENDING hashtags...")
+            candidates = await generate(self.content_generator.agenerate_funky_candidates, article_summary,
+                                        trending_topics, is_stock_market=(post_type_enum == 'stock_market'))
+            trend_mention_context = None
+        
+        tweet_text = self._pick_candidate(candidates, post_type_enum, article_summary, trend_mention_context,
+                                          current_time, post_type)
+        if tweet_text is None:
+            if media_task:
+                media_task.cancel()  # The uploaded image won't be used
+            return
+        media_id = None
+        if media_task:
+            with span('stage.media_wait'):
+                media_id = await media_task
+        if image_url and not media_id:
+            image_url = None  # Upload failed or missed the deadline - post without it
+        
+        if remaining() <= 0:
+            # Too late to post safely this run - keep the tweet for the next one
+            print(f"\n⏱️  Run deadline ({deadline:g}s) passed before posting")
+            annotate(deadline_missed='post')
+            self.twitter_poster.last_error = 'deadline'
+            self.twitter_poster.retry_after = None
+            success, tweet_id = False, None
+        else:
+            print("\n🐦 Posting to Twitter...")
+            with span('stage.post'):
+                success, tweet_id = await asyncio.to_thread(self.twitter_poster.post_tweet, tweet_text,
+                                                            image_url, media_id)
+        self._record_post(success, tweet_id, tweet_text, image_url, article_summary, current_time, post_type)
+    
+    def run_post(self, force_post=False):
+        """
+        One posting run, through the async pipeline if use_async is set
+        Writes the run report (stage timings, provider, outcome) if report_file is set,
+        dry runs always collect and print the timings
+        Saves the LLM cache and provider health at the end
+        """
+        timed = bool(self.report_file or self.dry_run)
+        if timed:
+            start_run(pipeline='async' if self.use_async else 'sequential', force_post=force_post,
+                      dry_run=self.dry_run)
+        try:
+            if not self.use_async:
+                self.post_tweet(force_post=force_post)
+                return
+            
+            async def run():
+                try:
+                    await self.apost_tweet(force_post=force_post)
+                finally:
+                    await self.content_generator.aclose()  # Async clients belong to this run's event loop
+            asyncio.run(run())
+        finally:
+            # Cache entries and provider health are written once per run, not after every LLM call
+            self.content_generator.flush()
+            if timed:
+                self._write_run_report()
+    
+    def _write_run_report(self):
+        """
+        Finish the run report, write it to report_file (if set) and print where the time went
+        """
+        report = finish_run(self.report_file, llm_cache=self.content_generator.get_cache_stats())
+        if not report:
+            return
+        if not self.dry_run:
+            stages = [f"{name.split('.', 1)[1]} {seconds:.1f}s" for name, seconds in report['totals'].items()
+                      if name.startswith('stage.')]
+            print(f"\n⏱️  Run took {report['duration']:.1f}s ({', '.join(stages) or 'no stages'}), "
+                  f"report written to {self.report_file}")
+            return
+        
+        # Dry runs exist to benchmark the pipeline - show the full breakdown
+        print(f"\n⏱️  Stage timings ({report['pipeline']} pipeline, {report['duration']:.2f}s total"
+              f"{', stages overlap' if report['pipeline'] == 'async' else ''}):")
+        for name, seconds in report['totals'].items():
+            if name.startswith('stage.'):
+                share = seconds / report['duration'] * 100 if report['duration'] else 0
+                print(f"   {name.split('.', 1)[1]:<12} {seconds:7.2f}s {share:5.1f}%")
+        calls = {}
+        for record in report['spans']:
+            if not record['name'].startswith('stage.'):
+                calls.setdefault(record['name'], []).append(record['duration'])
+        if calls:
+            print("   External calls:")
+            for name, durations in sorted(calls.items(), key=lambda item: sum(item[1]), reverse=True):
+                print(f"   {name:<24} {sum(durations):7.2f}s over {len(durations)} call(s)")
+        if self.report_file:
+            print(f"   Report written to {self.report_file}")
+    
+    def _print_run_header(self, force_post):
+        """
+        Print the run banner, return the run time string used in decision logs
+        """
         current_time = datetime.now(self.ist).strftime('%Y-%m-%d %H:%M:%S IST')
         trigger_type = "🔵 MANUAL TRIGGER" if force_post else "⏰ SCHEDULED RUN"
         print("\n" + "="*50)
         print(f"🚀 STARTING TWEET POSTING PROCESS")
         print(f"{trigger_type}")
+        if self.dry_run:
+            print("🧪 DRY RUN - nothing will be posted or tracked")
         print(f"⏰ Time: {current_time}")
         print("="*50)
-        
-        # Always post - randomly select post type
+        return current_time
+    
+    def _select_post_type(self):
+        """
+        Random post type for this run: (post_type_enum, display name)
+        """
         post_type_enum = self._get_post_type()
         
         # Map post type enum to display name
@@ -78,8 +429,28 @@ class TwitterAutomation:
         }
         post_type = post_type_map.get(post_type_enum, '📝 General')
         print(f"\n📌 Post type: {post_type} (random selection)")
-        
-        # STEP 1: Fetch trending topics FIRST (always needed)
+        annotate(post_type=post_type_enum)
+        return post_type_enum, post_type
+    
+    def _print_skip(self, current_time, post_type, reason, status):
+        """
+        Print why this run doesn't post
+        reason: full reason line (with its icon), status: text after "Status:"
+        """
+        print("\n" + "="*50)
+        print(f"⏸️  SKIP DECISION")
+        print(f"⏰ Time: {current_time}")
+        print(f"📌 Type: {post_type}")
+        print(reason)
+        print(f"✅ Status: {status}")
+        print("="*50)
+        annotate(outcome='skipped', skip_reason=reason.split('Reason: ', 1)[-1])
+    
+    @traced('stage.trends')
+    def _fetch_trends(self):
+        """
+        Current trending topics ([] if they can't be fetched)
+        """
         print("\n🔥 Fetching Twitter trends...")
         trending_topics = self.twitter_poster.get_trending_topics()
         if trending_topics:
@@ -88,192 +459,161 @@ class TwitterAutomation:
         else:
             print("⚠️  Could not fetch trends, continuing without them...")
             trending_topics = []
+        return trending_topics
+    
+    @traced('stage.news')
+    def _fetch_articles(self, post_type_enum):
+        """
+        Latest news articles for a politics or stock market post
+        """
+        if post_type_enum == 'stock_market':
+            print("\n📈 Fetching latest stock market news...")
+            return self.news_fetcher.fetch_stock_market_news(max_results=20)
+        print("\n📰 Fetching latest political news...")  # politics
+        return self.news_fetcher.fetch_latest_news(max_results=15)
+    
+    @traced('stage.select')
+    def _select_trend(self, trending_topics, current_time, post_type):
+        """
+        First of the top trends not posted about yet (None and a skip log if there is none)
+        """
+        if not trending_topics:
+            self._print_skip(current_time, post_type, "❌ Reason: No trending topics found",
+                             "Skipped (no trending content available)")
+            return None
         
-        # STEP 2: Handle different post types
-        if post_type_enum == 'trending':
-            # For trending posts, create tweet directly from trending topics
-            if not trending_topics:
-                print("\n" + "="*50)
-                print(f"⏸️  SKIP DECISION")
-                print(f"⏰ Time: {current_time}")
-                print(f"📌 Type: {post_type}")
-                print(f"❌ Reason: No trending topics found")
-                print(f"✅ Status: Skipped (no trending content available)")
-                print("="*50)
-                return
-            
-            # Select a trending topic that hasn't been posted about
-            trending_topic_to_post = None
-            for trend in trending_topics[:15]:  # Check top 15 trends
-                # Check if we've posted about this trend recently (by topic)
-                trend_normalized = trend.replace('#', '').strip()
-                # Create a title-like string for topic extraction
-                trend_title = f"Trending: {trend_normalized}"
-                if not self.news_tracker.is_already_posted('', trend_title, None, trend_title):
-                    trending_topic_to_post = trend
-                    break
-            
-            if not trending_topic_to_post:
-                print("\n" + "="*50)
-                print(f"⏸️  SKIP DECISION")
-                print(f"⏰ Time: {current_time}")
-                print(f"📌 Type: {post_type}")
-                print(f"⚠️  Reason: All trending topics already posted")
-                print(f"✅ Status: Skipped (avoiding duplicates)")
-                print("="*50)
-                return
-            
-            print(f"\n🔥 Selected trending topic: {trending_topic_to_post}")
-            
-            # Generate controversial tweet about trending topic
-            print(f"\n🤖 Generating CONTROVERSIAL, funky tweet about trending topic...")
-            tweet_text = self.content_generator.generate_trending_tweet(
-                trending_topic_to_post,
-                trending_topics
-            )
-            
-            # Add mentions for trending topics
-            mentions = self.mention_handler.extract_mentions(
-                tweet_text,
-                is_stock_market=False,
-                article_title=f"Trending: {trending_topic_to_post}",
-                article_description=f"Current trending topic: {trending_topic_to_post}"
-            )
-            if mentions:
-                print(f"🏷️  Extracted mentions: {', '.join(mentions)}")
-                tweet_with_mentions = self.mention_handler.add_mentions_to_tweet(
-                    tweet_text,
-                    is_stock_market=False,
-                    mentions=mentions
-                )
-                if tweet_with_mentions != tweet_text:
-                    print(f"🏷️  Added mentions to tweet: {', '.join(mentions)}")
-                    tweet_text = tweet_with_mentions
-            
-            # Create fake article summary for tracking
-            article_summary = {
-                'title': f"Trending: {trending_topic_to_post}",
-                'description': f"Current trending topic on Twitter: {trending_topic_to_post}",
-                'url': f"https://twitter.com/search?q={trending_topic_to_post.replace('#', '%23')}",
-                'source': 'Twitter Trends',
-                'published_at': datetime.now(self.ist).isoformat(),
-                'image_url': ''  # Trending topics don't have images
-            }
-            
-        else:
-            # For politics and stock market, fetch news articles
-            if post_type_enum == 'stock_market':
-                print("\n📈 Fetching latest stock market news...")
-                articles = self.news_fetcher.fetch_stock_market_news(max_results=20)
-            else:  # politics
-                print("\n📰 Fetching latest political news...")
-                articles = self.news_fetcher.fetch_latest_news(max_results=15)
-            
-            if not articles:
-                print("\n" + "="*50)
-                print(f"⏸️  SKIP DECISION")
-                print(f"⏰ Time: {current_time}")
-                print(f"📌 Type: {post_type}")
-                print(f"❌ Reason: No articles found")
-                print(f"✅ Status: Skipped (no content available)")
-                print("="*50)
-                return
-            
-            print(f"✅ Found {len(articles)} articles")
-            
-            # STEP 3: Prioritize articles that match trending topics
-            if trending_topics:
-                articles = self.news_fetcher.prioritize_by_trends(articles, trending_topics)
-                print(f"📊 Re-prioritized articles based on trending topics")
-            
-            # STEP 4: Find an article that hasn't been posted
-            article_to_post = None
-            for article in articles:
-                article_url = article.get('url', '')
-                article_title = article.get('title', '')
-                article_description = article.get('description', '')
-                
-                # Check for duplicates before generating tweet (including topic check)
-                if article_url and not self.news_tracker.is_already_posted(article_url, article_title, None, article_description):
-                    article_to_post = article
-                    break
-            
-            if not article_to_post:
-                print("\n" + "="*50)
-                print(f"⏸️  SKIP DECISION")
-                print(f"⏰ Time: {current_time}")
-                print(f"📌 Type: {post_type}")
-                print(f"⚠️  Reason: All recent articles already posted")
-                print(f"✅ Status: Skipped (avoiding duplicates)")
-                print("="*50)
-                return
-            
-            # Get article summary
-            article_summary = self.news_fetcher.get_article_summary(article_to_post)
-            print(f"\n📄 Selected article: {article_summary['title'][:80]}...")
-            
-            # STEP 5: Generate controversial funky tweet with TRENDING PRIORITY
-            print(f"\n🤖 Generating CONTROVERSIAL, funky tweet with TRENDING hashtags...")
-            tweet_text = self.content_generator.generate_funky_tweet(
-                article_summary, 
-                trending_topics, 
-                is_stock_market=(post_type_enum == 'stock_market')
-            )
+        # Select a trending topic that hasn't been posted about
+        for trend in trending_topics[:15]:  # Check top 15 trends
+            # Check if we've posted about this trend recently (by topic)
+            trend_normalized = trend.replace('#', '').strip()
+            # Create a title-like string for topic extraction
+            trend_title = f"Trending: {trend_normalized}"
+            if not self.news_tracker.is_already_posted('', trend_title, None, trend_title):
+                print(f"\n🔥 Selected trending topic: {trend}")
+                return trend
+        
+        self._print_skip(current_time, post_type, "⚠️  Reason: All trending topics already posted",
+                         "Skipped (avoiding duplicates)")
+        return None
+    
+    def _trend_summary(self, trending_topic):
+        """
+        Article-like summary of a trend for tracking, and the context its mentions are extracted with
+        """
+        article_summary = {
+            'title': f"Trending: {trending_topic}",
+            'description': f"Current trending topic on Twitter: {trending_topic}",
+            'url': f"https://twitter.com/search?q={trending_topic.replace('#', '%23')}",
+            'source': 'Twitter Trends',
+            'published_at': datetime.now(self.ist).isoformat(),
+            'image_url': ''  # Trending topics don't have images
+        }
+        trend_mention_context = (
+            f"Trending: {trending_topic}",
+            f"Current trending topic: {trending_topic}"
+        )
+        return article_summary, trend_mention_context
+    
+    @traced('stage.select')
+    def _select_article(self, articles, trending_topics, current_time, post_type):
+        """
+        Summary of the best article not posted yet (trend matches first), None and a skip log if there is none
+        """
+        if not articles:
+            self._print_skip(current_time, post_type, "❌ Reason: No articles found", "Skipped (no content available)")
+            return None
+        
+        print(f"✅ Found {len(articles)} articles")
+        
+        # STEP 3: Prioritize articles that match trending topics
+        if trending_topics:
+            articles = self.news_fetcher.prioritize_by_trends(articles, trending_topics)
+            print(f"📊 Re-prioritized articles based on trending topics")
         
-        # STEP 6: Add relevant @mentions for maximum controversy and engagement
-        print(f"✅ Generated tweet ({len(tweet_text)} chars)")
-        print(f"📝 Preview: {tweet_text[:150]}...")
+        # STEP 4: Find an article that hasn't been posted
+        for article in articles:
+            article_url = article.get('url', '')
+            article_title = article.get('title', '')
+            article_description = article.get('description', '')
+            
+            # Check for duplicates before generating tweet (including topic check)
+            if article_url and not self.news_tracker.is_already_posted(article_url, article_title, None, article_description):
+                article_summary = self.news_fetcher.get_article_summary(article)
+                print(f"\n📄 Selected article: {article_summary['title'][:80]}...")
+                return article_summary
         
-        # Add mentions based on content (with article context for better extraction)
+        self._print_skip(current_time, post_type, "⚠️  Reason: All recent articles already posted",
+                         "Skipped (avoiding duplicates)")
+        return None
+    
+    def _image_url(self, article_summary):
+        """
+        The article's image URL if it is usable, else None
+        """
+        image_url = article_summary.get('image_url', '')
+        if image_url and image_url.strip() and image_url != 'null' and image_url.startswith('http'):
+            print(f"🖼️  Article has image: {image_url[:50]}..., will include in tweet")
+            return image_url
+        print(f"ℹ️  No valid image URL found (image_url: {image_url})")
+        return None
+    
+    @traced('stage.candidates')
+    def _pick_candidate(self, candidates, post_type_enum, article_summary, trend_mention_context, current_time,
+                        post_type):
+        """
+        First candidate (with mentions added) that passes the duplicate check - no second LLM round trip
+        None and a skip log if all of them are too similar to previous posts
+        """
         is_stock_market_type = (post_type_enum == 'stock_market')
         article_title = article_summary.get('title', '')
         article_description = article_summary.get('description', '')
+        annotate(provider=self.content_generator.last_provider, candidates=len(candidates))
         
-        # Extract mentions with article context for better company/CEO detection
-        mentions = self.mention_handler.extract_mentions(
-            tweet_text, 
-            is_stock_market=is_stock_market_type,
-            article_title=article_title,
-            article_description=article_description
-        )
+        for index, candidate in enumerate(candidates, 1):
+            if len(candidates) > 1:
+                print(f"\n🎯 Candidate {index}/{len(candidates)}")
+            
+            # STEP 6: Add relevant @mentions for maximum controversy and engagement
+            print(f"✅ Generated tweet ({len(candidate)} chars)")
+            print(f"📝 Preview: {candidate[:150]}...")
+            
+            if trend_mention_context:
+                candidate = self._add_mentions(candidate, False, *trend_mention_context)
+            # Add mentions based on content (with article context for better company/CEO detection)
+            candidate = self._add_mentions(candidate, is_stock_market_type, article_title, article_description)
+            
+            # STEP 7: Final duplicate check on generated tweet content (including topic check)
+            if not self.news_tracker.is_already_posted(
+                article_summary['url'], 
+                article_summary['title'], 
+                candidate,
+                article_summary.get('description', '')
+            ):
+                return candidate
         
-        if mentions:
-            print(f"🏷️  Extracted mentions: {', '.join(mentions)}")
-            tweet_with_mentions = self.mention_handler.add_mentions_to_tweet(
-                tweet_text, 
-                is_stock_market=is_stock_market_type,
-                mentions=mentions
-            )
-            if tweet_with_mentions != tweet_text:
-                print(f"🏷️  Added mentions to tweet: {', '.join(mentions)}")
-                tweet_text = tweet_with_mentions
-        
-        # STEP 7: Final duplicate check on generated tweet content (including topic check)
-        if self.news_tracker.is_already_posted(
-            article_summary['url'], 
-            article_summary['title'], 
-            tweet_text,
-            article_summary.get('description', '')
-        ):
+        # Don't serve the same rejected tweets from the LLM cache next run
+        self.content_generator.invalidate_last_response()
+        self._print_skip(current_time, post_type,
+                         f"🚫 Reason: Generated tweet{'s' if len(candidates) > 1 else ''} too similar to previous post",
+                         "Skipped (avoiding duplicate content)")
+        return None
+    
+    def _record_post(self, success, tweet_id, tweet_text, image_url, article_summary, current_time, post_type):
+        """
+        Track a posted tweet, or queue it in the outbox if posting failed
+        """
+        if self.dry_run:
+            # Nothing was posted - the article stays available and nothing is queued
+            status = 'tweet ready, not posted' if success else f"posting failed ({self.twitter_poster.last_error or 'unknown error'})"
             print("\n" + "="*50)
-            print(f"⏸️  SKIP DECISION")
-            print(f"⏰ Time: {current_time}")
+            print(f"🧪 DRY RUN FINISHED - {status}")
             print(f"📌 Type: {post_type}")
-            print(f"🚫 Reason: Generated tweet too similar to previous post")
-            print(f"✅ Status: Skipped (avoiding duplicate content)")
+            print(f"🖼️  Image: {image_url or 'none'}")
+            print(f"📝 Tweet: {tweet_text}")
             print("="*50)
+            annotate(outcome='dry_run' if success else 'dry_run_failed', error=self.twitter_poster.last_error)
             return
         
-        # Post to Twitter with image if available
-        print("\n🐦 Posting to Twitter...")
-        image_url = article_summary.get('image_url', '')
-        if image_url and image_url.strip() and image_url != 'null' and image_url.startswith('http'):
-            print(f"🖼️  Article has image: {image_url[:50]}..., will include in tweet")
-        else:
-            print(f"ℹ️  No valid image URL found (image_url: {image_url})")
-            image_url = None
-        success, tweet_id = self.twitter_poster.post_tweet(tweet_text, image_url=image_url)
-        
         if success:
             # Mark as posted (including tweet text and topic for future duplicate detection)
             self.news_tracker.mark_as_posted(
@@ -291,13 +631,102 @@ class TwitterAutomation:
             print(f"🔗 URL: https://twitter.com/i/web/status/{tweet_id}")
             print("="*50)
             self.post_counter += 1
+            annotate(outcome='posted', tweet_id=tweet_id)
         else:
+            # Keep the generated tweet so a later run can post it
+            self.outbox.enqueue(
+                tweet_text,
+                image_url=image_url,
+                article=article_summary,
+                retry_after=self.twitter_poster.retry_after,
+                error=self.twitter_poster.last_error
+            )
             print("\n" + "="*50)
             print(f"❌ FAILED TO POST TWEET")
             print(f"⏰ Time: {current_time}")
             print(f"📌 Type: {post_type}")
-            print(f"⚠️  Status: Posting failed")
+            print(f"⚠️  Status: Posting failed ({self.twitter_poster.last_error or 'unknown error'}), queued in outbox")
             print("="*50)
+            annotate(outcome='queued', error=self.twitter_poster.last_error)
+    
+    def _add_mentions(self, tweet_text, is_stock_market, article_title, article_description):
+        """
+        Add relevant @mentions to a tweet, extracted with the article as context
+        """
+        mentions = self.mention_handler.extract_mentions(
+            tweet_text, 
+            is_stock_market=is_stock_market,
+            article_title=article_title,
+            article_description=article_description
+        )
+        
+        if mentions:
+            print(f"🏷️  Extracted mentions: {', '.join(mentions)}")
+            tweet_with_mentions = self.mention_handler.add_mentions_to_tweet(
+                tweet_text, 
+                is_stock_market=is_stock_market,
+                mentions=mentions
+            )
+            if tweet_with_mentions != tweet_text:
+                print(f"🏷️  Added mentions to tweet: {', '.join(mentions)}")
+                return tweet_with_mentions
+        return tweet_text
+    
+    def post_thread(self, thread_text, article_summary=None, image_urls=None):
+        """
+        Post long content as a thread, tracking it like a single tweet
+        article_summary: tracker metadata (url, title, description), derived from the text if not given
+        A partially posted thread is queued in the outbox with the IDs already posted,
+        so retry_outbox resumes the chain instead of posting it again
+        Returns (success, tweet_ids)
+        """
+        from text_utils import split_into_thread
+        
+        parts = split_into_thread(thread_text, max_length=280)
+        if not article_summary:
+            article_summary = {
+                'url': f"thread:{hashlib.sha1(thread_text.encode()).hexdigest()[:16]}",
+                'title': parts[0] if parts else '',
+                'description': ''
+            }
+        success, tweet_ids = self.twitter_poster.post_thread(parts, image_urls=image_urls)
+        if self.dry_run:
+            return success, tweet_ids
+        if success:
+            self.news_tracker.mark_as_posted(
+                article_summary['url'],
+                article_summary['title'],
+                tweet_ids[0],
+                thread_text,
+                article_summary.get('description', '')
+            )
+            self.post_counter += 1
+            print(f"✅ Thread posted: https://twitter.com/i/web/status/{tweet_ids[0]}")
+            return True, tweet_ids
+        
+        self.outbox.enqueue(
+            thread_text,
+            article=article_summary,
+            retry_after=self.twitter_poster.retry_after,
+            error=self.twitter_poster.last_error,
+            thread_parts=parts,
+            image_urls=image_urls,
+            posted_ids=tweet_ids
+        )
+        return False, tweet_ids
+    
+    def print_rate_limit_summary(self):
+        """
+        Print remaining Twitter rate limit budget per endpoint
+        """
+        summary = self.twitter_poster.get_rate_limit_summary()
+        if not summary:
+            return
+        print("\n📊 Twitter rate limit budget:")
+        for endpoint, budget in summary.items():
+            limit = budget['limit'] if budget['limit'] is not None else '?'
+            reset_text = f", resets in {budget['resets_in'] // 60} min" if budget['resets_in'] else ""
+            print(f"   {endpoint}: {budget['remaining']}/{limit} remaining{reset_text}")
     
     def test_connection(self):
         """
@@ -355,15 +784,114 @@ class TwitterAutomation:
             print("\n❌ Connection test failed. Please check your credentials.")
             return
         
-        self.post_tweet(force_post=force_post)
+        self.run_post(force_post=force_post)
+        self.print_run_summary()
+    
+    def print_run_summary(self):
+        """
+        Print rate limit budget, LLM cache, provider and prompt size stats after a run
+        """
+        self.print_rate_limit_summary()
+        
+        cache_stats = self.content_generator.get_cache_stats()
+        if cache_stats:
+            print(f"💾 LLM cache: {cache_stats['hits']} hit(s), {cache_stats['misses']} miss(es), "
+                  f"~{cache_stats['latency_saved']}s saved, {cache_stats['entries']} entries")
+        
+        print("🤖 LLM provider stats (chain order):")
+        for row in self.content_generator.get_provider_report():
+            flags = ''.join([' [cooling down]' if row['cooling_down'] else '', ' [over SLO]' if row['over_slo'] else ''])
+            print(f"   {row['provider']}: {row['latency']}s avg, {int(row['success_rate'] * 100)}% valid, "
+                  f"{row['calls']} call(s){flags}")
+        
+        prompt_report = self.content_generator.get_prompt_report()
+        if prompt_report:
+            print("🧮 Prompt sizes (input tokens):")
+            for provider, row in prompt_report.items():
+                estimate = '' if row['exact'] else ' (estimated)'
+                print(f"   {provider}: {row['avg_tokens']} avg, {row['max_tokens']} max over {row['calls']} prompt(s)"
+                      f"{estimate}, {row['trimmed']} trimmed")
+
+    def run_daemon(self, interval=None, jitter=None):
+        """
+        Keep posting from this process: one run every interval seconds (+/- random jitter)
+        Clients, caches, the news tracker and HTTP connections stay warm between runs, and
+        state files are written atomically after every change, so a restart loses nothing
+        SIGTERM/Ctrl+C stop the daemon once the current run is finished
+        """
+        if interval is None:
+            interval = float(os.getenv('DAEMON_INTERVAL_MINUTES', '30')) * 60
+        if jitter is None:
+            jitter = float(os.getenv('DAEMON_JITTER_MINUTES', '5')) * 60
+        jitter = min(jitter, interval)
+        rng = random.Random()  # Own generator - _get_post_type reseeds the global one
+        
+        stop = threading.Event()
+        def request_stop(signum, frame):
+            print(f"\n🛑 Stop requested ({signal.Signals(signum).name}) - finishing the current run first")
+            stop.set()
+        signal.signal(signal.SIGTERM, request_stop)
+        signal.signal(signal.SIGINT, request_stop)
+        
+        print("\n" + "="*50)
+        print(f"🔁 Daemon mode: posting every {interval / 60:.0f} ± {jitter / 60:.0f} min")
+        print("="*50)
+        
+        if not self.test_connection():
+            print("\n❌ Connection test failed. Please check your credentials.")
+            return
+        
+        runs = 0
+        while not stop.is_set():
+            started = time.time()
+            runs += 1
+            try:
+                self.news_tracker.cleanup_old_entries()
+                self.run_post()
+                self.print_run_summary()
+            except Exception as e:
+                # One failed run (network, API outage) must not end the daemon
+                print(f"❌ Run {runs} failed: {e}")
+            
+            # Scheduled from the start of the run, so long runs don't push the schedule back
+            delay = max(interval + rng.uniform(-jitter, jitter) - (time.time() - started), 0)
+            if not stop.is_set():
+                next_run = datetime.fromtimestamp(time.time() + delay, self.ist).strftime('%H:%M:%S IST')
+                print(f"\n💤 Run {runs} done, next run at {next_run} ({delay / 60:.1f} min)")
+            stop.wait(delay)
+        
+        print(f"👋 Daemon stopped after {runs} run(s)")
 
 def main():
     automation = TwitterAutomation()
     
     # Check command line arguments
     force_post = '--force' in sys.argv
+    if '--async' in sys.argv:
+        automation.use_async = True
+    if '--dry-run' in sys.argv:
+        automation.dry_run = True
+    if '--report' in sys.argv:
+        index = sys.argv.index('--report')
+        path = sys.argv[index + 1] if index + 1 < len(sys.argv) else ''
+        automation.report_file = path if path and not path.startswith('--') else 'run_report.json'
     
-    if len(sys.argv) > 1 and sys.argv[1] == '--test':
+    if '--daemon' in sys.argv:
+        # Long-running mode - schedules its own runs (DAEMON_INTERVAL_MINUTES, DAEMON_JITTER_MINUTES)
+        automation.run_daemon()
+    elif '--thread' in sys.argv:
+        # Post a text file as a thread (split at sentence boundaries, resumed from the outbox if it fails halfway)
+        index = sys.argv.index('--thread')
+        path = sys.argv[index + 1] if index + 1 < len(sys.argv) else ''
+        if not path or path.startswith('--'):
+            print("❌ Usage: python main.py --thread thread.txt")
+            return
+        with open(path, 'r', encoding='utf-8') as f:
+            automation.post_thread(f.read())
+    elif '--flush-outbox' in sys.argv:
+        # Only retry queued tweets (e.g. from a separate cron job)
+        automation.retry_outbox(max_posts=len(automation.outbox))
+    elif len(sys.argv) > 1 and sys.argv[1] in ('--test', '--dry-run'):
         # Test mode - run once (with optional force flag)
         automation.run_once(force_post=force_post)
     else:
@@ -371,6 +899,12 @@ def main():
         print("Usage:")
         print("  python main.py --test           # Run once (test mode)")
         print("  python main.py --test --force   # Run once, always post (manual trigger)")
+        print("  python main.py --flush-outbox   # Retry queued tweets that failed to post")
+        print("  python main.py --thread thread.txt   # Post a text file as a thread")
+        print("  python main.py --daemon         # Keep running, post every ~30 minutes")
+        print("  python main.py --test --async   # Run once with the async pipeline (also with --daemon)")
+        print("  python main.py --test --report run_report.json   # Also write stage timings as JSON")
+        print("  python main.py --dry-run        # Run every stage but don't post, print stage timings")
         print("\nRunning in test mode...\n")
         automation.run_once(force_post=force_post)
 
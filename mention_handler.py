@@ -2,128 +2,39 @@
 Mention Handler Module - Adds relevant @mentions to tweets for maximum controversy and engagement
 """
 import re
-from typing import List, Set
+from typing import List, Set, Tuple
+from entity_registry import EntityRegistry
+from text_utils import ensure_complete_tweet, scan_tweet, truncate_tweet_complete
+
+# Mention map keywords that make a political tweet worth tagging the opposition
+CONTROVERSY_TRIGGERS = {'modi', 'narendra modi', 'bjp', 'nda', 'yogi', 'yogi adityanath', 'shah', 'amit shah'}
+
+# Entity extraction patterns, compiled once at import and run on the original-case text
+CAPITALIZED_PHRASE = r'[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*'
+FULL_NAME = r'[A-Z][a-z]+\s+[A-Z][a-z]+'
+PERSON_TITLES = r'(?:CEO|Founder|Co-founder|MD|Managing Director|Chairman)'
+# "CompanyName stock", "CompanyName announces", "CompanyName CEO"
+COMPANY_CONTEXT_PATTERN = re.compile(
+    r'\b(' + CAPITALIZED_PHRASE + r')\s+(?:stock|shares|ipo|equity|market|business|company|firm|corporation'
+    r'|announces|launches|reports|plans|CEO|founder|co-founder)')
+COMPANY_QUOTED_PATTERN = re.compile(r"'(" + CAPITALIZED_PHRASE + r")'|\"(" + CAPITALIZED_PHRASE + r')"')
+CAPITALIZED_WORD_PATTERN = re.compile(r'\b([A-Z][a-z]{3,})\b')
+COMMON_CAPITALIZED_WORDS = frozenset(['India', 'Indian', 'Stock', 'Market', 'Share', 'News', 'Latest', 'Breaking',
+                                      'Update', 'Report', 'Says', 'Will', 'This', 'That', 'The', 'And', 'For', 'With',
+                                      'From', 'About', 'After', 'Before', 'During', 'Under', 'Over', 'Between', 'Among'])
+# "CEO Name Surname", "Name Surname, CEO", "Name Surname says"
+PERSON_PATTERN = re.compile(
+    PERSON_TITLES + r'\s+(' + FULL_NAME + r')'
+    r'|(' + FULL_NAME + r'),?\s+' + PERSON_TITLES +
+    r'|(' + FULL_NAME + r')\s+(?:says|said|announces|launches)')
+MARKET_TERMS_PATTERN = re.compile(r'nifty|sensex|stock|market|share|ipo|equity')
+ANALYSIS_CACHE_SIZE = 256  # Texts (tweets, titles, descriptions) whose matches are kept
 
 class MentionHandler:
-    def __init__(self):
-        # Mapping of keywords to Twitter handles for maximum controversy
-        # Format: {keyword: [list of handles]}
-        self.mention_map = {
-            # BJP/NDA Leaders
-            'modi': ['@narendramodi', '@PMOIndia'],
-            'narendra modi': ['@narendramodi', '@PMOIndia'],
-            'yogi': ['@myogiadityanath', '@UPGovt'],
-            'yogi adityanath': ['@myogiadityanath', '@UPGovt'],
-            'amit shah': ['@AmitShah', '@HMOIndia'],
-            'shah': ['@AmitShah'],
-            'bjp': ['@BJP4India', '@BJP4India'],
-            'nda': ['@BJP4India'],
-            
-            # Congress/Opposition Leaders
-            'rahul gandhi': ['@RahulGandhi', '@INCIndia'],
-            'rahul': ['@RahulGandhi', '@INCIndia'],
-            'congress': ['@INCIndia', '@RahulGandhi'],
-            'sonia gandhi': ['@INCIndia'],
-            'priyanka gandhi': ['@priyankagandhi', '@INCIndia'],
-            
-            # AAP
-            'kejriwal': ['@ArvindKejriwal', '@AamAadmiParty'],
-            'aap': ['@AamAadmiParty', '@ArvindKejriwal'],
-            'delhi': ['@ArvindKejriwal', '@AamAadmiParty'],
-            
-            # TMC
-            'mamata': ['@MamataOfficial', '@AITCofficial'],
-            'mamata banerjee': ['@MamataOfficial', '@AITCofficial'],
-            'tmc': ['@AITCofficial', '@MamataOfficial'],
-            'west bengal': ['@MamataOfficial', '@AITCofficial'],
-            'bengal': ['@MamataOfficial'],
-            
-            # Other Politicians
-            'nitish kumar': ['@NitishKumar'],
-            'lalu': ['@laluprasadrjd'],
-            'mulayam': ['@yadavakhilesh'],
-            'akhilesh': ['@yadavakhilesh'],
-            'mayawati': ['@Mayawati'],
-            'uddhav': ['@OfficeofUT'],
-            
-            # Stock Market
-            'nifty': ['@NSEIndia', '@BSEIndia'],
-            'sensex': ['@BSEIndia', '@NSEIndia'],
-            'stock market': ['@NSEIndia', '@BSEIndia'],
-            'sebi': ['@SEBI_India'],
-            'ipo': ['@NSEIndia', '@BSEIndia'],
-            'fii': ['@NSEIndia'],
-            'dii': ['@NSEIndia'],
-            
-            # Major Indian Companies (Stock Market)
-            'reliance': ['@reliancejio', '@RIL_Updates'],
-            'tata': ['@TataCompanies', '@TataMotors'],
-            'infosys': ['@Infosys'],
-            'tcs': ['@TCS'],
-            'wipro': ['@Wipro'],
-            'hdfc': ['@HDFCBank', '@HDFC_Bank'],
-            'icici': ['@ICICIBank'],
-            'sbi': ['@TheOfficialSBI'],
-            'axis bank': ['@AxisBank'],
-            'hdfc bank': ['@HDFCBank'],
-            'hul': ['@HUL_News'],
-            'hindustan unilever': ['@HUL_News'],
-            'itc': ['@ITCCorpCom'],
-            'bharti airtel': ['@Airtel_Presence'],
-            'airtel': ['@Airtel_Presence'],
-            'adani': ['@AdaniOnline'],
-            'adani group': ['@AdaniOnline'],
-            'zomato': ['@zomato'],
-            'swiggy': ['@Swiggy'],
-            'paytm': ['@Paytm'],
-            'nykaa': ['@Nykaa'],
-            'houselane': ['@HomeLane'],
-            'homelane': ['@HomeLane'],
-            'byju': ['@BYJUS'],
-            'byjus': ['@BYJUS'],
-            'ola': ['@Olacabs'],
-            'uber': ['@Uber_India'],
-            'flipkart': ['@Flipkart'],
-            'amazon': ['@amazonIN'],
-            'jio': ['@reliancejio'],
-            'vi': ['@VodafoneIN'],
-            'vodafone idea': ['@VodafoneIN'],
-            
-            # Stock Market Brokers/Analysts
-            'zerodha': ['@zerodhaonline'],
-            'groww': ['@_groww'],
-            'upstox': ['@Upstox'],
-            'angel one': ['@AngelOneIN'],
-            'icici direct': ['@ICICIDirect'],
-            'hdfc securities': ['@HDFCSecurities'],
-            'kotak securities': ['@KotakSec'],
-            'motilal oswal': ['@MotilalOswal'],
-            'sharekhan': ['@Sharekhan'],
-            '5paisa': ['@5paisa'],
-            
-            # Business/Finance Personalities
-            'mukesh ambani': ['@MukeshAmbani'],
-            'ratan tata': ['@RNTata2000'],
-            'gautam adani': ['@gautam_adani'],
-            'nandan nilekani': ['@NandanNilekani'],
-            'narayana murthy': ['@Infosys_nmurthy'],
-            'rakesh jhunjhunwala': ['@RakeshJhunjhun'],
-            'radhakishan damani': ['@DMartIndia'],
-            
-            # News Outlets (for controversy)
-            'republic': ['@republic'],
-            'aaj tak': ['@aajtak'],
-            'times now': ['@TimesNow'],
-            'ndtv': ['@ndtv'],
-            'india today': ['@IndiaToday'],
-            'the wire': ['@thewire_in'],
-            'scroll': ['@scroll_in'],
-            
-            # General Political Terms
-            'election': ['@ECISVEEP'],
-            'elections': ['@ECISVEEP'],
-            'poll': ['@ECISVEEP'],
-        }
+    def __init__(self, registry=None):
+        # Keywords/aliases -> Twitter handles for maximum controversy, loaded from entities.json
+        # (edits to the file are picked up without a restart, see EntityRegistry.refresh)
+        self.registry = registry or EntityRegistry()
         
         # Controversy-focused handles (always add for maximum engagement)
         self.controversy_handles = [
@@ -132,6 +43,49 @@ class MentionHandler:
             '@AamAadmiParty',
             '@AITCofficial',
         ]
+        
+        self._analysis_cache = {}  # Text -> matches (see _analyze)
+    
+    @property
+    def mention_map(self):
+        """
+        Normalized keyword -> handles, from the entity registry
+        """
+        return self.registry.handles
+    
+    def extract_entities(self, text: str) -> List[Tuple[str, int, int]]:
+        """
+        Find registry keywords in text, returns [(keyword, start, end)] in order of appearance
+        Keywords are whole words, longer ones win over the words inside them ('rahul gandhi' over 'rahul')
+        """
+        return self.registry.find(text)
+    
+    def _analyze(self, text: str) -> dict:
+        """
+        Keyword, company and person matches for one piece of text (tweet, title or description)
+        Memoized, so the article is only analyzed once however many candidate tweets are checked
+        """
+        analysis = self._analysis_cache.get(text)
+        if analysis is not None:
+            return analysis
+        
+        # Company names: capitalized phrases before business words, quoted names, other capitalized words
+        companies = [match for match in COMPANY_CONTEXT_PATTERN.findall(text) if len(match) > 2]
+        companies += [single or double for single, double in COMPANY_QUOTED_PATTERN.findall(text)]
+        companies += [word for word in CAPITALIZED_WORD_PATTERN.findall(text) if word not in COMMON_CAPITALIZED_WORDS]
+        
+        # Person names: first and last name next to a title or a speech verb
+        people = [next(name for name in match if name) for match in PERSON_PATTERN.findall(text)]
+        
+        analysis = {
+            'keywords': [keyword for keyword, _, _ in self.extract_entities(text)],
+            'companies': list(dict.fromkeys(name.strip() for name in companies)),
+            'people': list(dict.fromkeys(name.strip() for name in people)),
+        }
+        if len(self._analysis_cache) >= ANALYSIS_CACHE_SIZE:
+            self._analysis_cache.pop(next(iter(self._analysis_cache)))
+        self._analysis_cache[text] = analysis
+        return analysis
     
     def extract_mentions(self, text: str, is_stock_market: bool = False, article_title: str = None, article_description: str = None) -> List[str]:
         """
@@ -139,21 +93,22 @@ class MentionHandler:
         Uses both tweet text and original article for better context
         Returns list of handles to mention
         """
+        # Pick up registry edits - matches of the old version are stale
+        if self.registry.refresh():
+            self._analysis_cache.clear()
+        
         text_lower = text.lower()
         mentions = []
         seen_handles = set()
         
-        # Combine tweet and article context for better extraction
-        full_context = text_lower
-        if article_title:
-            full_context += " " + article_title.lower()
-        if article_description:
-            full_context += " " + article_description.lower()
+        # Tweet first, then the article for better context (each analyzed once, see _analyze)
+        tweet = self._analyze(text)
+        segments = [tweet] + [self._analyze(part) for part in (article_title, article_description) if part]
         
-        # Step 1: Check for keywords in the text (exact matches)
-        for keyword, handles in self.mention_map.items():
-            if keyword in full_context:
-                for handle in handles:
+        # Step 1: Check for keywords in the text (whole-word matches, in order of appearance)
+        for segment in segments:
+            for keyword in segment['keywords']:
+                for handle in self.mention_map[keyword]:
                     if handle not in seen_handles:
                         mentions.append(handle)
                         seen_handles.add(handle)
@@ -162,18 +117,20 @@ class MentionHandler:
                             break
                 if len(mentions) >= 4:
                     break
+            if len(mentions) >= 4:
+                break
         
         # Step 2: Extract company names dynamically (for stock market tweets)
         if is_stock_market:
-            company_mentions = self._extract_company_mentions(full_context)
-            for handle in company_mentions:
+            companies = list(dict.fromkeys(name for segment in segments for name in segment['companies']))
+            for handle in self._extract_company_mentions(companies):
                 if handle not in seen_handles and len(mentions) < 4:
                     mentions.append(handle)
                     seen_handles.add(handle)
         
         # Step 3: Extract CEO/founder names dynamically
-        ceo_mentions = self._extract_ceo_mentions(full_context)
-        for handle in ceo_mentions:
+        people = list(dict.fromkeys(name for segment in segments for name in segment['people']))
+        for handle in self._extract_ceo_mentions(people):
             if handle not in seen_handles and len(mentions) < 4:
                 mentions.append(handle)
                 seen_handles.add(handle)
@@ -181,7 +138,7 @@ class MentionHandler:
         # Step 4: For political tweets, add controversy handles strategically
         if not is_stock_market and len(mentions) < 3:
             # Add opposition handles if BJP/Modi is mentioned (creates controversy)
-            if any(kw in text_lower for kw in ['modi', 'bjp', 'nda', 'yogi', 'shah']):
+            if set(tweet['keywords']) & CONTROVERSY_TRIGGERS:
                 for handle in self.controversy_handles[:2]:
                     if handle not in seen_handles and len(mentions) < 4:
                         mentions.append(handle)
@@ -200,7 +157,7 @@ class MentionHandler:
             
             # Add exchange mentions if not already present
             if len(mentions) < 3:
-                if any(kw in text_lower for kw in ['nifty', 'sensex', 'stock', 'market', 'share', 'ipo', 'equity']):
+                if MARKET_TERMS_PATTERN.search(text_lower):
                     if '@NSEIndia' not in seen_handles:
                         mentions.append('@NSEIndia')
                         seen_handles.add('@NSEIndia')
@@ -210,42 +167,13 @@ class MentionHandler:
         
         return mentions[:4]  # Max 4 mentions per tweet
     
-    def _extract_company_mentions(self, text: str) -> List[str]:
+    def _extract_company_mentions(self, companies: List[str]) -> List[str]:
         """
-        Dynamically extract company names and find their Twitter handles
+        Find Twitter handles for extracted company names (see _analyze)
+        Only known companies are mentioned - constructed handles might not exist
         """
         mentions = []
-        
-        # Pattern to find company names (capitalized words, often before keywords like 'stock', 'shares', 'IPO', etc.)
-        # Look for patterns like "CompanyName stock", "CompanyName shares", "CompanyName IPO"
-        company_patterns = [
-            r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s+(?:stock|shares|ipo|equity|market|business|company|firm|corporation)',
-            r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s+(?:announces|launches|reports|plans)',
-            r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s+(?:CEO|founder|co-founder)',
-            r'\'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\'',  # Quoted company names
-            r'"([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)"',  # Quoted company names
-        ]
-        
-        companies_found = set()
-        for pattern in company_patterns:
-            matches = re.findall(pattern, text)
-            for match in matches:
-                if isinstance(match, tuple):
-                    match = match[0] if match else ""
-                if match and len(match) > 2:
-                    companies_found.add(match.strip())
-        
-        # Also extract standalone capitalized words that might be companies
-        # (words that are capitalized and not common words)
-        capitalized_words = re.findall(r'\b([A-Z][a-z]{3,})\b', text)
-        common_words = {'India', 'Indian', 'Stock', 'Market', 'Share', 'News', 'Latest', 'Breaking', 'Update', 'Report', 'Says', 'Will', 'This', 'That', 'The', 'And', 'For', 'With', 'From', 'About', 'After', 'Before', 'During', 'Under', 'Over', 'Between', 'Among'}
-        
-        for word in capitalized_words:
-            if word not in common_words and len(word) > 3:
-                companies_found.add(word)
-        
-        # Try to find Twitter handles for extracted companies
-        for company in list(companies_found)[:5]:  # Limit to top 5 companies
+        for company in companies[:5]:  # Limit to top 5 companies
             company_lower = company.lower().replace(' ', '')
             
             # Check if we have a direct mapping
@@ -253,41 +181,15 @@ class MentionHandler:
                 for handle in self.mention_map[company_lower]:
                     if handle not in mentions:
                         mentions.append(handle)
-            else:
-                # Try to construct a likely Twitter handle
-                # Format: @CompanyName (remove spaces, special chars)
-                handle = '@' + re.sub(r'[^a-zA-Z0-9]', '', company)
-                # Only add if it looks reasonable (not too long, not generic)
-                if len(handle) > 4 and len(handle) < 20 and handle.lower() not in ['@the', '@and', '@for', '@with']:
-                    # Don't add constructed handles - they might not exist
-                    # Instead, check if company name matches any known company
-                    pass
         
         return mentions[:3]  # Max 3 company mentions
     
-    def _extract_ceo_mentions(self, text: str) -> List[str]:
+    def _extract_ceo_mentions(self, names: List[str]) -> List[str]:
         """
-        Extract CEO/founder names and find their Twitter handles
+        Find Twitter handles for extracted CEO/founder names (see _analyze)
         """
         mentions = []
-        
-        # Pattern to find CEO/founder names
-        # Look for patterns like "CEO Name", "founder Name", "Name, CEO"
-        ceo_patterns = [
-            r'(?:CEO|Founder|Co-founder|MD|Managing Director|Chairman)\s+([A-Z][a-z]+\s+[A-Z][a-z]+)',
-            r'([A-Z][a-z]+\s+[A-Z][a-z]+),?\s+(?:CEO|Founder|Co-founder|MD|Managing Director|Chairman)',
-            r'([A-Z][a-z]+\s+[A-Z][a-z]+)\s+(?:says|said|announces|launches)',
-        ]
-        
-        names_found = set()
-        for pattern in ceo_patterns:
-            matches = re.findall(pattern, text)
-            for match in matches:
-                if match and len(match.split()) >= 2:  # At least first and last name
-                    names_found.add(match.strip())
-        
-        # Try to find Twitter handles for extracted names
-        for name in list(names_found)[:3]:  # Limit to top 3 names
+        for name in names[:3]:  # Limit to top 3 names
             name_lower = name.lower()
             
             # Check if we have a direct mapping
@@ -303,8 +205,6 @@ class MentionHandler:
         Add relevant @mentions to a tweet for maximum controversy and engagement
         Ensures tweet stays under 280 characters and is always complete
         """
-        from text_utils import ensure_complete_tweet, truncate_tweet_complete
-        
         # FIRST: Ensure the base tweet is complete (fix any incomplete sentences)
         tweet_text = ensure_complete_tweet(tweet_text, max_length=280)
         
@@ -320,8 +220,8 @@ class MentionHandler:
         mentions_text = ' ' + ' '.join(mentions)
         mentions_length = len(mentions_text)
         
-        # Check if we can add mentions without exceeding limit
-        current_length = len(tweet_text)
+        # Check if we can add mentions without exceeding limit (weighted length from the memoized scan)
+        _, _, current_length, _ = scan_tweet(tweet_text, 280)
         total_length = current_length + mentions_length
         
         if total_length <= 280:
@@ -350,3 +250,56 @@ class MentionHandler:
         else:
             return ['@INCIndia', '@BJP4India']
 
+if __name__ == '__main__':
+    # Benchmark against the old per-keyword substring scan (correctness: tests/test_mention_handler.py)
+    import timeit
+
+    handler = MentionHandler()
+    headlines = [
+        "Amit Shah reviews security situation in Manipur with top officials",
+        "Shahrukh Khan's Jawan crosses Rs 1,000 crore at the global box office",
+        "Honda launches new Amaze sedan at Rs 7.99 lakh, bookings open",
+        "Markets stay volatile as FIIs sell Rs 4,000 crore of shares",
+        "Jio, Airtel and Vi raise mobile tariffs by up to 25%",
+        "Sensex, Nifty end higher as HDFC Bank, ICICI Bank gain",
+        "Supreme Court pulls up SEBI over delay in Adani-Hindenburg probe",
+        "Mamata Banerjee slams Centre over West Bengal funds",
+        "Ratan Tata, industrialist and philanthropist, passes away at 86",
+        "BYJU'S lays off 500 more employees amid funding crunch",
+    ]
+    
+    contexts = [headline.lower() + " " + headline.lower() for headline in headlines] * 20
+    
+    def substring_scan():
+        for context in contexts:
+            [keyword for keyword in handler.mention_map if keyword in context]
+    
+    def matcher_scan():
+        for context in contexts:
+            handler.extract_entities(context)
+    
+    runs = 20
+    old_time = min(timeit.repeat(substring_scan, number=runs, repeat=3)) / (runs * len(contexts))
+    new_time = min(timeit.repeat(matcher_scan, number=runs, repeat=3)) / (runs * len(contexts))
+    print(f"{len(handler.mention_map)} keywords, {len(contexts)} contexts")
+    print(f"substring scan: {old_time * 1e6:.1f} µs/context")
+    print(f"matcher:        {new_time * 1e6:.1f} µs/context ({old_time / new_time:.1f}x)")
+    
+    # Full pipeline for three candidate tweets of one article, as main.py does: cold vs memoized article analysis
+    title = "Zomato announces Blinkit expansion as Nifty hits record"
+    description = "Deepinder Goyal, CEO of 'Zomato', said quick commerce is the future. Brokers see upside."
+    tweets = [f"Quick commerce wars heat up! Zomato bets big while Swiggy watches. Take {n}." for n in range(3)]
+    
+    def pipeline():
+        for tweet in tweets:
+            mentions = handler.extract_mentions(tweet, True, title, description)
+            handler.add_mentions_to_tweet(tweet, True, mentions=mentions)
+    
+    def cold_pipeline():
+        handler._analysis_cache.clear()
+        scan_tweet.cache_clear()
+        pipeline()
+    
+    cold_time = min(timeit.repeat(cold_pipeline, number=runs, repeat=3)) / runs
+    warm_time = min(timeit.repeat(pipeline, number=runs, repeat=3)) / runs
+    print(f"3 candidates + mentions: {cold_time * 1e6:.0f} µs cold, {warm_time * 1e6:.0f} µs memoized")
@@ -5,6 +5,8 @@ import requests
 import os
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
+from deadlines import bound_session
+from instrumentation import span
 
 load_dotenv()
 
@@ -12,6 +14,8 @@ class NewsFetcher:
     def __init__(self):
         self.api_key = os.getenv('NEWS_API_KEY')
         self.base_url = 'https://newsapi.org/v2/everything'
+        # Reuses the NewsAPI connection across fetches, timeouts capped at the run deadline
+        self.session = bound_session(requests.Session())
         
     def fetch_latest_news(self, max_results=10):
         """
@@ -47,7 +51,9 @@ class NewsFetcher:
         }
         
         try:
-            response = requests.get(self.base_url, params=params, timeout=10)
+            with span('newsapi.everything', kind='politics') as call:
+                response = self.session.get(self.base_url, params=params, timeout=10)
+                call.set(status=response.status_code)
             response.raise_for_status()
             data = response.json()
             
@@ -173,7 +179,9 @@ class NewsFetcher:
         }
         
         try:
-            response = requests.get(self.base_url, params=params, timeout=10)
+            with span('newsapi.everything', kind='stock_market') as call:
+                response = self.session.get(self.base_url, params=params, timeout=10)
+                call.set(status=response.status_code)
             response.raise_for_status()
             data = response.json()
             
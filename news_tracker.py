@@ -5,6 +5,7 @@ import json
 import os
 from datetime import datetime
 from difflib import SequenceMatcher
+from json_store import save_json
 
 class NewsTracker:
     def __init__(self, storage_file='posted_news.json'):
@@ -28,8 +29,7 @@ class NewsTracker:
         Save posted news to file
         """
         try:
-            with open(self.storage_file, 'w') as f:
-                json.dump(self.posted_news, f, indent=2)
+            save_json(self.storage_file, self.posted_news)
         except Exception as e:
             print(f"Error saving posted news: {e}")
     
@@ -177,6 +177,24 @@ class NewsTracker:
         
         return False
     
+    def tweet_similarity(self, tweet_text):
+        """
+        Highest topic overlap (0-1) between a tweet and previously posted tweets
+        Same measure as the tweet check in is_already_posted (above 0.60 is a duplicate)
+        """
+        tweet_topic = self._extract_topic_from_tweet(tweet_text)
+        if not tweet_topic:
+            return 0.0
+
+        current_words = set(tweet_topic.split())
+        best = 0.0
+        for item in self.posted_news:
+            if item.get('tweet_text'):
+                posted_words = set(self._extract_topic_from_tweet(item.get('tweet_text', '')).split())
+                if posted_words:
+                    best = max(best, len(current_words & posted_words) / len(current_words | posted_words))
+        return best
+
     def mark_as_posted(self, article_url, article_title, tweet_id, tweet_text=None, description=None):
         """
         Mark an article as posted (including tweet text and topic for duplicate checking)
@@ -0,0 +1,123 @@
+"""
+Outbox Module - Persists tweets that could not be posted so they can be retried later
+"""
+import json
+import os
+import time
+import hashlib
+from datetime import datetime
+from json_store import save_json
+
+class TweetOutbox:
+    def __init__(self, storage_file='tweet_outbox.json', max_attempts=8, base_delay=300, max_delay=6 * 60 * 60):
+        self.storage_file = storage_file
+        self.max_attempts = max_attempts  # Drop an entry after this many failed attempts
+        self.base_delay = base_delay  # Seconds before the first retry (doubles every attempt)
+        self.max_delay = max_delay  # Never back off longer than this
+        self.entries = self._load_entries()
+
+    def _load_entries(self):
+        """
+        Load queued tweets from file
+        """
+        if os.path.exists(self.storage_file):
+            try:
+                with open(self.storage_file, 'r') as f:
+                    return json.load(f)
+            except:
+                return []
+        return []
+
+    def _save_entries(self):
+        """
+        Save queued tweets to file
+        """
+        try:
+            save_json(self.storage_file, self.entries)
+        except Exception as e:
+            print(f"Error saving outbox: {e}")
+
+    def _backoff(self, attempts):
+        """
+        Exponential backoff delay (seconds) after the given number of failed attempts
+        """
+        return min(self.base_delay * (2 ** max(attempts - 1, 0)), self.max_delay)
+
+    def enqueue(self, tweet_text, image_url=None, article=None, retry_after=None, error=None,
+                thread_parts=None, image_urls=None, posted_ids=None):
+        """
+        Queue a tweet that could not be posted
+        article: tracker metadata (url, title, description) needed for mark_as_posted
+        retry_after: epoch seconds before which the tweet must not be retried (e.g. rate limit reset)
+        thread_parts/image_urls/posted_ids: queue a (partially posted) thread instead of a single tweet,
+                                            posted_ids lets the retry resume instead of duplicating
+        """
+        article = article or {}
+        entry_id = hashlib.sha1(f"{article.get('url', '')}|{tweet_text}".encode()).hexdigest()[:16]
+
+        # Same tweet queued twice (e.g. regenerated from cache) - keep the existing entry
+        for entry in self.entries:
+            if entry['id'] == entry_id:
+                print(f"📮 Tweet already queued in outbox ({entry_id})")
+                return entry
+
+        now = time.time()
+        entry = {
+            'id': entry_id,
+            'tweet_text': tweet_text,
+            'image_url': image_url,
+            'article': {
+                'url': article.get('url', ''),
+                'title': article.get('title', ''),
+                'description': article.get('description', '')
+            },
+            'thread_parts': thread_parts,
+            'image_urls': image_urls,
+            'posted_ids': list(posted_ids or []),
+            'attempts': 1,  # The failed post that queued it counts as the first attempt
+            'last_error': error,
+            'queued_at': datetime.now().isoformat(),
+            'next_attempt_at': max(retry_after or 0, now + self._backoff(1))
+        }
+        self.entries.append(entry)
+        self._save_entries()
+        print(f"📮 Queued tweet in outbox ({entry_id}), retry after {datetime.fromtimestamp(entry['next_attempt_at']).strftime('%H:%M:%S')}")
+        return entry
+
+    def due_entries(self, now=None):
+        """
+        Return queued tweets whose backoff has expired, oldest first
+        """
+        now = now or time.time()
+        return [entry for entry in self.entries if entry['next_attempt_at'] <= now]
+
+    def mark_sent(self, entry_id):
+        """
+        Remove a tweet from the outbox after it has been posted (or is no longer wanted)
+        """
+        self.entries = [entry for entry in self.entries if entry['id'] != entry_id]
+        self._save_entries()
+
+    def mark_failed(self, entry_id, retry_after=None, error=None, posted_ids=None):
+        """
+        Record a failed retry and schedule the next attempt with exponential backoff
+        posted_ids: thread parts posted so far (kept so the next retry resumes the thread)
+        Drops the tweet once max_attempts is reached
+        """
+        for entry in self.entries:
+            if entry['id'] != entry_id:
+                continue
+            entry['attempts'] += 1
+            entry['last_error'] = error
+            if posted_ids is not None:
+                entry['posted_ids'] = list(posted_ids)
+            if entry['attempts'] >= self.max_attempts:
+                print(f"🗑️  Dropping outbox tweet {entry_id} after {entry['attempts']} attempts (last error: {error})")
+                self.entries = [e for e in self.entries if e['id'] != entry_id]
+            else:
+                entry['next_attempt_at'] = max(retry_after or 0, time.time() + self._backoff(entry['attempts']))
+            break
+        self._save_entries()
+
+    def __len__(self):
+        return len(self.entries)
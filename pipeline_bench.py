@@ -0,0 +1,123 @@
+"""
+Pipeline Benchmark - End-to-end wall time of post_tweet vs apost_tweet against local stand-ins
+
+The LLM providers are served by llm_standin.py over real HTTP. NewsAPI, trends, image download/upload
+and posting are stand-ins of NewsFetcher/TwitterPoster that block for a configurable time (like the
+real clients do) and post nothing. Each run uses a fresh working directory, so no state file is touched.
+
+    python pipeline_bench.py --runs 5 --trends 1.2 --news 0.8 --image 1.0 --post 0.5
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import tempfile
+import time
+from llm_standin import StandinServer
+
+class StandinLatencies:
+    def __init__(self, trends=1.2, news=0.8, image=1.0, post=0.5):
+        """
+        Seconds each external call blocks for (image = download + upload)
+        """
+        self.trends = trends
+        self.news = news
+        self.image = image
+        self.post = post
+
+def build_automation(latencies, post_type):
+    """
+    TwitterAutomation with stand-in news/Twitter clients and a fixed post type
+    Must be called inside the run's working directory (state files are relative paths)
+    """
+    from main import TwitterAutomation
+    from news_fetcher import NewsFetcher
+    from twitter_poster import TwitterPoster
+
+    class StandinNewsFetcher(NewsFetcher):
+        def _articles(self, topic, max_results):
+            time.sleep(latencies.news)
+            stamp = time.time_ns()
+            return [{
+                'title': f"{topic} story {n} {stamp}: Sensex slides as Parliament debates the budget",
+                'description': f"Detailed {topic} report number {n} on markets, Parliament and the economy.",
+                'url': f"https://news.example/{topic}/{stamp}/{n}",
+                'source': {'name': 'Stand-in News'},
+                'urlToImage': f"https://images.example/{stamp}/{n}.jpg",
+                'publishedAt': '2024-01-01T00:00:00Z',
+            } for n in range(max_results)]
+
+        def fetch_latest_news(self, max_results=10):
+            return self._articles('politics', max_results)
+
+        def fetch_stock_market_news(self, max_results=10):
+            return self._articles('markets', max_results)
+
+    class StandinPoster(TwitterPoster):
+        def get_trending_topics(self, woeid=23424848):
+            time.sleep(latencies.trends)
+            return [f"#Trend{time.time_ns()}", 'Sensex', 'Budget', 'Parliament']
+
+        def prepare_media(self, image_url):
+            time.sleep(latencies.image)
+            return 'media-1'
+
+        def post_tweet(self, tweet_text, image_url=None, media_id=None):
+            self.last_error = None
+            self.retry_after = None
+            if image_url and not media_id:
+                media_id = self.prepare_media(image_url)
+            time.sleep(latencies.post)
+            return True, str(time.time_ns())
+
+    automation = TwitterAutomation()
+    automation.news_fetcher = StandinNewsFetcher()
+    automation.twitter_poster = StandinPoster()
+    automation._get_post_type = lambda: post_type
+    return automation
+
+def timed_run(latencies, post_type, use_async):
+    """
+    Wall time of one posting run in a fresh working directory, and whether it posted
+    """
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                automation = build_automation(latencies, post_type)
+                automation.use_async = use_async
+                start = time.perf_counter()
+                automation.run_post()
+                elapsed = time.perf_counter() - start
+            return elapsed, automation.post_counter == 1
+        finally:
+            os.chdir(previous)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Sequential vs async posting pipeline against local stand-ins")
+    parser.add_argument('--runs', type=int, default=5, help="runs per pipeline and post type")
+    parser.add_argument('--trends', type=float, default=1.2, help="trend fetch seconds")
+    parser.add_argument('--news', type=float, default=0.8, help="news fetch seconds")
+    parser.add_argument('--image', type=float, default=1.0, help="image download + upload seconds")
+    parser.add_argument('--post', type=float, default=0.5, help="create_tweet seconds")
+    parser.add_argument('--llm', default='lognormal:1.0:0.3', help="stand-in latency spec for every LLM provider")
+    args = parser.parse_args()
+
+    latencies = StandinLatencies(args.trends, args.news, args.image, args.post)
+    profiles = {provider: {'latency': args.llm} for provider in ('openai', 'groq', 'huggingface')}
+    with StandinServer(profiles=profiles, seed=1) as server:
+        os.environ.update(server.env())
+        os.environ['LLM_CACHE'] = '0'
+
+        print(f"Stand-ins: trends {args.trends}s, news {args.news}s, image {args.image}s, "
+              f"post {args.post}s, LLM {args.llm}")
+        for post_type in ('politics', 'stock_market', 'trending'):
+            results = {}
+            for label, use_async in (('sequential', False), ('async', True)):
+                runs = [timed_run(latencies, post_type, use_async) for _ in range(args.runs)]
+                assert all(posted for _, posted in runs), f"{label} {post_type} run didn't post"
+                results[label] = statistics.median(elapsed for elapsed, _ in runs)
+            print(f"{post_type:>12}: sequential {results['sequential']:.2f}s, async {results['async']:.2f}s "
+                  f"({results['sequential'] / results['async']:.2f}x, median of {args.runs})")
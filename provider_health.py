@@ -0,0 +1,231 @@
+"""
+Provider Health Module - Persisted per-provider circuit breaker for LLM APIs
+"""
+import json
+import os
+import time
+import threading
+from datetime import datetime
+from json_store import save_json
+
+# Cooldown (seconds) after the first failure of each error class - doubles on every
+# consecutive failure up to MAX_COOLDOWN
+BASE_COOLDOWNS = {
+    'auth': 6 * 60 * 60,  # Invalid key won't fix itself soon
+    'quota': 60 * 60,  # Billing/quota exhausted
+    'rate_limit': 5 * 60,
+    'loading': 2 * 60,  # Hugging Face "model loading" 503
+    'timeout': 2 * 60,
+    'error': 60,
+}
+MAX_COOLDOWN = 24 * 60 * 60
+
+# Prior (latency seconds, success rate) per provider until calls are measured - keeps the
+# original OpenAI -> Groq -> Hugging Face -> gpt2 order on a fresh install
+PROVIDER_PRIORS = {
+    'openai': (3.0, 0.9),
+    'groq': (3.0, 0.8),
+    'huggingface': (8.0, 0.5),
+    'huggingface-gpt2': (6.0, 0.3),
+}
+DEFAULT_PRIOR = (10.0, 0.3)
+EWMA_ALPHA = 0.3  # Weight of the newest call in the moving averages
+MIN_SUCCESS_RATE = 0.05  # Keeps the expected-time estimate finite for always-failing providers
+RECENT_LATENCY_WINDOW = 20  # Latencies of the last N successful calls kept for percentile estimates
+
+def classify_error(error=None, status_code=None):
+    """
+    Map an exception or HTTP status code to an error class used for cooldowns
+    """
+    message = str(error).lower() if error is not None else ''
+    status = str(status_code) if status_code is not None else ''
+    if status == '401' or '401' in message or 'authentication' in message or 'invalid api key' in message:
+        return 'auth'
+    if 'quota' in message or 'insufficient_quota' in message:
+        return 'quota'
+    if status == '429' or '429' in message or 'rate limit' in message:
+        return 'rate_limit'
+    if status == '503' or '503' in message or 'loading' in message:
+        return 'loading'
+    if 'timeout' in message or 'timed out' in message:
+        return 'timeout'
+    return 'error'
+
+class ProviderHealth:
+    def __init__(self, storage_file='provider_health.json'):
+        self.storage_file = storage_file
+        self.providers = self._load_state()
+        self._lock = threading.Lock()
+        self._dirty = False  # State changed since the last flush()
+
+    def _load_state(self):
+        """
+        Load provider health from file
+        """
+        if os.path.exists(self.storage_file):
+            try:
+                with open(self.storage_file, 'r') as f:
+                    return json.load(f)
+            except:
+                return {}
+        return {}
+
+    def _save_state(self):
+        """
+        Save provider health to file
+        """
+        try:
+            save_json(self.storage_file, self.providers)
+        except Exception as e:
+            print(f"Error saving provider health: {e}")
+
+    def _state(self, provider):
+        return self.providers.setdefault(provider, {
+            'failures': 0,
+            'cooldown_until': 0,
+            'last_error': None,
+            'last_error_at': None,
+            'last_success_at': None,
+            'calls': 0,
+            'latency_ewma': None,
+            'success_ewma': None,
+            'recent_latencies': []
+        })
+
+    def is_available(self, provider):
+        """
+        False while the provider is cooling down after failures
+        Once the cooldown expires the provider is probed again (one failure re-opens the breaker)
+        """
+        state = self.providers.get(provider)
+        return not state or state['cooldown_until'] <= time.time()
+
+    def record_success(self, provider):
+        """
+        Close the breaker: reset failure count and cooldown
+        """
+        with self._lock:
+            state = self._state(provider)
+            changed = state['failures'] or state['cooldown_until']
+            state['failures'] = 0
+            state['cooldown_until'] = 0
+            state['last_success_at'] = int(time.time())
+            if changed:
+                self._dirty = True
+
+    def record_failure(self, provider, error_class):
+        """
+        Open the breaker for this provider for a cooldown based on the error class,
+        doubling with every consecutive failure
+        """
+        with self._lock:
+            state = self._state(provider)
+            state['failures'] += 1
+            cooldown = min(BASE_COOLDOWNS.get(error_class, BASE_COOLDOWNS['error']) * (2 ** (state['failures'] - 1)), MAX_COOLDOWN)
+            state['cooldown_until'] = int(time.time() + cooldown)
+            state['last_error'] = error_class
+            state['last_error_at'] = int(time.time())
+            self._dirty = True
+        print(f"🔌 {provider} marked unhealthy ({error_class}), skipping until {datetime.fromtimestamp(state['cooldown_until']).strftime('%H:%M:%S')}")
+
+    def record_call(self, provider, latency, success):
+        """
+        Update the provider's EWMA latency (seconds) and success rate (valid tweet or not)
+        """
+        with self._lock:
+            state = self._state(provider)
+            prior_latency, prior_success = PROVIDER_PRIORS.get(provider, DEFAULT_PRIOR)
+            old_latency = state.get('latency_ewma')
+            old_success = state.get('success_ewma')
+            if old_latency is None:
+                old_latency, old_success = prior_latency, prior_success
+            state['latency_ewma'] = round(EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * old_latency, 3)
+            state['success_ewma'] = round(EWMA_ALPHA * (1.0 if success else 0.0) + (1 - EWMA_ALPHA) * old_success, 3)
+            state['calls'] = state.get('calls', 0) + 1
+            if success:
+                recent = state.setdefault('recent_latencies', [])
+                recent.append(round(latency, 3))
+                del recent[:-RECENT_LATENCY_WINDOW]
+            self._dirty = True
+
+    def flush(self):
+        """
+        Write the state to disk if it changed - once per run, so no LLM call waits for a synced write
+        """
+        with self._lock:
+            if self._dirty:
+                self._save_state()
+                self._dirty = False
+
+    def latency(self, provider):
+        """
+        EWMA latency in seconds (prior if never measured)
+        """
+        state = self.providers.get(provider) or {}
+        if state.get('latency_ewma') is None:
+            return PROVIDER_PRIORS.get(provider, DEFAULT_PRIOR)[0]
+        return state['latency_ewma']
+
+    def latency_percentile(self, provider, percentile=90):
+        """
+        Latency (seconds) under which this percentage of recent successful calls answered
+        Falls back to the average latency until a few calls have been measured
+        """
+        state = self.providers.get(provider) or {}
+        recent = sorted(state.get('recent_latencies') or [])
+        if len(recent) < 3:
+            return self.latency(provider)
+        index = min(int(round(percentile / 100.0 * (len(recent) - 1))), len(recent) - 1)
+        return recent[index]
+
+    def success_rate(self, provider):
+        """
+        EWMA success rate 0-1 (prior if never measured)
+        """
+        state = self.providers.get(provider) or {}
+        if state.get('success_ewma') is None:
+            return PROVIDER_PRIORS.get(provider, DEFAULT_PRIOR)[1]
+        return state['success_ewma']
+
+    def expected_time(self, provider):
+        """
+        Expected seconds spent on this provider per valid tweet (latency / success rate)
+        Trying providers in increasing order of this value minimizes expected time to a valid tweet
+        """
+        return self.latency(provider) / max(self.success_rate(provider), MIN_SUCCESS_RATE)
+
+    def rank(self, providers, latency_slo=None):
+        """
+        Order providers by expected time to a valid tweet
+        Providers whose average latency exceeds latency_slo go last (still tried before giving up)
+        """
+        def sort_key(item):
+            index, provider = item
+            over_slo = latency_slo is not None and self.latency(provider) > latency_slo
+            return (over_slo, self.expected_time(provider), index)
+        return [provider for _, provider in sorted(enumerate(providers), key=sort_key)]
+
+    def report(self, providers, latency_slo=None):
+        """
+        Statistics for each provider, in chain order
+        """
+        now = time.time()
+        rows = []
+        for provider in self.rank(providers, latency_slo=latency_slo):
+            state = self.providers.get(provider) or {}
+            rows.append({
+                'provider': provider,
+                'calls': state.get('calls', 0),
+                'latency': round(self.latency(provider), 2),
+                'success_rate': round(self.success_rate(provider), 2),
+                'expected_time': round(self.expected_time(provider), 2),
+                'over_slo': latency_slo is not None and self.latency(provider) > latency_slo,
+                'cooling_down': state.get('cooldown_until', 0) > now
+            })
+        return rows
+
+    def status(self, provider):
+        """
+        Health state of one provider (empty dict if never used)
+        """
+        return dict(self.providers.get(provider, {}))
@@ -0,0 +1,123 @@
+"""
+Rate Limit Module - Tracks Twitter rate limit budgets from x-rate-limit-* response headers
+"""
+import json
+import os
+import time
+import threading
+from urllib.parse import urlparse
+from json_store import save_json
+
+# Map Twitter API paths to the endpoint names used by TwitterPoster
+ENDPOINT_NAMES = {
+    ('POST', '/2/tweets'): 'create_tweet',
+    ('GET', '/2/users/me'): 'get_me',
+    ('POST', '/1.1/media/upload.json'): 'media_upload',
+    ('GET', '/1.1/trends/place.json'): 'trends',
+    ('GET', '/1.1/account/verify_credentials.json'): 'verify_credentials',
+}
+
+class RateLimitTracker:
+    def __init__(self, storage_file='rate_limits.json'):
+        self.storage_file = storage_file
+        self.budgets = self._load_budgets()
+        self._lock = threading.Lock()  # Media uploads can run concurrently
+
+    def _load_budgets(self):
+        """
+        Load last known rate limit budgets from file
+        """
+        if os.path.exists(self.storage_file):
+            try:
+                with open(self.storage_file, 'r') as f:
+                    return json.load(f)
+            except:
+                return {}
+        return {}
+
+    def _save_budgets(self):
+        """
+        Save rate limit budgets to file
+        """
+        try:
+            save_json(self.storage_file, self.budgets)
+        except Exception as e:
+            print(f"Error saving rate limits: {e}")
+
+    @staticmethod
+    def endpoint_name(method, url):
+        """
+        Resolve an HTTP request to an endpoint name (falls back to the URL path)
+        """
+        path = urlparse(url).path
+        return ENDPOINT_NAMES.get((method.upper(), path), path)
+
+    def record(self, endpoint, headers):
+        """
+        Record x-rate-limit-limit/remaining/reset headers for an endpoint
+        Ignores responses without rate limit headers
+        """
+        remaining = headers.get('x-rate-limit-remaining')
+        reset = headers.get('x-rate-limit-reset')
+        if remaining is None or reset is None:
+            return
+        try:
+            budget = {
+                'limit': int(headers.get('x-rate-limit-limit') or 0) or None,
+                'remaining': int(remaining),
+                'reset': int(reset),
+                'updated_at': int(time.time())
+            }
+        except ValueError:
+            return
+        with self._lock:
+            self.budgets[endpoint] = budget
+            self._save_budgets()
+
+    def response_hook(self, response, *args, **kwargs):
+        """
+        requests response hook - attach to the tweepy sessions to capture every call
+        """
+        try:
+            endpoint = self.endpoint_name(response.request.method, response.request.url)
+            self.record(endpoint, response.headers)
+        except Exception:
+            pass  # Telemetry must never break a call
+        return response
+
+    def remaining(self, endpoint):
+        """
+        Remaining calls in the current window, or None if unknown / window already reset
+        """
+        budget = self.budgets.get(endpoint)
+        if not budget or budget['reset'] <= time.time():
+            return None
+        return budget['remaining']
+
+    def reset_at(self, endpoint):
+        """
+        Epoch seconds when the endpoint's window resets (None if unknown)
+        """
+        budget = self.budgets.get(endpoint)
+        return budget['reset'] if budget else None
+
+    def is_exhausted(self, endpoint):
+        """
+        True if the last response said no calls are left and the window has not reset yet
+        """
+        return self.remaining(endpoint) == 0
+
+    def summary(self):
+        """
+        Current budget per endpoint: {endpoint: {'remaining', 'limit', 'resets_in'}}
+        """
+        now = time.time()
+        result = {}
+        for endpoint, budget in sorted(self.budgets.items()):
+            window_open = budget['reset'] > now
+            result[endpoint] = {
+                'remaining': budget['remaining'] if window_open else budget['limit'],
+                'limit': budget['limit'],
+                'resets_in': int(budget['reset'] - now) if window_open else 0
+            }
+        return result
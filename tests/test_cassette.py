@@ -0,0 +1,113 @@
+"""
+Cassette round trip: a replay takes the same branches as the recording, also days later
+"""
+import http.server
+import json
+import os
+import tempfile
+import threading
+import time
+import pytest
+import requests
+import cassette
+import main
+from outbox import TweetOutbox
+from provider_health import ProviderHealth
+from rate_limits import RateLimitTracker
+
+DAY = 24 * 60 * 60
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    def _respond(self):
+        body = json.dumps({'path': self.path}).encode()
+        self.send_response(200)
+        self.send_header('content-type', 'application/json')
+        self.send_header('content-length', str(len(body)))
+        # Every endpoint says its budget is used up for the next 15 minutes
+        self.send_header('x-rate-limit-limit', '50')
+        self.send_header('x-rate-limit-remaining', '0')
+        self.send_header('x-rate-limit-reset', str(int(time.time()) + 900))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = _respond
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+
+class ClockDependentRun:
+    """
+    Stands in for TwitterAutomation: which calls run_once makes depends on the stored state and the clock
+    """
+    base_url = None
+
+    def __init__(self):
+        self.twitter_poster = type('Poster', (), {'identity_ttl': 0})()
+        self.dry_run = False
+        self.use_async = False
+        self.report_file = None
+
+    def _get_post_type(self):
+        return 'politics'
+
+    def run_once(self, force_post=False):
+        health = ProviderHealth()
+        limits = RateLimitTracker()
+        outbox = TweetOutbox()
+        session = requests.Session()
+        session.hooks['response'].append(limits.response_hook)
+        session.get(f"{self.base_url}/2/users/me")
+        if not limits.is_exhausted('get_me'):  # Exhausted by the response just received
+            session.get(f"{self.base_url}/2/users/me")
+        if health.is_available('groq'):
+            session.post(f"{self.base_url}/groq")
+        if not limits.is_exhausted('create_tweet'):
+            session.post(f"{self.base_url}/2/tweets")
+        for entry in outbox.due_entries():
+            session.post(f"{self.base_url}/outbox/{entry['id']}")
+
+def seed_state(now):
+    # A provider cooling down, an exhausted tweet budget and an outbox entry that isn't due yet
+    with open('provider_health.json', 'w') as f:
+        json.dump({'groq': {'failures': 1, 'cooldown_until': int(now + 600), 'last_error': 'timeout',
+                            'last_error_at': int(now), 'last_success_at': None}}, f)
+    with open('rate_limits.json', 'w') as f:
+        json.dump({'create_tweet': {'limit': 50, 'remaining': 0, 'reset': int(now + 900), 'updated_at': int(now)}}, f)
+    with open('tweet_outbox.json', 'w') as f:
+        json.dump([{'id': 'queued', 'tweet_text': 'queued tweet', 'next_attempt_at': now + 300,
+                    'queued_at': '2024-01-01T12:00:00'}], f)
+
+@pytest.mark.parametrize('advance', [0, 3 * DAY], ids=['same-time', 'three-days-later'])
+def test_replay_takes_the_recorded_branches(server, tmp_path, monkeypatch, advance):
+    monkeypatch.setattr(ClockDependentRun, 'base_url', server)
+    monkeypatch.setattr(main, 'TwitterAutomation', ClockDependentRun)
+    monkeypatch.chdir(tmp_path)
+    seed_state(time.time())
+    path = str(tmp_path / 'run.cassette.json')
+
+    recorded = cassette.record(path)
+    assert [interaction['url'] for interaction in recorded.interactions] == [f"{server}/2/users/me"]
+
+    environ = dict(os.environ)
+    leftovers = set(os.listdir(tempfile.gettempdir()))
+    real_time = time.time
+    monkeypatch.setattr(time, 'time', lambda: real_time() + advance)
+
+    summary = cassette.replay(path, scale=0)
+    assert summary == {'interactions': 1, 'used': 1, 'misses': 0}
+    assert dict(os.environ) == environ
+    assert set(os.listdir(tempfile.gettempdir())) <= leftovers
+    assert os.getcwd() == str(tmp_path)
+
+def test_rebase_state():
+    shifted = cassette._rebase_state('tweet_outbox.json', [{'next_attempt_at': 100.5, 'queued_at': '2024-01-01T12:00:00'}], DAY)
+    assert shifted == [{'next_attempt_at': 100.5 + DAY, 'queued_at': '2024-01-02T12:00:00'}]
+    # "No cooldown" stays unset
+    assert cassette._rebase_state('provider_health.json', {'groq': {'cooldown_until': 0}}, DAY) == {'groq': {'cooldown_until': 0}}
@@ -0,0 +1,79 @@
+"""
+Provider health bookkeeping: timeouts caused by our own deadline don't cool a provider down
+"""
+import http.server
+import threading
+import time
+import pytest
+from content_generator import ContentGenerator
+from llm_cache import LLMCache
+
+class SlowHandler(http.server.BaseHTTPRequestHandler):
+    def do_POST(self):
+        time.sleep(3)
+        self.send_response(503)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def slow_url():
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), SlowHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+
+@pytest.fixture
+def generator(tmp_path, monkeypatch):
+    # provider_health.json and the LLM cache are relative paths - keep them in the test directory
+    monkeypatch.chdir(tmp_path)
+    return ContentGenerator(use_cache=False)
+
+def clamped_timeout(generator, deadline_in):
+    # What a provider call inside the chain sees: its HTTP timeout is computed against the chain's deadline
+    generator._local.deadline_at = time.time() + deadline_in
+    return generator._request_timeout(60)
+
+def test_deadline_timeout_does_not_open_the_breaker(generator):
+    assert clamped_timeout(generator, 2) <= 2
+    assert not generator._blames_provider(TimeoutError("Request timed out."))
+    assert generator._blames_provider(RuntimeError("401 invalid api key"))
+
+def test_provider_timeout_opens_the_breaker(generator):
+    # The deadline is further away than the provider's own timeout - the timeout is the provider's fault
+    assert clamped_timeout(generator, 300) == 60
+    assert generator._blames_provider(TimeoutError("Request timed out."))
+    generator._local.deadline_at = None
+    assert generator._request_timeout(60) == 60
+    assert generator._blames_provider(TimeoutError("Request timed out."))
+
+def test_chain_deadline_keeps_the_provider_available(generator, slow_url):
+    generator.hf_base_url = slow_url
+    generator._provider_ready = lambda provider: True
+    hf_call = lambda: generator._hf_completion('model', 'prompt')[1]
+
+    # The chain gives up at 0.5s and the request times out at its 1s minimum - not the provider's fault
+    assert generator._run_hedged_chain([('huggingface', hf_call)], deadline=0.5) is None
+    time.sleep(1.5)  # Let the abandoned call time out
+    assert generator.health.is_available('huggingface')
+
+    # The same timeout without a deadline is
+    with pytest.raises(Exception):
+        generator._hf_completion('model', 'prompt', timeout=1)
+    assert not generator.health.is_available('huggingface')
+
+def test_cache_and_health_are_written_once_per_run(generator, tmp_path):
+    generator.cache = LLMCache()
+    key = generator.cache.make_key('groq', 'model', 'system', 'prompt')
+    generator.cache.set(key, 'tweet', latency=1.0)
+    generator.health.record_call('groq', 1.0, success=True)
+    generator.health.record_failure('openai', 'auth')
+    assert not (tmp_path / 'llm_cache.json').exists()
+    assert not (tmp_path / 'provider_health.json').exists()
+
+    generator.flush()
+    reloaded = ContentGenerator(use_cache=True)
+    assert reloaded.cache.get(key) == 'tweet'
+    assert reloaded.health.status('groq')['calls'] == 1
+    assert not reloaded.health.is_available('openai')
@@ -0,0 +1,60 @@
+"""
+Run deadline: HTTP timeouts of blocking calls are capped, also in threads whose result was abandoned
+"""
+import asyncio
+import http.server
+import threading
+import time
+import pytest
+import requests
+from deadlines import MIN_TIMEOUT, bound_session, request_timeout, run_deadline
+
+class SlowHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        time.sleep(3)
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def slow_url():
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), SlowHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}/"
+    httpd.shutdown()
+
+def test_request_timeout():
+    assert request_timeout(10) == 10
+    with run_deadline(5):
+        assert 4 < request_timeout(10) <= 5
+        assert request_timeout(2) == 2
+        assert 4 < request_timeout(None) <= 5
+        connect, read = request_timeout((3, 10))
+        assert connect == 3 and 4 < read <= 5
+    with run_deadline(-1):
+        assert request_timeout(10) == MIN_TIMEOUT
+    assert request_timeout(10) == 10
+
+def test_abandoned_thread_ends_by_the_deadline(slow_url):
+    session = bound_session(requests.Session())
+    finished = threading.Event()
+
+    def fetch():
+        try:
+            session.get(slow_url, timeout=10)
+        except requests.exceptions.Timeout:
+            pass
+        finally:
+            finished.set()
+
+    async def run():
+        with run_deadline(0.2):
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(asyncio.to_thread(fetch), 0.2)
+
+    start = time.perf_counter()
+    asyncio.run(run())  # Joins the worker thread at shutdown
+    assert finished.is_set()
+    assert time.perf_counter() - start < 2.5
@@ -0,0 +1,23 @@
+"""
+Gazetteer matching: longest name wins, case-insensitive, offsets valid in the original text
+"""
+from gazetteer import PLACES, Gazetteer
+
+def test_longest_name_wins():
+    assert [name for name, _, _ in PLACES.find("Metro opens in New Delhi and Rae Bareli")] == ['New Delhi', 'Rae Bareli']
+
+def test_dotted_capital_i():
+    # "İ".lower() is two code points - matching must neither crash nor shift the offsets
+    text = "İNDIA rising in MUMBAİ"
+    found = PLACES.find(text)
+    assert [name for name, _, _ in found] == ['India', 'Mumbai']
+    assert [text[start:end] for _, start, end in found] == ['İNDIA', 'MUMBAİ']
+
+def test_sharp_s():
+    text = "Straßenbahn and STRASSE protests reach Delhi"
+    assert [(name, text[start:end]) for name, start, end in PLACES.find(text)] == [('Delhi', 'Delhi')]
+
+def test_names_with_dotted_capital_i():
+    places = Gazetteer(['İzmir', 'Gießen'])
+    assert [name for name, _, _ in places.find("Flights from İZMİR and izmir to GIEßEN")] == ['İzmir', 'İzmir', 'Gießen']
+    assert 'İzmir' in places
@@ -0,0 +1,47 @@
+"""
+Mention extraction on real headlines: whole-word matches only, longest alias wins
+"""
+import pytest
+from entity_registry import REGISTRY_FILE, EntityRegistry
+from mention_handler import MentionHandler
+
+# (headline, keywords that must be found, keywords that must not be)
+HEADLINE_CASES = [
+    ("Amit Shah reviews security situation in Manipur with top officials", {'amit shah'}, {'shah'}),
+    ("Shahrukh Khan's Jawan crosses Rs 1,000 crore at the global box office", set(), {'shah'}),
+    ("Honda launches new Amaze sedan at Rs 7.99 lakh, bookings open", set(), {'nda'}),
+    ("Apollo Hospitals reports 20% rise in quarterly profit", set(), {'poll'}),
+    ("Markets stay volatile as FIIs sell Rs 4,000 crore of shares", {'fiis'}, {'ola', 'fii'}),
+    ("Jio, Airtel and Vi raise mobile tariffs by up to 25%", {'jio', 'airtel', 'vi'}, set()),
+    ("Netflix review: a movie with services of stars", set(), {'vi'}),
+    ("Sensex, Nifty end higher as HDFC Bank, ICICI Bank gain", {'sensex', 'nifty', 'hdfc bank', 'icici'}, {'hdfc'}),
+    ("Supreme Court pulls up SEBI over delay in Adani-Hindenburg probe", {'sebi', 'adani'}, set()),
+    ("Ola Electric IPO subscribed 4.27 times on final day", {'ola', 'ipo'}, set()),
+    ("Mamata Banerjee slams Centre over West Bengal funds", {'mamata banerjee', 'west bengal'}, {'mamata', 'bengal'}),
+    ("Rahul Gandhi files nomination from Rae Bareli amid roadshow", {'rahul gandhi'}, {'rahul'}),
+    ("Ratan Tata, industrialist and philanthropist, passes away at 86", {'ratan tata'}, {'tata'}),
+    ("BYJU'S lays off 500 more employees amid funding crunch", {'byju s'}, {'byju'}),
+]
+
+@pytest.fixture(scope='module')
+def handler(tmp_path_factory):
+    # Built from the shipped entities.json, with the index cache kept out of the repository
+    cache_file = tmp_path_factory.mktemp('registry') / 'entities.index.pickle'
+    return MentionHandler(EntityRegistry(REGISTRY_FILE, cache_file=str(cache_file)))
+
+@pytest.mark.parametrize('headline, expected, unexpected', HEADLINE_CASES, ids=[case[0][:40] for case in HEADLINE_CASES])
+def test_headline_entities(handler, headline, expected, unexpected):
+    found = {keyword for keyword, _, _ in handler.extract_entities(headline.lower())}
+    assert expected <= found
+    assert not unexpected & found
+
+def test_no_opposition_tags_without_a_real_trigger(handler):
+    # "Honda agenda" and "Shahdara" contain nda/shah only as substrings
+    assert '@RahulGandhi' not in handler.extract_mentions("Honda agenda for the Shahdara plant: more cars")
+
+def test_modi_mentions_come_first(handler):
+    assert handler.extract_mentions("Modi to address a rally in Varanasi today")[:2] == ['@narendramodi', '@PMOIndia']
+
+def test_dotted_capital_i_in_headline(handler):
+    # Case folding that changes the text length used to crash the whole extraction
+    assert '@narendramodi' in handler.extract_mentions("İNDIA: PM Modi inaugurates Mumbai metro")
@@ -0,0 +1,52 @@
+"""
+Thread posting: a thread that fails halfway is queued and resumed without posting its first parts again
+"""
+import pytest
+import tweepy
+from main import TwitterAutomation
+
+THREAD_TEXT = " ".join(
+    f"Sentence number {n} of a long thread about the budget session, with enough words to fill a tweet."
+    for n in range(12)
+)
+
+class FakeClient:
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on  # Index of the create_tweet call that raises
+        self.posted = []  # (text, in_reply_to_tweet_id) of every successful call
+
+    def create_tweet(self, text, in_reply_to_tweet_id=None, media_ids=None):
+        if len(self.posted) == self.fail_on:
+            self.fail_on = None
+            raise tweepy.TweepyException("503 Service Unavailable")
+        self.posted.append((text, in_reply_to_tweet_id))
+        return tweepy.Response(data={'id': f"id-{len(self.posted)}"}, includes={}, errors=[], meta={})
+
+@pytest.fixture
+def automation(tmp_path, monkeypatch):
+    # State files (outbox, posted news, rate limits) are relative paths - keep them in the test directory
+    monkeypatch.chdir(tmp_path)
+    return TwitterAutomation()
+
+def test_failed_thread_is_resumed_from_the_outbox(automation):
+    client = FakeClient(fail_on=2)
+    automation.twitter_poster._client = client
+
+    success, tweet_ids = automation.post_thread(THREAD_TEXT)
+    assert not success
+    assert tweet_ids == ['id-1', 'id-2']
+
+    entry, = automation.outbox.entries
+    parts = entry['thread_parts']
+    assert len(parts) > 3
+    assert entry['posted_ids'] == ['id-1', 'id-2']
+    assert entry['last_error'] == 'error'
+
+    entry['next_attempt_at'] = 0  # Skip the backoff
+    assert automation.retry_outbox() == 1
+    assert len(automation.outbox) == 0
+
+    # Every part posted exactly once, each replying to the previous one
+    assert [text for text, _ in client.posted] == parts
+    assert [reply_to for _, reply_to in client.posted] == [None] + [f"id-{n}" for n in range(1, len(parts))]
+    assert automation.news_tracker.posted_news[-1]['tweet_id'] == 'id-1'
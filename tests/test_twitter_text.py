@@ -0,0 +1,45 @@
+"""
+Weighted length and cut points, checked against Twitter's counting rules and on generated tweets
+"""
+import random
+import pytest
+from twitter_text import _atomic_spans, find_cut, weighted_length
+
+WORDS = ['Sensex', 'Nifty', 'crashes', 'rallies', 'Modi', 'opposition', 'budget', 'inflation', 'RBI', 'rate',
+         '7.99', 'U.S.', 'banks', 'मुंबई', '東京', '🔥', '👍🏽', '🇮🇳', '👨‍👩‍👧', '—', '“quoted”',
+         'https://example.com/story?id=42', 'ndtv.com', 'www.moneycontrol.com/markets']
+PUNCTUATION = ['', '', '', ',', '.', '!', '?', ' -', '...']
+
+@pytest.mark.parametrize('text, expected', [
+    ('a' * 280, 280),
+    ('東' * 140, 280),
+    ('Read https://example.com/a/very/long/path/to/an/article', 5 + 23),
+    ('Read ndtv.com.', 5 + 23 + 1),
+    ('🔥', 2),
+    ('👨‍👩‍👧', 2),
+    ('🇮🇳', 2),
+    ('👍🏽', 2),
+    ('1️⃣', 2),
+    ('é', 1),
+])
+def test_weighted_length(text, expected):
+    assert weighted_length(text) == expected
+
+def test_decimal_point_is_not_a_sentence_end():
+    assert find_cut('Prices rose 7.99 percent today', 20)[1] != 'sentence'
+
+def test_cuts_on_generated_tweets():
+    rng = random.Random(7)
+    for _ in range(3000):
+        tweet = ' '.join(rng.choice(WORDS) + rng.choice(PUNCTUATION) for _ in range(rng.randint(5, 90)))
+        budget = rng.choice([60, 140, 280])
+        index, kind = find_cut(tweet, budget)
+        cut = tweet[:index].strip() + ('...' if kind == 'hard' else '')
+        # Fits the weighted budget, keeps a prefix of the original, never splits a URL or emoji
+        assert weighted_length(cut) <= budget, (tweet, budget, cut)
+        assert not any(start < index < end for start, end, _ in _atomic_spans(tweet)), (tweet, index)
+        if kind == 'fits':
+            assert cut == tweet.strip()
+        elif kind != 'hard':
+            # A boundary cut keeps most of the budget
+            assert weighted_length(tweet[:index].strip()) > budget * 0.6, (tweet, budget, kind)
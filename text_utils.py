@@ -2,138 +2,160 @@
 Text Utilities - Helper functions for tweet text processing
 """
 import re
+from functools import lru_cache
+from twitter_text import MAX_WEIGHTED_LENGTH, find_cut, normalize, scan_boundaries, text_offsets, weighted_length
 
-def truncate_tweet_complete(tweet_text: str, max_length: int = 280) -> str:
+SCAN_CACHE_SIZE = 1024  # (text, budget) scans kept - candidates are checked again by ranking and mentions
+
+@lru_cache(maxsize=SCAN_CACHE_SIZE)
+def scan_tweet(tweet_text: str, max_length: int = MAX_WEIGHTED_LENGTH) -> tuple:
     """
-    Truncate tweet to ensure it's complete (ends at sentence boundary)
-    Never cuts mid-sentence - ensures tweet is always complete
+    One scan of a (normalized) tweet: (cut, kind, weighted length, complete)
+    cut/kind: best place to cut it to fit max_length (see twitter_text.find_cut)
+    complete: fits, and ensure_complete_tweet would leave it as it is
+    Memoized, so ranking, completion and mention checks on the same candidate share one scan
     """
-    if len(tweet_text) <= max_length:
-        return tweet_text
-    
-    # Try to find a sentence boundary (., !, ?) before the limit
-    # Look for the last sentence ending within the limit
-    truncated = tweet_text[:max_length]
-    
-    # Find the last sentence ending (., !, ?) in the truncated text
-    # Look for patterns: ". ", "! ", "? " (sentence ending followed by space)
-    sentence_endings = ['. ', '! ', '? ', '.', '!', '?']
-    last_sentence_end = -1
-    best_ending = None
-    
-    for ending in sentence_endings:
-        pos = truncated.rfind(ending)
-        if pos > last_sentence_end:
-            last_sentence_end = pos
-            best_ending = ending
-    
-    # If we found a sentence ending, cut there (include the ending)
-    if last_sentence_end > max_length * 0.6:  # At least 60% of the way through
-        if best_ending and best_ending.endswith(' '):
-            # Ending with space - cut before the space
-            return tweet_text[:last_sentence_end + len(best_ending)].strip()
-        else:
-            # Ending without space - include the punctuation
-            return tweet_text[:last_sentence_end + len(best_ending)].strip()
-    
-    # If no good sentence ending, try to find a natural break point
-    # Look for common phrase endings: ", ", " - ", " | ", etc.
-    break_points = [', ', ' - ', ' | ', '...', '…']
-    last_break = -1
-    best_break = None
-    
-    for break_point in break_points:
-        pos = truncated.rfind(break_point)
-        if pos > last_break and pos > max_length * 0.7:
-            last_break = pos
-            best_break = break_point
-    
-    if last_break > max_length * 0.7:
-        return tweet_text[:last_break + len(best_break)].strip()
+    offsets, urls = text_offsets(tweet_text)
+    length = offsets[-1] if offsets else len(tweet_text)
+    cut, kind = find_cut(tweet_text, max_length, offsets, urls)
+    complete = (kind == 'fits' and not tweet_text.endswith('...')
+                and _complete_ending(tweet_text) == tweet_text)
+    return cut, kind, length, complete
+
+def analyze_candidates(candidates: list, max_length: int = MAX_WEIGHTED_LENGTH) -> list:
+    """
+    scan_tweet for every candidate (stripped): [(cut, kind, weighted length, complete)], same order
+    """
+    return [scan_tweet(normalize(candidate.strip()), max_length) for candidate in candidates]
+
+def _complete_ending(tweet_text: str) -> str:
+    """
+    Drop a dangling ending ("...", a trailing possessive) from a tweet that already fits
+    """
+    # If ends with "...", find the last complete sentence before it
+    if tweet_text.endswith('...'):
+        text_before_ellipsis = tweet_text.rstrip('.').rstrip()
+        found = scan_boundaries(text_before_ellipsis, start=int(len(text_before_ellipsis) * 0.6))
+        if found['sentence']:
+            # Found a sentence ending - use everything up to that point
+            return text_before_ellipsis[:found['sentence'][0]].strip()
+        # No sentence ending found - try a natural break (comma or dash) before the ellipsis
+        if found['clause'] and found['clause'][0] > len(text_before_ellipsis) * 0.7:
+            return text_before_ellipsis[:found['clause'][0]].strip()
     
-    # Last resort: find word boundary and ensure it's a complete thought
-    # Find the last space before the limit
-    last_space = truncated.rfind(' ')
+    # Check if ends with incomplete word (possessive without completion)
+    if tweet_text.endswith("'s"):
+        found = scan_boundaries(tweet_text, start=int(len(tweet_text) * 0.6))
+        if found['sentence']:
+            return tweet_text[:found['sentence'][0]].strip()
     
-    if last_space > max_length * 0.75:  # At least 75% of the way through
-        # Check if cutting here would leave an incomplete word/phrase
-        words_after = tweet_text[last_space:last_space+20].strip()
-        # If the next word is very short or looks incomplete, go back further
-        if len(words_after.split()[0]) < 3:
-            # Find previous space
-            prev_space = truncated[:last_space].rfind(' ')
-            if prev_space > max_length * 0.6:
-                return tweet_text[:prev_space].strip()
-        
-        return tweet_text[:last_space].strip()
+    return tweet_text
+
+def truncate_tweet_complete(tweet_text: str, max_length: int = MAX_WEIGHTED_LENGTH) -> str:
+    """
+    Truncate tweet to ensure it's complete (ends at sentence boundary)
+    Never cuts mid-sentence - ensures tweet is always complete
+    Length is counted the way Twitter counts it (links 23, emoji and CJK 2 - see twitter_text)
+    """
+    tweet_text = normalize(tweet_text)
     
-    # Absolute last resort - cut at limit but try to make it look complete
-    return tweet_text[:max_length - 3].strip() + "..."
+    # One scan for the best boundary: sentence end > clause break > word > hard cut
+    cut, kind, _, _ = scan_tweet(tweet_text, max_length)
+    if kind == 'fits':
+        return tweet_text
+    if kind == 'hard':
+        # Absolute last resort - cut at limit but try to make it look complete
+        return tweet_text[:cut].strip() + "..."
+    return tweet_text[:cut].strip()
 
-def ensure_complete_tweet(tweet_text: str, max_length: int = 280) -> str:
+def ensure_complete_tweet(tweet_text: str, max_length: int = MAX_WEIGHTED_LENGTH) -> str:
     """
     Ensure tweet is complete and properly formatted
     Removes incomplete sentences, ensures proper ending
     """
-    tweet_text = tweet_text.strip()
-    
-    # If tweet is already under limit, check if it ends properly
-    if len(tweet_text) <= max_length:
-        # Check if tweet ends with incomplete sentence markers
-        # If ends with "...", find the last complete sentence before it
-        if tweet_text.endswith('...') or tweet_text.endswith("'s...") or tweet_text.endswith("'s "):
-            # Find the last complete sentence ending before the ellipsis
-            # Remove the "..." and find last sentence boundary
-            text_before_ellipsis = tweet_text.rstrip('...').rstrip()
-            
-            # Look for last sentence ending
-            for ending in ['. ', '! ', '? ', '.', '!', '?']:
-                pos = text_before_ellipsis.rfind(ending)
-                if pos > len(text_before_ellipsis) * 0.6:
-                    # Found a sentence ending - use everything up to that point
-                    if ending.endswith(' '):
-                        return text_before_ellipsis[:pos + len(ending)].strip()
-                    else:
-                        # Ending without space - check if there's space after
-                        if pos + 1 < len(text_before_ellipsis) and text_before_ellipsis[pos + 1] == ' ':
-                            return text_before_ellipsis[:pos + 2].strip()
-                        else:
-                            return text_before_ellipsis[:pos + 1].strip()
-            
-            # No sentence ending found - try to find a natural break
-            # Look for comma or dash before the ellipsis
-            for break_point in [', ', ' - ', ' | ']:
-                pos = text_before_ellipsis.rfind(break_point)
-                if pos > len(text_before_ellipsis) * 0.7:
-                    return text_before_ellipsis[:pos + len(break_point)].strip()
-        
-        # Check if ends with incomplete word (possessive without completion)
-        if tweet_text.endswith("'s") or tweet_text.endswith("'s "):
-            # Find last complete sentence
-            for ending in ['. ', '! ', '? ']:
-                pos = tweet_text.rfind(ending)
-                if pos > len(tweet_text) * 0.6:
-                    return tweet_text[:pos + len(ending)].strip()
-        
+    tweet_text = normalize(tweet_text.strip())
+    _, kind, _, complete = scan_tweet(tweet_text, max_length)
+    if complete:
         return tweet_text
     
+    # If tweet is already under limit, only its ending needs fixing
+    if kind == 'fits':
+        return _complete_ending(tweet_text)
+    
     # Tweet is over limit - truncate intelligently
     tweet_text = truncate_tweet_complete(tweet_text, max_length)
     
     # Final check - ensure it's under limit
-    if len(tweet_text) > max_length:
-        # Emergency truncation - find last complete sentence
-        for ending in ['. ', '! ', '? ']:
-            pos = tweet_text[:max_length].rfind(ending)
-            if pos > max_length * 0.6:
-                return tweet_text[:pos + len(ending)].strip()
-        
-        # No sentence ending found - cut at word boundary
-        words = tweet_text[:max_length - 3].rsplit(' ', 1)[0]
-        if len(words) > 50:
-            return words.strip()
-        else:
-            return tweet_text[:max_length - 3].strip() + "..."
+    if weighted_length(tweet_text) > max_length:
+        # Emergency truncation - hard cut that never splits a link or emoji
+        cut, _ = find_cut(tweet_text, max_length - 3)
+        return tweet_text[:cut].strip()
     
     return tweet_text
 
+def split_into_thread(tweet_text: str, max_length: int = MAX_WEIGHTED_LENGTH, numbered: bool = True) -> list:
+    """
+    Split long text into a list of tweets for a reply chain
+    Splits at sentence boundaries, falls back to word boundaries for very long sentences
+    numbered: Append " i/n" to every part (space for it is reserved in each part)
+    """
+    tweet_text = normalize(tweet_text.strip())
+    if weighted_length(tweet_text) <= max_length:
+        return [tweet_text] if tweet_text else []
+    
+    # Reserve room for the " 12/12" counter
+    budget = max_length - 6 if numbered else max_length
+    
+    # Break into sentences, then break sentences that are still too long at clause/word boundaries
+    pieces = []
+    for sentence in re.split(r'(?<=[.!?])\s+', tweet_text):
+        sentence = sentence.strip()
+        while weighted_length(sentence) > budget:
+            cut, _ = find_cut(sentence, budget)
+            pieces.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if sentence:
+            pieces.append(sentence)
+    
+    # Greedily pack sentences into as few tweets as possible
+    parts = []
+    current = ''
+    for piece in pieces:
+        candidate = f"{current} {piece}" if current else piece
+        if weighted_length(candidate) <= budget:
+            current = candidate
+        else:
+            parts.append(current)
+            current = piece
+    if current:
+        parts.append(current)
+    
+    if numbered and len(parts) > 1:
+        parts = [f"{part} {i}/{len(parts)}" for i, part in enumerate(parts, 1)]
+    return parts
+
+if __name__ == '__main__':
+    # Picking among candidates as content_generator + mention_handler do: rank, complete, make room for mentions
+    import timeit
+    
+    candidates = [f"Sensex sheds {n}.5% as FIIs exit banks, Nifty slips below 22,000. Retail investors left holding the "
+                  f"bag again while 'experts' cheer on TV! Who pays for this? #StockMarket {'🔥' * (n % 3)}" * (1 + n % 2)
+                  for n in range(8)]
+    
+    def pick():
+        best = max(zip(candidates, analyze_candidates(candidates)), key=lambda item: (item[1][3], item[1][2]))[0]
+        tweet = ensure_complete_tweet(best)
+        return truncate_tweet_complete(tweet, 280 - len(' @NSEIndia @BSEIndia'))
+    
+    # Every cache miss is one full scan of a tweet
+    scan_tweet.cache_clear()
+    pick()
+    cold_scans = scan_tweet.cache_info().misses
+    pick()
+    warm_scans = scan_tweet.cache_info().misses - cold_scans
+    print(f"{len(candidates)} candidates: {cold_scans} scans cold, {warm_scans} when picked again")
+    
+    runs = 200
+    cold = min(timeit.repeat(lambda: (scan_tweet.cache_clear(), pick()), number=runs, repeat=3)) / runs
+    warm = min(timeit.repeat(pick, number=runs, repeat=3)) / runs
+    print(f"pick best of {len(candidates)}: {cold * 1e6:.0f} µs cold, {warm * 1e6:.0f} µs memoized")
@@ -6,11 +6,45 @@ import os
 import requests
 import tempfile
 import re
+import time
+import json
+import hashlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
+from deadlines import bound_session
+from instrumentation import span, traced
+from json_store import save_json
+from rate_limits import RateLimitTracker
 
 load_dotenv()
 
+# Compiled once - used for every NewsAPI headline and scraped trend
+TRENDING_KEYWORD_PATTERN = re.compile(r'\b[A-Z][a-z]+\b|\b[A-Z]{2,}\b|\b\d+\b')
+NON_ALNUM_PATTERN = re.compile(r'[^a-zA-Z0-9]')
+TREND_CLASS_PATTERN = re.compile(r'trend|hashtag|topic', re.I)
+TREND_TEXT_CLEANUP_PATTERN = re.compile(r'[^\w\s#]')
+TREND_SCRIPT_PATTERN = re.compile(r'["\']([^"\']*trend[^"\']*)["\']', re.I)
+
+# Common words to ignore when extracting trending keywords
+TRENDING_STOP_WORDS = {
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'been',
+    'be', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would',
+    'could', 'should', 'may', 'might', 'must', 'can', 'this', 'that',
+    'these', 'those', 'india', 'indian', 'news', 'latest', 'breaking',
+    'update', 'report', 'says', 'said', 'according', 'source'
+}
+
+# Used when NewsAPI yields too few topics
+POPULAR_INDIAN_TOPICS = [
+    'Modi', 'BJP', 'Congress', 'RahulGandhi', 'YogiAdityanath',
+    'StockMarket', 'Nifty', 'Sensex', 'IndianEconomy',
+    'Delhi', 'Mumbai', 'Kolkata', 'Chennai', 'Bangalore',
+    'Elections', 'Politics', 'Development', 'India'
+]
+
 class TwitterPoster:
     def __init__(self):
         self.api_key = os.getenv('TWITTER_API_KEY')
@@ -19,24 +53,130 @@ class TwitterPoster:
         self.access_token_secret = os.getenv('TWITTER_ACCESS_TOKEN_SECRET')
         self.bearer_token = os.getenv('TWITTER_BEARER_TOKEN')
         
-        # Initialize Twitter API v2 client with OAuth 1.0a for write operations
-        self.client = tweepy.Client(
-            consumer_key=self.api_key,
-            consumer_secret=self.api_secret,
-            access_token=self.access_token,
-            access_token_secret=self.access_token_secret,
-            wait_on_rate_limit=True
-        )
+        # Outcome of the last post attempt, so callers can queue failed tweets in the outbox
+        self.last_error = None  # None, 'rate_limit', 'unauthorized' or 'error'
+        self.retry_after = None  # Epoch seconds when the rate limit resets (if known)
+        
+        # Rate limit budgets captured from every Twitter response
+        self.rate_limits = RateLimitTracker()
+        
+        # Pooled HTTP connections for NewsAPI, trend pages and image downloads (kept warm in --daemon mode),
+        # timeouts capped at the run deadline of the async pipeline
+        self.session = bound_session(requests.Session())
+        
+        # Clients are built on first use - dry runs and trend-only runs never pay for both
+        self._client = None
+        self._api_v1 = None
+        
+        # Dry run: everything up to create_tweet runs for real except the media upload (the image is
+        # downloaded, the upload is stubbed unless DRY_RUN_UPLOAD=1), the tweet itself is not posted
+        self.dry_run = False
+        self.dry_run_upload = os.getenv('DRY_RUN_UPLOAD', '0') == '1'
+        
+        # Cached result of the last successful credential check
+        self.identity_cache_file = 'twitter_identity.json'
+        self.identity_ttl = float(os.getenv('TWITTER_IDENTITY_TTL_HOURS', '12')) * 60 * 60
+    
+    @property
+    def client(self):
+        """
+        Twitter API v2 client with OAuth 1.0a for write operations (built on first use)
+        wait_on_rate_limit is off: sleeping up to 15 minutes would block the whole run,
+        rate-limited tweets go to the outbox instead
+        """
+        if self._client is None:
+            self._client = tweepy.Client(
+                consumer_key=self.api_key,
+                consumer_secret=self.api_secret,
+                access_token=self.access_token,
+                access_token_secret=self.access_token_secret,
+                wait_on_rate_limit=False
+            )
+            # Capture x-rate-limit-* headers, end calls by the run deadline (tweepy sets no timeout)
+            self._client.session.hooks['response'].append(self.rate_limits.response_hook)
+            bound_session(self._client.session)
+        return self._client
+    
+    @property
+    def api_v1(self):
+        """
+        Twitter API v1.1 for media uploads and trends (built on first use)
+        """
+        if self._api_v1 is None:
+            auth = tweepy.OAuth1UserHandler(
+                self.api_key,
+                self.api_secret,
+                self.access_token,
+                self.access_token_secret
+            )
+            self._api_v1 = tweepy.API(auth, wait_on_rate_limit=False)
+            self._api_v1.session.hooks['response'].append(self.rate_limits.response_hook)
+            bound_session(self._api_v1.session)
+        return self._api_v1
+    
+    def _credentials_fingerprint(self):
+        """
+        Hash of all four OAuth credentials, so a cached identity is never reused for other keys
+        (rotating only the secrets must invalidate it too)
+        """
+        raw = f"{self.api_key}|{self.api_secret}|{self.access_token}|{self.access_token_secret}"
+        return hashlib.sha256(raw.encode()).hexdigest()[:16]
+    
+    def _load_cached_identity(self):
+        """
+        Return the cached verified identity if it is for these credentials and within TTL
+        """
+        if not os.path.exists(self.identity_cache_file):
+            return None
+        try:
+            with open(self.identity_cache_file, 'r') as f:
+                identity = json.load(f)
+        except:
+            return None
+        if identity.get('fingerprint') != self._credentials_fingerprint():
+            return None
+        if time.time() - identity.get('verified_at', 0) > self.identity_ttl:
+            return None
+        return identity
     
-        # Initialize API v1.1 for media uploads (required for images)
-        auth = tweepy.OAuth1UserHandler(
-            self.api_key,
-            self.api_secret,
-            self.access_token,
-            self.access_token_secret
-        )
-        self.api_v1 = tweepy.API(auth, wait_on_rate_limit=True)
+    def _save_cached_identity(self, user):
+        """
+        Persist the verified identity
+        """
+        try:
+            save_json(self.identity_cache_file, {
+                'id': str(user.id),
+                'username': user.username,
+                'fingerprint': self._credentials_fingerprint(),
+                'verified_at': int(time.time())
+            })
+        except Exception as e:
+            print(f"Error saving identity cache: {e}")
     
+    def _invalidate_cached_identity(self):
+        """
+        Drop the cached identity (e.g. after a 401)
+        """
+        try:
+            if os.path.exists(self.identity_cache_file):
+                os.unlink(self.identity_cache_file)
+        except:
+            pass
+    
+    def _rate_limit_reset(self, error):
+        """
+        Extract the rate limit reset time (epoch seconds) from a TooManyRequests error
+        Falls back to 15 minutes from now (Twitter's rate limit window)
+        """
+        try:
+            reset = error.response.headers.get('x-rate-limit-reset')
+            if reset:
+                return int(reset)
+        except Exception:
+            pass
+        return int(time.time()) + 15 * 60
+    
+    @traced('http.image_download')
     def _download_image(self, image_url):
         """
         Download image from URL and return temporary file path
@@ -46,13 +186,14 @@ class TwitterPoster:
                 return None
             
             print(f"📥 Downloading image from: {image_url[:50]}...")
-            response = requests.get(image_url, timeout=10, stream=True)
+            response = self.session.get(image_url, timeout=10, stream=True)
             response.raise_for_status()
             
             # Check if it's actually an image
             content_type = response.headers.get('content-type', '')
             if not content_type.startswith('image/'):
                 print("⚠️  URL is not an image, skipping...")
+                response.close()  # Hand the streamed connection back to the pool unread
                 return None
             
             # Create temporary file
@@ -67,14 +208,24 @@ class TwitterPoster:
             print(f"⚠️  Could not download image: {e}")
             return None
     
+    @traced('twitter.media_upload')
     def _upload_media(self, image_path):
         """
         Upload image to Twitter and return media_id
+        Dry runs return a fake media_id without uploading (unless dry_run_upload is set)
         """
         try:
             if not image_path or not os.path.exists(image_path):
                 return None
             
+            if self.dry_run and not self.dry_run_upload:
+                print(f"🧪 Dry run: not uploading image ({os.path.getsize(image_path)} bytes)")
+                return f"dry-run-media-{time.time_ns()}"
+            
+            if self.rate_limits.is_exhausted('media_upload'):
+                print("⚠️  Media upload rate limit exhausted, posting without image")
+                return None
+            
             print(f"📤 Uploading image to Twitter...")
             media = self.api_v1.media_upload(image_path)
             print(f"✅ Image uploaded! Media ID: {media.media_id}")
@@ -84,16 +235,26 @@ class TwitterPoster:
             print(f"⚠️  Could not upload image: {e}")
             return None
     
-    def post_tweet(self, tweet_text, image_url=None):
+    def post_tweet(self, tweet_text, image_url=None, media_id=None):
         """
         Post a tweet to Twitter with optional image
+        media_id: image already uploaded with prepare_media (image_url is not downloaded again)
         """
-        media_id = None
         temp_image_path = None
+        self.last_error = None
+        self.retry_after = None
+        
+        # Don't make a call that is sure to fail - let the caller queue the tweet
+        if not self.dry_run and self.rate_limits.is_exhausted('create_tweet'):
+            self.last_error = 'rate_limit'
+            self.retry_after = self.rate_limits.reset_at('create_tweet')
+            wait_minutes = max(0, int((self.retry_after - time.time()) / 60))
+            print(f"❌ Tweet rate limit budget exhausted. Resets in ~{wait_minutes} min, not posting.")
+            return False, None
         
         try:
             # Download and upload image if provided
-            if image_url:
+            if image_url and not media_id:
                 temp_image_path = self._download_image(image_url)
                 if temp_image_path:
                     media_id = self._upload_media(temp_image_path)
@@ -103,29 +264,38 @@ class TwitterPoster:
             tweet_text = ensure_complete_tweet(tweet_text, max_length=280)
             
             # Post the tweet with or without media
-            if media_id:
-                response = self.client.create_tweet(text=tweet_text, media_ids=[media_id])
+            with span('twitter.create_tweet', media=bool(media_id), dry_run=self.dry_run):
+                if media_id:
+                    response = self._create_tweet(text=tweet_text, media_ids=[media_id])
+                else:
+                    response = self._create_tweet(text=tweet_text)
+            if media_id and not self.dry_run:
                 print("📸 Tweet posted with image!")
-            else:
-                response = self.client.create_tweet(text=tweet_text)
             
             if response.data:
                 tweet_id = response.data['id']
-                print(f"✅ Tweet posted successfully! Tweet ID: {tweet_id}")
+                print(f"✅ {'Dry run finished, fake' if self.dry_run else 'Tweet posted successfully!'} Tweet ID: {tweet_id}")
                 print(f"📝 Tweet: {tweet_text[:100]}...")
                 return True, tweet_id
             else:
                 print("❌ Failed to post tweet: No response data")
+                self.last_error = 'error'
                 return False, None
                 
-        except tweepy.TooManyRequests:
-            print("❌ Rate limit exceeded. Please wait before posting again.")
+        except tweepy.TooManyRequests as e:
+            self.last_error = 'rate_limit'
+            self.retry_after = self._rate_limit_reset(e)
+            wait_minutes = max(0, int((self.retry_after - time.time()) / 60))
+            print(f"❌ Rate limit exceeded. Resets in ~{wait_minutes} min, not waiting.")
             return False, None
         except tweepy.Unauthorized:
             print("❌ Unauthorized: Check your Twitter API credentials")
+            self.last_error = 'unauthorized'
+            self._invalidate_cached_identity()
             return False, None
         except Exception as e:
             print(f"❌ Error posting tweet: {e}")
+            self.last_error = 'error'
             return False, None
         finally:
             # Clean up temporary image file
@@ -135,29 +305,157 @@ class TwitterPoster:
                 except:
                     pass
     
-    def verify_credentials(self):
+    def _create_tweet(self, **params):
+        """
+        client.create_tweet, or a stand-in response with a fake ID when dry_run is set (nothing is posted)
+        """
+        if not self.dry_run:
+            return self.client.create_tweet(**params)
+        print(f"🧪 Dry run: not calling create_tweet ({len(params['text'])} chars"
+              f"{', with image' if params.get('media_ids') else ''})")
+        return tweepy.Response(data={'id': f"dry-run-{time.time_ns()}"}, includes={}, errors=[], meta={})
+    
+    def prepare_media(self, image_url):
+        """
+        Download and upload one image, return media_id (None if anything fails)
+        Can run ahead of post_tweet/post_thread, e.g. while the tweet is still being generated
+        """
+        temp_image_path = self._download_image(image_url)
+        if not temp_image_path:
+            return None
+        try:
+            return self._upload_media(temp_image_path)
+        finally:
+            try:
+                os.unlink(temp_image_path)
+            except:
+                pass
+    
+    def post_thread(self, parts, image_urls=None, posted_ids=None):
+        """
+        Post a reply chain (thread)
+        parts: list of tweet texts, or one long text that is split at sentence boundaries
+        image_urls: optional list aligned with parts (one image per tweet, None for no image)
+        posted_ids: tweet IDs already posted for this thread - resumes after the last one
+                    instead of posting the thread again
+        Returns (success, tweet_ids) - on failure tweet_ids holds the parts posted so far,
+        pass them back as posted_ids to resume
+        """
+        from text_utils import split_into_thread, ensure_complete_tweet
+        
+        if isinstance(parts, str):
+            parts = split_into_thread(parts, max_length=280)
+        parts = [ensure_complete_tweet(part, max_length=280) for part in parts]
+        tweet_ids = list(posted_ids or [])
+        pending = list(range(len(tweet_ids), len(parts)))
+        self.last_error = None
+        self.retry_after = None
+        
+        if not pending:
+            return True, tweet_ids
+        
+        # Don't start (or continue) a thread the remaining budget can't finish
+        remaining = self.rate_limits.remaining('create_tweet')
+        if not self.dry_run and remaining is not None and remaining < len(pending):
+            self.last_error = 'rate_limit'
+            self.retry_after = self.rate_limits.reset_at('create_tweet')
+            print(f"❌ Only {remaining} tweets left in rate limit budget, thread needs {len(pending)}. Not posting.")
+            return False, tweet_ids
+        
+        # Upload all media first, concurrently, so the chain itself is only create_tweet calls
+        media_ids = {}
+        image_urls = image_urls or []
+        media_jobs = {i: image_urls[i] for i in pending if i < len(image_urls) and image_urls[i]}
+        if media_jobs:
+            with ThreadPoolExecutor(max_workers=min(4, len(media_jobs))) as executor:
+                futures = {i: executor.submit(self.prepare_media, url) for i, url in media_jobs.items()}
+            media_ids = {i: future.result() for i, future in futures.items() if future.result()}
+        
+        if tweet_ids:
+            print(f"🔁 Resuming thread after {len(tweet_ids)} posted tweet(s)")
+        
+        try:
+            for i in pending:
+                params = {'text': parts[i]}
+                if tweet_ids:
+                    params['in_reply_to_tweet_id'] = tweet_ids[-1]
+                if i in media_ids:
+                    params['media_ids'] = [media_ids[i]]
+                with span('twitter.create_tweet', media=i in media_ids, thread_part=i + 1, dry_run=self.dry_run):
+                    response = self._create_tweet(**params)
+                if not response.data:
+                    print(f"❌ Failed to post thread part {i + 1}/{len(parts)}: No response data")
+                    self.last_error = 'error'
+                    return False, tweet_ids
+                tweet_ids.append(response.data['id'])
+                print(f"✅ Thread part {i + 1}/{len(parts)} posted! Tweet ID: {tweet_ids[-1]}")
+            return True, tweet_ids
+        
+        except tweepy.TooManyRequests as e:
+            self.last_error = 'rate_limit'
+            self.retry_after = self._rate_limit_reset(e)
+            print(f"❌ Rate limit exceeded after {len(tweet_ids)}/{len(parts)} thread parts, not waiting.")
+            return False, tweet_ids
+        except tweepy.Unauthorized:
+            print("❌ Unauthorized: Check your Twitter API credentials")
+            self.last_error = 'unauthorized'
+            self._invalidate_cached_identity()
+            return False, tweet_ids
+        except Exception as e:
+            print(f"❌ Error posting thread after {len(tweet_ids)}/{len(parts)} parts: {e}")
+            self.last_error = 'error'
+            return False, tweet_ids
+    
+    def verify_credentials(self, force=False):
         """
         Verify Twitter API credentials
+        Uses the cached identity (TWITTER_IDENTITY_TTL_HOURS, default 12) unless force=True
         """
+        if not force:
+            identity = self._load_cached_identity()
+            if identity:
+                print(f"✅ Twitter API credentials verified (cached) as: @{identity['username']}")
+                return True
+        
+        if self.rate_limits.is_exhausted('get_me'):
+            # Exhausted budget means earlier calls with these credentials succeeded
+            print("⚠️  get_me rate limit exhausted, skipping credential check")
+            return True
         try:
-            me = self.client.get_me()
+            with span('twitter.get_me'):
+                me = self.client.get_me()
             if me.data:
                 print(f"✅ Twitter API connected! Logged in as: @{me.data.username}")
+                self._save_cached_identity(me.data)
                 return True
             return False
         except Exception as e:
             print(f"❌ Error verifying credentials: {e}")
             return False
     
+    def get_rate_limit_summary(self):
+        """
+        Remaining rate limit budget per Twitter endpoint
+        """
+        return self.rate_limits.summary()
+    
     def get_trending_topics(self, woeid=23424848):
         """
         Get trending topics for India (woeid 23424848)
         Returns list of trending topic names
         Falls back to NewsAPI if Twitter trends API is not available
         """
+        if self.rate_limits.is_exhausted('trends'):
+            print("⚠️  Twitter trends rate limit exhausted, skipping trends API")
+            scraped_trends = self._scrape_twitter_trends()
+            if scraped_trends:
+                return scraped_trends
+            return self._get_trending_from_newsapi()
+        
         try:
             # Use existing API v1.1 instance for trends (v2 doesn't have trends endpoint)
-            trends = self.api_v1.get_place_trends(woeid)
+            with span('twitter.trends'):
+                trends = self.api_v1.get_place_trends(woeid)
             
             if trends and len(trends) > 0:
                 trending_list = [trend['name'] for trend in trends[0]['trends'][:10]]
@@ -180,14 +478,29 @@ class TwitterPoster:
                     return scraped_trends
                 return self._get_trending_from_newsapi()
     
+    def _fetch_newsapi_titles(self, url, params, label):
+        """
+        Fetch one NewsAPI endpoint and return up to 20 article titles
+        """
+        try:
+            with span('newsapi.trends', endpoint=label) as call:
+                response = self.session.get(url, params=params, timeout=10)
+                call.set(status=response.status_code)
+            if response.status_code == 200:
+                data = response.json()
+                if data.get('status') == 'ok':
+                    return [a.get('title', '') for a in data.get('articles', [])[:20] if a.get('title')]
+        except Exception as e:
+            print(f"⚠️  {label} failed: {str(e)[:50]}")
+        return []
+    
     def _get_trending_from_newsapi(self):
         """
         Fallback: Get trending topics from NewsAPI by fetching popular news
-        Improved version that generates better trending topics
+        Topics are ranked by how many headlines mention them. The everything endpoint is only
+        queried when top headlines give fewer than 5 topics (every call counts against the NewsAPI quota)
         """
         try:
-            import os
-            import re
             from datetime import datetime, timedelta
             news_api_key = os.getenv('NEWS_API_KEY')
             
@@ -195,144 +508,87 @@ class TwitterPoster:
                 print("⚠️  NEWS_API_KEY not found, cannot fetch trending topics")
                 return []
             
-            trending_topics = []
-            seen_topics = set()
+            # Method 1: Top headlines from India (most reliable)
+            headlines_params = {
+                'country': 'in',  # India
+                'pageSize': 30,
+                'apiKey': news_api_key
+            }
+            titles = self._fetch_newsapi_titles('https://newsapi.org/v2/top-headlines', headlines_params, 'Top headlines')
+            counts, display = self._count_keywords(titles)
             
-            # Method 1: Try top headlines from India (most reliable)
-            try:
-                headlines_url = 'https://newsapi.org/v2/top-headlines'
-                params = {
-                    'country': 'in',  # India
+            # Method 2: If not enough topics, add popular India stories from the last 12 hours
+            if len(counts) < 5:
+                everything_params = {
+                    'q': 'India',
+                    'language': 'en',
+                    'sortBy': 'popularity',
                     'pageSize': 30,
+                    'from': (datetime.now() - timedelta(hours=12)).strftime('%Y-%m-%dT%H:%M:%S'),
                     'apiKey': news_api_key
                 }
-                
-                response = requests.get(headlines_url, params=params, timeout=10)
-                if response.status_code == 200:
-                    data = response.json()
-                    if data.get('status') == 'ok':
-                        articles = data.get('articles', [])
-                        
-                        for article in articles[:20]:
-                            title = article.get('title', '')
-                            if title:
-                                # Extract trending keywords from title
-                                topics = self._extract_trending_keywords(title)
-                                for topic in topics:
-                                    topic_lower = topic.lower()
-                                    if topic_lower not in seen_topics and len(topic) > 3:
-                                        trending_topics.append(topic)
-                                        seen_topics.add(topic_lower)
-            except Exception as e:
-                print(f"⚠️  Top headlines failed: {str(e)[:50]}")
+                titles += self._fetch_newsapi_titles(
+                    'https://newsapi.org/v2/everything', everything_params, 'Everything endpoint'
+                )
+                counts, display = self._count_keywords(titles)
             
-            # Method 2: If not enough topics, try everything endpoint
-            if len(trending_topics) < 5:
-                try:
-                    everything_url = 'https://newsapi.org/v2/everything'
-                    from_date = (datetime.now() - timedelta(hours=12)).strftime('%Y-%m-%dT%H:%M:%S')
-                    
-                    params = {
-                        'q': 'India',
-                        'language': 'en',
-                        'sortBy': 'popularity',
-                        'pageSize': 30,
-                        'from': from_date,
-                        'apiKey': news_api_key
-                    }
-                    
-                    response = requests.get(everything_url, params=params, timeout=10)
-                    if response.status_code == 200:
-                        data = response.json()
-                        if data.get('status') == 'ok':
-                            articles = data.get('articles', [])
-                            
-                            for article in articles[:20]:
-                                title = article.get('title', '')
-                                if title:
-                                    topics = self._extract_trending_keywords(title)
-                                    for topic in topics:
-                                        topic_lower = topic.lower()
-                                        if topic_lower not in seen_topics and len(topic) > 3:
-                                            trending_topics.append(topic)
-                                            seen_topics.add(topic_lower)
-                except Exception as e:
-                    print(f"⚠️  Everything endpoint failed: {str(e)[:50]}")
+            # most_common keeps first-seen order for equal counts
+            trending_topics = [display[k] for k, _ in counts.most_common()]
             
-            # Method 3: Add popular Indian topics as fallback
+            # Add popular Indian topics as fallback
             if len(trending_topics) < 3:
-                popular_topics = [
-                    'Modi', 'BJP', 'Congress', 'RahulGandhi', 'YogiAdityanath',
-                    'StockMarket', 'Nifty', 'Sensex', 'IndianEconomy',
-                    'Delhi', 'Mumbai', 'Kolkata', 'Chennai', 'Bangalore',
-                    'Elections', 'Politics', 'Development', 'India'
-                ]
-                for topic in popular_topics:
-                    topic_lower = topic.lower()
-                    if topic_lower not in seen_topics:
+                for topic in POPULAR_INDIAN_TOPICS:
+                    if topic.lower() not in display:
                         trending_topics.append(topic)
-                        seen_topics.add(topic_lower)
             
             # Convert to hashtags
             hashtag_topics = []
-            for topic in trending_topics[:15]:
-                if not topic.startswith('#'):
-                    # Clean and convert to hashtag
-                    hashtag = '#' + re.sub(r'[^a-zA-Z0-9]', '', topic)
-                    if len(hashtag) > 1 and hashtag not in hashtag_topics:
-                        hashtag_topics.append(hashtag)
-                else:
-                    if topic not in hashtag_topics:
-                        hashtag_topics.append(topic)
+            seen_hashtags = set()
+            for topic in trending_topics:
+                hashtag = topic if topic.startswith('#') else '#' + NON_ALNUM_PATTERN.sub('', topic)
+                if len(hashtag) > 1 and hashtag not in seen_hashtags:
+                    hashtag_topics.append(hashtag)
+                    seen_hashtags.add(hashtag)
+                if len(hashtag_topics) >= 15:
+                    break
             
-            print(f"✅ Generated {len(hashtag_topics)} trending topics from NewsAPI")
-            return hashtag_topics[:15]
+            print(f"✅ Generated {len(hashtag_topics)} trending topics from NewsAPI ({len(titles)} headlines)")
+            return hashtag_topics
             
         except Exception as e:
             print(f"⚠️  Could not fetch trending topics from NewsAPI: {e}")
             # Return some default trending topics as last resort
             return ['#India', '#Politics', '#News', '#Trending', '#Breaking']
     
+    def _count_keywords(self, titles):
+        """
+        How many titles mention each keyword: (Counter by lowercase keyword, first-seen spelling)
+        """
+        counts = Counter()
+        display = {}
+        for title in titles:
+            for keyword in self._extract_trending_keywords(title):
+                keyword_lower = keyword.lower()
+                counts[keyword_lower] += 1
+                display.setdefault(keyword_lower, keyword)
+        return counts, display
+    
     def _extract_trending_keywords(self, title):
         """
-        Extract trending keywords from a news title
+        Extract up to 5 distinct trending keywords from a news title in one regex pass
+        Keeps capitalized words, acronyms and numbers that are not stop words
         """
-        import re
-        
-        # Common words to ignore
-        stop_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-            'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'been',
-            'be', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would',
-            'could', 'should', 'may', 'might', 'must', 'can', 'this', 'that',
-            'these', 'those', 'india', 'indian', 'news', 'latest', 'breaking',
-            'update', 'report', 'says', 'said', 'according', 'source'
-        }
-        
-        # Extract words (keep capitalized words, numbers, and important terms)
-        words = re.findall(r'\b[A-Z][a-z]+\b|\b[A-Z]{2,}\b|\b\d+\b', title)
-        
         keywords = []
-        for word in words:
+        seen = set()
+        for match in TRENDING_KEYWORD_PATTERN.finditer(title):
+            word = match.group()
             word_lower = word.lower()
-            # Skip if it's a stop word or too short
-            if word_lower not in stop_words and len(word) > 2:
+            if len(word) > 3 and word_lower not in TRENDING_STOP_WORDS and word_lower not in seen:
                 keywords.append(word)
-        
-        # Also extract quoted phrases (often trending topics)
-        quoted = re.findall(r'"([^"]+)"', title)
-        for phrase in quoted:
-            # Extract key words from quoted phrase
-            phrase_words = re.findall(r'\b[A-Z][a-z]+\b', phrase)
-            keywords.extend(phrase_words[:2])
-        
-        # Extract topics before colons (common in news titles)
-        if ':' in title:
-            before_colon = title.split(':')[0]
-            colon_keywords = re.findall(r'\b[A-Z][a-z]+\b', before_colon)
-            keywords.extend(colon_keywords[:2])
-        
-        return keywords[:5]  # Return top 5 keywords
+                seen.add(word_lower)
+                if len(keywords) >= 5:
+                    break
+        return keywords
     
     def _scrape_twitter_trends(self):
         """
@@ -377,7 +633,9 @@ class TwitterPoster:
                 # Example: trends24.in or similar services
                 trends_aggregator_url = "https://trends24.in/india/"
                 
-                response = requests.get(trends_aggregator_url, headers=headers, timeout=10)
+                with span('http.trends24') as call:
+                    response = self.session.get(trends_aggregator_url, headers=headers, timeout=10)
+                    call.set(status=response.status_code)
                 if response.status_code == 200:
                     soup = BeautifulSoup(response.content, 'html.parser')
                     
@@ -387,13 +645,13 @@ class TwitterPoster:
                     # Try to find trend elements (structure may vary)
                     # Look for common patterns
                     trend_elements = soup.find_all(['a', 'span', 'div'], 
-                                                   class_=re.compile(r'trend|hashtag|topic', re.I))
+                                                   class_=TREND_CLASS_PATTERN)
                     
                     for element in trend_elements[:20]:
                         text = element.get_text(strip=True)
                         if text and len(text) > 2 and len(text) < 50:
                             # Clean up the text
-                            text = re.sub(r'[^\w\s#]', '', text)
+                            text = TREND_TEXT_CLEANUP_PATTERN.sub('', text)
                             if text and text not in trending_topics:
                                 # Add # if not present
                                 if not text.startswith('#'):
@@ -410,7 +668,9 @@ class TwitterPoster:
             try:
                 # Try accessing Twitter's explore page
                 explore_url = "https://twitter.com/explore/tabs/trending"
-                response = requests.get(explore_url, headers=headers, timeout=10, allow_redirects=True)
+                with span('http.twitter_explore') as call:
+                    response = self.session.get(explore_url, headers=headers, timeout=10, allow_redirects=True)
+                    call.set(status=response.status_code)
                 
                 if response.status_code == 200:
                     # Twitter loads content dynamically, so HTML scraping is limited
@@ -424,7 +684,7 @@ class TwitterPoster:
                             data = script.string
                             if data and 'trend' in data.lower():
                                 # Try to extract trend names using regex
-                                trends = re.findall(r'["\']([^"\']*trend[^"\']*)["\']', data, re.I)
+                                trends = TREND_SCRIPT_PATTERN.findall(data)
                                 if trends:
                                     trending_topics = [f"#{t.replace(' ', '')}" if not t.startswith('#') else t 
                                                       for t in trends[:10] if len(t) > 2]
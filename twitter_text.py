@@ -0,0 +1,237 @@
+"""
+Twitter Text Module - Tweet length as Twitter counts it, and where to cut a tweet to fit
+
+Follows twitter-text v3 weighting: URLs count as 23, an emoji sequence counts as 2, code points in
+0-4351 and a few punctuation ranges count as 1, everything else (CJK, most symbols) counts as 2.
+"""
+import re
+import unicodedata
+from bisect import bisect_right
+
+MAX_WEIGHTED_LENGTH = 280
+URL_WEIGHT = 23  # Every link is shortened to t.co
+EMOJI_WEIGHT = 2
+# Code point ranges that count as 1 (everything else counts as 2)
+LIGHT_RANGES = ((0, 4351), (8192, 8205), (8208, 8223), (8242, 8247))
+
+# Links with a scheme or www., or bare domains with common TLDs; trailing punctuation is not part of the link
+URL_PATTERN = re.compile(
+    r'(?:https?://|www\.)[^\s<>"]+?(?=[.,!?:;)\]\'"]*(?:\s|$))'
+    r'|\b[a-z0-9][a-z0-9-]*(?:\.[a-z0-9-]+)*\.(?:com|in|org|net|io|co|gov|edu|info|news|ly|me|tv|ai)\b'
+    r'(?:/[^\s<>"]*?(?=[.,!?:;)\]\'"]*(?:\s|$)))?')
+
+# Emoji sequences: flags, keycaps, and pictographs with variation selectors, skin tones, ZWJ joins and tags
+EMOJI_BASE = (r'[\u203c\u2049\u2122\u2139\u2194-\u21aa\u231a-\u23ff\u24c2\u25aa-\u25fe\u2600-\u27bf'
+              r'\u2934\u2935\u2b05-\u2b55\u3030\u303d\u3297\u3299\U0001F000-\U0001FAFF]'
+              r'|[\u00a9\u00ae]\ufe0f')
+EMOJI_MODIFIERS = r'(?:\ufe0f|[\U0001F3FB-\U0001F3FF]|[\U000E0020-\U000E007F])*'
+EMOJI_PATTERN = re.compile(
+    r'[\U0001F1E6-\U0001F1FF]{2}'
+    r'|[0-9#*]\ufe0f?\u20e3'
+    rf'|(?:{EMOJI_BASE}){EMOJI_MODIFIERS}(?:\u200d(?:{EMOJI_BASE}){EMOJI_MODIFIERS})*')
+
+# Hints that a text may contain a link - the full URL pattern only runs when one is present
+# Both run on lowercased text (re.IGNORECASE is several times slower)
+URL_HINT_PATTERN = re.compile(r'://|www\.|\.(?:com|in|org|net|io|co|gov|edu|info|news|ly|me|tv|ai)\b')
+
+# Places a tweet can be cut, matched on the reversed text so the scan can start at the budget and stop early:
+# clause breaks (", " reversed), runs of sentence punctuation, and spaces
+REVERSED_BOUNDARY_PATTERN = re.compile(r'(?P<clause> ,| - | \| |\.\.\.|…)|(?P<sentence>[.!?]+)|(?P<space> )')
+
+def _char_weight(char):
+    code = ord(char)
+    for low, high in LIGHT_RANGES:
+        if low <= code <= high:
+            return 1
+    return 2
+
+def _atomic_spans(text):
+    """
+    (start, end, weight) of URLs and emoji sequences in text, in order
+    """
+    spans = []
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        lowered = text  # Lowercasing moved offsets (rare) - only lowercase links are recognized then
+    if URL_HINT_PATTERN.search(lowered):
+        spans = [(match.start(), match.end(), URL_WEIGHT) for match in URL_PATTERN.finditer(lowered)]
+    if not text.isascii():
+        spans += [(match.start(), match.end(), EMOJI_WEIGHT) for match in EMOJI_PATTERN.finditer(text)
+                  if not any(start <= match.start() < end for start, end, _ in spans)]
+        spans.sort()
+    return spans
+
+def weighted_offsets(text):
+    """
+    Weighted length of text[:i] for every i (None when every character counts as 1 - plain text)
+    Returns (offsets, url_spans); a URL or emoji's weight is added at its first character,
+    so a cut never lands inside one
+    """
+    spans = _atomic_spans(text)
+    urls = [(start, end) for start, end, weight in spans if weight == URL_WEIGHT]
+    if not spans and text.isascii():
+        return None, urls
+
+    offsets = [0] * (len(text) + 1)
+    total = 0
+    position = 0
+    for start, end, weight in spans + [(len(text), len(text), 0)]:
+        run = text[position:start]
+        if run.isascii():
+            offsets[position:start] = range(total, total + len(run))
+            total += len(run)
+        else:
+            for index in range(position, start):
+                offsets[index] = total
+                total += _char_weight(text[index])
+        if end > start:
+            offsets[start] = total
+            total += weight
+            offsets[start + 1:end] = [total] * (end - start - 1)
+        position = end
+    offsets[len(text)] = total
+    return offsets, urls
+
+def text_offsets(text):
+    """
+    weighted_offsets(), skipping the URL/emoji search for plain ASCII text without dots
+    """
+    if text.isascii() and '.' not in text:
+        return None, []
+    return weighted_offsets(text)
+
+def normalize(text):
+    """
+    NFC-normalize text like Twitter does before counting (a no-op for ASCII)
+    """
+    return text if text.isascii() else unicodedata.normalize('NFC', text)
+
+def weighted_length(text):
+    """
+    Length of text as Twitter counts it (after NFC normalization, like Twitter)
+    """
+    text = normalize(text)
+    offsets, _ = text_offsets(text)
+    return offsets[-1] if offsets else len(text)
+
+def _prefix_end(offsets, length, budget):
+    """
+    Largest i with weighted length of text[:i] <= budget (never inside a URL or emoji)
+    """
+    if offsets is None:
+        return max(min(budget, length), 0)
+    return max(bisect_right(offsets, budget) - 1, 0)
+
+def scan_boundaries(text, end=None, start=0, offsets=None, urls=None):
+    """
+    One backward pass over text[start:end] for the last sentence end, clause break and two last spaces
+    Stops at the first (rightmost) sentence end, since that beats any other boundary
+    Returns {'sentence', 'clause', 'space', 'prev_space'}: each (cut index, weighted position) or None
+    The cut index is where text would be cut (after the punctuation); boundaries inside URLs are ignored
+    """
+    if offsets is None and urls is None:
+        offsets, urls = weighted_offsets(text)
+    end = len(text) if end is None else end
+    found = {'sentence': None, 'clause': None, 'space': None, 'prev_space': None}
+    for match in REVERSED_BOUNDARY_PATTERN.finditer(text[start:end][::-1]):
+        first, after = end - match.end(), end - match.start()  # Span in the original text
+        if urls and any(url_start <= first < url_end for url_start, url_end in urls):
+            continue  # Dots inside a link aren't boundaries
+        position = offsets[first] if offsets else first
+        kind = match.lastgroup
+        if kind == 'sentence':
+            # Decimal points and abbreviations glued to the next word don't end a sentence
+            if text[after:after + 1].isalnum():
+                continue
+            found['sentence'] = (after, position)
+            break
+        elif kind == 'clause':
+            if found['clause'] is None:
+                found['clause'] = (after, position)
+        elif found['space'] is None:
+            found['space'] = (first, position)
+        elif found['prev_space'] is None:
+            found['prev_space'] = (first, position)
+    return found
+
+def find_cut(text, budget=MAX_WEIGHTED_LENGTH, offsets=None, urls=None):
+    """
+    Best place to cut text so it fits budget (weighted), in one scan
+    Returns (index, kind): 'fits' (index = len(text)), 'sentence', 'clause', 'word',
+    or 'hard' (cut at index and append "..." - index leaves room for it)
+    Preference: a sentence end past 60% of the budget, a clause break past 70%, a space past 75%
+    Non-ASCII text should already be NFC-normalized (see normalize()), or counts can differ from Twitter's
+    offsets/urls: text_offsets(text), if the caller already has them
+    """
+    if offsets is None and urls is None:
+        offsets, urls = text_offsets(text)
+    if (offsets[-1] if offsets else len(text)) <= budget:
+        return len(text), 'fits'
+
+    limit = _prefix_end(offsets, len(text), budget)
+    # Boundaries before 60% of the budget are never used
+    found = scan_boundaries(text, limit, _prefix_end(offsets, len(text), int(budget * 0.6)), offsets, urls)
+
+    if found['sentence'] and found['sentence'][1] > budget * 0.6:
+        return found['sentence'][0], 'sentence'
+    if found['clause'] and found['clause'][1] > budget * 0.7:
+        return found['clause'][0], 'clause'
+    if found['space'] and found['space'][1] > budget * 0.75:
+        space = found['space'][0]
+        # If the word cut off is very short the phrase looks unfinished - go back one more word
+        following = text[space:space + 20].split()
+        if following and len(following[0]) < 3 and found['prev_space'] and found['prev_space'][1] > budget * 0.6:
+            return found['prev_space'][0], 'word'
+        return space, 'word'
+    return _prefix_end(offsets, len(text), budget - 3), 'hard'
+
+if __name__ == '__main__':
+    # Microbenchmark against the old len()/rfind truncation rules (correctness: tests/test_twitter_text.py)
+    import random
+    import timeit
+
+    rng = random.Random(7)
+    words = ['Sensex', 'Nifty', 'crashes', 'rallies', 'Modi', 'opposition', 'budget', 'inflation', 'RBI', 'rate',
+             '7.99', 'U.S.', 'banks', 'मुंबई', '東京', '🔥', '👍🏽', '🇮🇳', '👨‍👩‍👧', '—', '“quoted”',
+             'https://example.com/story?id=42', 'ndtv.com', 'www.moneycontrol.com/markets']
+    punctuation = ['', '', '', ',', '.', '!', '?', ' -', '...']
+
+    def realistic_tweet():
+        # LLM output: mostly plain words, 200-400 characters, the odd emoji or link
+        sentence = [rng.choice(words[:13]) + rng.choice(punctuation) for _ in range(rng.randint(25, 50))]
+        if rng.random() < 0.3:
+            sentence.insert(rng.randrange(len(sentence)), rng.choice(words[13:]))
+        return ' '.join(sentence)
+
+    def legacy_cut(text, max_length=MAX_WEIGHTED_LENGTH):
+        """
+        The old truncate_tweet_complete rules: len() and one rfind per ending/break marker
+        """
+        if len(text) <= max_length:
+            return text
+        truncated = text[:max_length]
+        last = max(truncated.rfind(ending) for ending in ['. ', '! ', '? ', '.', '!', '?'])
+        if last > max_length * 0.6:
+            return text[:last + 1].strip()
+        breaks = [(truncated.rfind(mark), mark) for mark in [', ', ' - ', ' | ', '...', '…']]
+        position, mark = max(breaks)
+        if position > max_length * 0.7:
+            return text[:position + len(mark)].strip()
+        space = truncated.rfind(' ')
+        if space > max_length * 0.75:
+            return text[:space].strip()
+        return text[:max_length - 3].strip() + "..."
+
+    samples = [realistic_tweet() for _ in range(200)]
+    ascii_samples = [''.join(char for char in sample if char.isascii()) for sample in samples]
+    for label, texts in (('ascii', ascii_samples), ('mixed', samples)):
+        runs = 20
+        old = min(timeit.repeat(lambda: [legacy_cut(text) for text in texts], number=runs, repeat=3))
+        new = min(timeit.repeat(lambda: [find_cut(text) for text in texts], number=runs, repeat=3))
+        length = min(timeit.repeat(lambda: [weighted_length(text) for text in texts], number=runs, repeat=3))
+        per_tweet = 1e6 / (runs * len(texts))
+        print(f"{label}: len()/rfind cut {old * per_tweet:.1f} µs, find_cut {new * per_tweet:.1f} µs, "
+              f"weighted_length {length * per_tweet:.1f} µs per tweet")
+    over = sum(len(legacy_cut(text)) < len(text) and weighted_length(legacy_cut(text)) > MAX_WEIGHTED_LENGTH
+               for text in samples)
+    print(f"len()/rfind cuts that Twitter would still reject: {over}/{len(samples)}")